@@ -9,7 +9,8 @@ app itself, and are only shortcuts.
 
 """
 
-from evennia.utils.search import search_tag
+from auto.apps.contact import ContactIndex
+from logic.phones import DIRECTORY
 
 ## Mix-in
 
@@ -61,8 +62,8 @@ class ContactMixin:
 
         """
         obj = obj or self.obj
-        number = obj.tags.get(category="phone number")
-        if not number or not isinstance(number, str):
+        number = DIRECTORY.get_number(obj)
+        if not number:
             raise ValueError("unknown or invalid phone number")
 
         if pretty:
@@ -77,7 +78,7 @@ class ContactMixin:
             phone_number (str): the phone number.
 
         """
-        phones = search_tag(phone_number, category="phone number")
+        phones = DIRECTORY.find(phone_number)
         return phones[0] if phones else None
 
     def format(self, phone_number, use_contact=True, obj=None):
@@ -112,34 +113,10 @@ class ContactMixin:
 
         """
         obj = obj or self.obj
-        matches = []
-
-        # Find the contact app and query the specified number or name
-        contacts = obj.attributes.get(
-                "_type_storage", {}).get(
-                "computer", {}).get(
-                "app_storage", {}).get(
-                "app", {}).get(
-                "contact", {}).get(
-                "contacts", [])
-        for contact in contacts:
-            # Skip contacts without phone numbers
-            if not contact.get("phone_number"):
-                continue
-
-            first = contact.get("first_name", "")
-            last = contact.get("last_name", "")
-            name = first
-            if name:
-                name += " "
-            name += last
-            if name.lower() == name_or_number.lower():
-                return [contact["phone_number"]]
-            elif last.lower().startswith(name_or_number.lower()):
-                matches.append(contact["phone_number"])
-            elif first.lower().startswith(name_or_number.lower()):
-                matches.append(contact["phone_number"])
 
+        # Query the specified number or name in the contact index
+        matches = [contact.phone_number for contact in
+                ContactIndex.get(obj).search(name_or_number, with_number=True)]
         if matches:
             return matches
         else:
@@ -171,21 +148,8 @@ class ContactMixin:
 
         # Find a contact with this phone number
         if use_contact:
-            contacts = obj.attributes.get(
-                    "_type_storage", {}).get(
-                    "computer", {}).get(
-                    "app_storage", {}).get(
-                    "app", {}).get(
-                    "contact", {}).get(
-                    "contacts", [])
-            for contact in contacts:
-                if contact.get("phone_number") == phone_number:
-                    first = contact.get("first_name", "")
-                    last = contact.get("last_name", "")
-                    name = first
-                    if name:
-                        name += " "
-                    name += last
-                    return name
+            contact = ContactIndex.get(obj).get_contact(phone_number)
+            if contact:
+                return contact.name
 
         return phone_number[:3] + "-" + phone_number[3:]
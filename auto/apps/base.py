@@ -6,6 +6,7 @@ Module containing abstract classes for applications.
 
 from textwrap import dedent, wrap
 
+from django.conf import settings
 from evennia import Command, ScriptDB
 from evennia.utils.ansi import strip_ansi
 from evennia.utils.create import create_script
@@ -13,10 +14,20 @@ from evennia.utils.evform import EvForm
 from evennia.utils.utils import class_from_module, inherits_from, lazy_property
 
 from commands.high_tech import ComputerCmdSet
+from logic.notifications import QUEUE, find_room
 from world.log import app as log
 
 ## Constants
 NET = None
+PERSISTENT_CMDSET = getattr(settings, "COMPUTER_PERSISTENT_CMDSET", False)
+
+class _NETDescriptor(object):
+
+    """Descriptor to access the NET, retrieved when first needed."""
+
+    def __get__(self, instance, owner):
+        return get_NET()
+
 
 class BaseApp(object):
 
@@ -31,12 +42,12 @@ class BaseApp(object):
     display_name = ""
     folder = "app"
     start_screen = None
+    NET = _NETDescriptor()
 
     def __init__(self, obj, user, type):
         self.obj = obj
         self.user = user
         self.type = type
-        self.__class__.NET = get_NET()
 
     def __repr__(self):
         return "<App {} ({} folder)>".format(type(self).app_name, type(self).folder)
@@ -59,8 +70,10 @@ class BaseApp(object):
     def notify(cls, obj, title, message="", content="", screen=None, db=None, group=None):
         """Send a message to the owner of the app if needed.
 
-        This method is called when a notificaiton has to be sent.
-        It can do 3 things, depending on context:
+        This method is called when a notificaiton has to be sent.  The
+        notification is queued (see `logic.notifications`) and
+        delivered shortly after by `deliver`.  It can do 3 things,
+        depending on context:
 
         1. Send the message to the object location (room).
         2. Alert the user of the object (if one).
@@ -91,18 +104,30 @@ class BaseApp(object):
                 screen = cls.__module__ + "." + screen
         else:
             screen = type(screen).__module__ + "." + type(screen).__name__
+        QUEUE.add(cls, obj, title, message, content, screen, db, group)
+
+    @classmethod
+    def deliver(cls, obj, title, message="", content="", screen=None, db=None, group=None, room=None):
+        """Deliver a queued notification.
+
+        Args:
+            obj (Object): the object being notified.
+            title (str): the title of the notification to be displayed.
+            message (str, optional): the message to be displayed by the location.
+            content (str, optional): the content of the notification.
+            screen (str, optional): the screen's path.
+            db (dict, optional): the optional arguments to give to the screen.
+            group (str, optional): the notification group.
+            room (Room, optional): the room containing the object, if known.
+
+        """
         app = cls.app_name
         folder = cls.folder
         types = obj.types.has("notifications")
         type = types and types[0] or None
 
         # Try to locate the room
-        location = obj.location
-        while not inherits_from(location, "typeclasses.rooms.Room"):
-            if location is None:
-                break
-
-            location = location.location
+        location = room or find_room(obj.location)
 
         # If a room has been found and a message is to be sent
         user = type and type.db.get("used", None) or None
@@ -127,6 +152,7 @@ class BaseApp(object):
             group (str, optional): the group notification.
 
         """
+        QUEUE.discard(obj, group)
         types = obj.types.has("notifications")
         type = types and types[0] or None
         if type is not None:
@@ -179,17 +205,17 @@ class BaseScreen(object):
 
     @lazy_property
     def db(self):
-        """Return the screen-specific storage."""
-        db = self.type.db
-        if "screen_storage" not in db:
-            db["screen_storage"] = {}
-        return db["screen_storage"]
+        """Return the screen-specific storage (kept in memory)."""
+        ui = self.type.ui
+        if "screen_storage" not in ui:
+            ui["screen_storage"] = {}
+        return ui["screen_storage"]
 
     @property
     def previous(self):
         """Return the previous screen in the screen tree or None."""
-        db = self.type.db
-        tree = list(db.get("screen_tree", {}))
+        ui = self.type.ui
+        tree = list(ui.get("screen_tree", {}))
         path = type(self).__module__ + "." + type(self).__name__
         if tree and tree[-1][0] == path:
             del tree[-1]
@@ -217,7 +243,7 @@ class BaseScreen(object):
 
     def _save(self):
         """Save the current screen."""
-        self.type.db["current_screen"] = (
+        self.type.ui["current_screen"] = (
                 type(self).__module__ + "." + type(self).__name__,
                 self.app and type(self.app).app_name or None,
                 self.app and type(self.app).folder or None
@@ -238,7 +264,7 @@ class BaseScreen(object):
         if self.user and self.user.cmdset.has("computer"):
             self.user.cmdset.remove(ComputerCmdSet)
         cmdset = ComputerCmdSet(self.user, "computer")
-        self.user.cmdset.add(cmdset, permanent=True)
+        self.user.cmdset.add(cmdset, permanent=PERSISTENT_CMDSET)
 
     # General methods
     def close(self):
@@ -376,7 +402,7 @@ class BaseScreen(object):
                 previous.db.update(db)
 
             path = self.path
-            tree = self.type.db.get("screen_tree", [])
+            tree = self.type.ui.get("screen_tree", [])
             if tree and tree[-1][0] == path:
                 del tree[-1]
             previous._save()
@@ -457,7 +483,7 @@ class BaseScreen(object):
 
         """
         # Save the current screen in the tree with current db
-        tree = self.type.db.get("screen_tree")
+        tree = self.type.ui.get("screen_tree")
         path = type(self).__module__ + "." + type(self).__name__
         if tree and tree[-1][0] == path:
             tup = tree[-1]
@@ -467,9 +493,9 @@ class BaseScreen(object):
         db = db or {}
         new_screen = self.move_to(screen, app, db=db)
         path = type(new_screen).__module__ + "." + type(new_screen).__name__
-        if "screen_tree"  not in self.type.db:
-            self.type.db["screen_tree"] = []
-        tree = self.type.db["screen_tree"]
+        if "screen_tree"  not in self.type.ui:
+            self.type.ui["screen_tree"] = []
+        tree = self.type.ui["screen_tree"]
         app = new_screen.app
         folder = app and type(app).folder or None
         app = app and type(app).app_name or None
@@ -590,7 +616,7 @@ def get_NET():
 
     """
     global NET
-    if NET:
+    if NET and NET.pk:
         return NET
 
     try:
@@ -17,6 +17,10 @@ in another app, you could do something like this:
         name = contact.format("555-1234")
         # Will return 555-1234, or the contact name if found
 
+Contacts are indexed per device (see `ContactIndex`), so that formatting
+a phone number or searching a name doesn't browse the contact list.
+The index is rebuilt when contacts are added, updated or removed.
+
 Screens in this app:
     MainScreen: display the list of contacts in this device and allow
             to edit one, or create a new one.
@@ -35,7 +39,7 @@ Commands in this app:
 
 from textwrap import dedent, wrap
 
-from evennia.utils.utils import crop, lazy_property
+from evennia.utils.utils import crop
 
 from auto.apps.base import BaseApp, BaseScreen, AppCommand
 
@@ -58,7 +62,8 @@ class ContactApp(BaseApp):
         update: update an existing contact and store it in the database.
 
     This class also has a `contacts` property which will contain a
-    list of current Contact objects.
+    list of current Contact objects, and an `index` property with the
+    contact index of this device.
 
     """
 
@@ -66,15 +71,15 @@ class ContactApp(BaseApp):
     display_name = "Contact"
     start_screen = "MainScreen"
 
-    @lazy_property
+    @property
+    def index(self):
+        """Return the contact index of this device."""
+        return ContactIndex.get(self.obj)
+
+    @property
     def contacts(self):
         """Return the list of contacts (Contact objects)."""
-        contacts = []
-        for info in self.db.get("contacts", []):
-            contact = Contact(**info)
-            contacts.append(contact)
-
-        return contacts
+        return self.index.contacts
 
     def format(self, phone_number, use_contact=True):
         """Return the formatted phone number or contact name if found.
@@ -96,9 +101,9 @@ class ContactApp(BaseApp):
 
         # Find a contact with this phone number
         if use_contact:
-            for contact in self.contacts:
-                if contact.phone_number == phone_number:
-                    return contact.name
+            contact = self.index.get_contact(phone_number)
+            if contact:
+                return contact.name
 
         return phone_number[:3] + "-" + phone_number[3:]
 
@@ -113,13 +118,15 @@ class ContactApp(BaseApp):
 
         """
         data = {}
-        for i, contact in enumerate(self.contacts):
-            if contact.phone_number == number:
-                data["first_name"] = contact.first_name
-                data["last_name"] = contact.last_name
-                data["phone_number"] = contact.phone_number
-                data["contact_id"] = i
-                return "auto.apps.contact.ContactScreen", data
+        index = self.index
+        i = index.numbers.get(number)
+        if i is not None:
+            contact = index.contacts[i]
+            data["first_name"] = contact.first_name
+            data["last_name"] = contact.last_name
+            data["phone_number"] = contact.phone_number
+            data["contact_id"] = i
+            return "auto.apps.contact.ContactScreen", data
 
         data["phone_number"] = number
         return "auto.apps.contact.ContactScreen", data
@@ -140,19 +147,19 @@ class ContactApp(BaseApp):
 
         """
         contact = Contact(first_name=first_name, last_name=last_name, phone_number=phone_number)
-        self.contacts.append(contact)
         if "contacts" not in self.db:
             self.db["contacts"] = []
         self.db["contacts"].append(contact.info)
+        ContactIndex.invalidate(self.obj)
         return contact
 
     def sort(self):
         """Sort the contact list."""
-        self.contacts.sort(key=lambda contact: contact.name)
         lst = list(self.db.get("contacts", []))
         if lst:
             lst.sort(key=lambda info: info["last_name"] + " " + info["first_name"])
             self.db["contacts"] = lst
+            ContactIndex.invalidate(self.obj)
 
     def remove(self, contact):
         """Remove a contact.
@@ -161,10 +168,9 @@ class ContactApp(BaseApp):
             contact (Contact): the contact to be removed.
 
         """
-        if contact in self.contacts:
-            self.contacts.remove(contact)
-        if contact.info in self.db["contacts"]:
+        if contact.info in self.db.get("contacts", []):
             self.db["contacts"].remove(contact.info)
+        ContactIndex.invalidate(self.obj)
 
     def search(self, name):
         """Search the list of contacts to retrieve a phone number.
@@ -178,17 +184,7 @@ class ContactApp(BaseApp):
             matches (list of Contact): a list of matching contacts.
 
         """
-        matches = []
-        name = name.lower()
-        for contact in self.contacts:
-            if contact.name.lower() == name:
-                return [contact]
-            elif contact.last_name.lower().startswith(name):
-                matches.append(contact)
-            elif contact.first_name.lower().startswith(name):
-                matches.append(contact)
-
-        return matches
+        return self.index.search(name)
 
     def update(self, contact, first_name=None, last_name=None, phone_number=None):
         """Update a specified contact.
@@ -218,6 +214,7 @@ class ContactApp(BaseApp):
         if info in self.db.get("contacts", []):
             index = self.db["contacts"].index(info)
             self.db["contacts"][index].update(contact.info)
+        ContactIndex.invalidate(self.obj)
 
 
 ## Contact class (used throughout all the screens)
@@ -276,6 +273,127 @@ class Contact(object):
         return "<Contact {} (phone={})>".format(self.name, self.phone_number)
 
 
+class ContactIndex(object):
+
+    """Index of the contacts of a device.
+
+    The index is kept in the device's non-persistent attributes, built
+    from the stored contacts the first time it is needed, and
+    invalidated when contacts are modified.  It contains:
+        contacts: the list of Contact objects, in storage order.
+        numbers: a dictionary of {phone number: position in the list}.
+        names: a dictionary of {lowercase full name: positions}.
+        root: the root node of a prefix trie on lowercase first and
+                last names.
+
+    Use `ContactIndex.get(obj)` to retrieve the index of a device.
+
+    """
+
+    def __init__(self, contacts):
+        self.contacts = [Contact(**info) for info in contacts]
+        self.numbers = {}
+        self.names = {}
+        self.root = _TrieNode()
+        for i, contact in enumerate(self.contacts):
+            if contact.phone_number:
+                self.numbers.setdefault(contact.phone_number, i)
+            self.names.setdefault(contact.name.lower(), []).append(i)
+            self.root.ids.add(i)
+            for name in (contact.first_name, contact.last_name):
+                node = self.root
+                for char in name.lower():
+                    node = node.children.setdefault(char, _TrieNode())
+                    node.ids.add(i)
+
+    @classmethod
+    def get(cls, obj):
+        """Return the contact index of this device, building it if needed.
+
+        Args:
+            obj (Object): the device.
+
+        Returns:
+            index (ContactIndex): the contact index.
+
+        """
+        index = obj.ndb._contact_index
+        if index is None:
+            contacts = obj.attributes.get(
+                    "_type_storage", {}).get(
+                    "computer", {}).get(
+                    "app_storage", {}).get(
+                    "app", {}).get(
+                    "contact", {}).get(
+                    "contacts", [])
+            index = cls(contacts)
+            obj.ndb._contact_index = index
+
+        return index
+
+    @staticmethod
+    def invalidate(obj):
+        """Remove the contact index of this device, it will be rebuilt.
+
+        Args:
+            obj (Object): the device.
+
+        """
+        obj.ndb._contact_index = None
+
+    def get_contact(self, phone_number):
+        """Return the contact with this phone number, or None.
+
+        Args:
+            phone_number (str): the phone number, without dash.
+
+        """
+        i = self.numbers.get(phone_number)
+        return self.contacts[i] if i is not None else None
+
+    def search(self, name, with_number=False):
+        """Search the contacts by name.
+
+        A contact whose full name is `name` is returned alone.
+        Otherwise, return the contacts whose first or last name begin
+        with `name`.
+
+        Args:
+            name (str): the name or beginning of a name (case-insensitive).
+            with_number (bool, optional): ignore contacts without phone number.
+
+        Returns:
+            matches (list of Contact): the matching contacts, in list order.
+
+        """
+        name = name.lower()
+        contacts = self.contacts
+        exact = [i for i in self.names.get(name, [])
+                if not with_number or contacts[i].phone_number]
+        if exact:
+            return [contacts[exact[0]]]
+
+        node = self.root
+        for char in name:
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        return [contacts[i] for i in sorted(node.ids)
+                if not with_number or contacts[i].phone_number]
+
+
+class _TrieNode(object):
+
+    """A node in the prefix trie of contact names."""
+
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children = {}
+        self.ids = set()
+
+
 ## Screens
 
 class MainScreen(BaseScreen):
@@ -28,8 +28,12 @@ Screens in this app:
 Commands in this app:
     MainScreen:
         new: create a new message outside of a thread (CmdNew).
+        search: search your texts (CmdSearch).
+        more: display older threads (CmdMoreThreads).
+        latest: display the most recent threads again (CmdLatestThreads).
     ThreadScreen:
         send: send the content of the reply to the thread (CmdSend).
+        more: display older messages in the thread (CmdMore).
     NewTextScreen:
         to: add or remove a contact or phone number as recipient (CmdTo).
         send: send the message (CmdSend).
@@ -45,15 +49,18 @@ Note:
 
 from textwrap import dedent, wrap
 
-from evennia import search_tag
 from evennia.utils.evtable import EvTable
 from evennia.utils.utils import crop, lazy_property
 
 
 from auto.apps._mixins import ContactMixin
 from auto.apps.base import BaseApp, BaseScreen, AppCommand
+from logic.phones import DIRECTORY
 from web.text.models import Text, Thread, Number
 
+## Constants
+THREADS_PER_PAGE = 20
+
 ## App class
 
 class TextApp(BaseApp, ContactMixin):
@@ -99,11 +106,13 @@ class MainScreen(BaseScreen):
     commands to create new messages, and open them in a separate screen.
 
     Data attributes you can use (in screen.db):
-        None
+        start: the index of the first thread displayed (see
+                `CmdMoreThreads` and `CmdLatestThreads`).
+        more: whether older threads can be displayed.
 
     """
 
-    commands = ["CmdNew", "CmdSettings"]
+    commands = ["CmdNew", "CmdSettings", "CmdSearch", "CmdMoreThreads", "CmdLatestThreads"]
     back_screen = "auto.apps.base.MainScreen"
     short_help = "Screen to display your text messages."
     long_help = """
@@ -111,13 +120,22 @@ class MainScreen(BaseScreen):
         You should also see the list of texts you already have, assuming you
         have any.  In front of every text message, you should see a number.
         Enter this number to open this text, to read or reply to it.
+        Use the |ymore|n command to see older conversations, and the
+        |ylatest|n command to see the most recent ones again.
         You can also use the |ysettings|n command to open the settings screen,
-        to change configuration for your text app.
+        to change configuration for your text app.  To find a text, use the
+        |ysearch|n command followed by the words to find.
         As in any screen, use the |yback|n command to go back to the previous
         screen, or the |yexit|n command to exit the interface.  You can obtain
         additional help with the |yhelp|n command.
     """
 
+    def open(self):
+        """The screen opens, display the most recent threads."""
+        super(MainScreen, self).open()
+        if "start" in self.db:
+            del self.db["start"]
+
     def get_text(self):
         """Display the app."""
         try:
@@ -129,25 +147,32 @@ class MainScreen(BaseScreen):
             return
 
         # Load the threads (conversations) to which "number" participated
-        threads = Text.objects.get_threads_for(number)
+        start = self.db.get("start", 0)
+        threads = list(Text.objects.get_participations(number, start,
+                THREADS_PER_PAGE + 1).prefetch_related("db_thread__db_recipients"))
+        more = len(threads) > THREADS_PER_PAGE
+        threads = threads[:THREADS_PER_PAGE]
+        self.db["more"] = more
         string = "Texts for {}".format(pretty_number)
         string += "\n"
         self.db["threads"] = {}
         stored_threads = self.db["threads"]
         if threads:
-            len_i = 3 if len(threads) < 100 else 4
+            len_i = 3 if start + len(threads) < 100 else 4
             string += "  Create a {new} message.\n".format(new=self.format_cmd("new"))
-            i = 1
+            i = start + 1
             table = EvTable(pad_left=0, border="none")
             table.add_column("S", width=2)
             table.add_column("I", width=len_i, align="r", valign="t")
             table.add_column("Sender", width=21)
             table.add_column("Content", width=36)
             table.add_column("Ago", width=15)
-            for thread_id, text in threads.items():
-                thread = text.db_thread
+            for participant in threads:
+                thread = participant.db_thread
+                text = thread.db_last_text
                 stored_threads[i] = thread
-                sender = text.recipients
+                sender = [recipient.db_phone_number for recipient in
+                        thread.db_recipients.all() if recipient.id != text.db_sender_id]
                 sender = [self.app.format(num) for num in sender]
                 sender = ", ".join(sender)
                 if thread.name:
@@ -158,7 +183,7 @@ class MainScreen(BaseScreen):
                 if text.sender.db_phone_number == number:
                     content = "[You] " + content
                 content = crop(content, 35)
-                status = " " if thread.has_read(number) else "|rU|n"
+                status = "|rU|n" if participant.db_unread else " "
                 table.add_row(status, self.format_cmd(str(i)), sender, content, text.sent_ago.capitalize())
                 i += 1
             lines = str(table).splitlines()
@@ -166,6 +191,13 @@ class MainScreen(BaseScreen):
             lines = [line.rstrip() for line in lines]
             string += "\n" + "\n".join(lines)
             string += "\n\n(Type a number to open this text.)"
+            older = []
+            if more:
+                older.append("({} to see older texts)".format(self.format_cmd("more")))
+            if start:
+                older.append("({} to see the latest texts)".format(self.format_cmd("latest")))
+            if older:
+                string += "\n" + " ".join(older)
         else:
             string += "\n  You have no texts yet.  Want to create a {new} one?".format(new=self.format_cmd("new"))
 
@@ -320,17 +352,22 @@ class ThreadScreen(BaseScreen):
 
     Data attributes you can use (in screen.db):
         thread: the thread object (`web.text.models.Thread`).
+        before: the (date sent, ID) of the oldest text displayed, to
+                display older texts (see `CmdMore` and `CmdLatest`).
+        more: whether older texts can be displayed.
 
     """
 
-    commands = ["CmdSend", "CmdClear", "CmdContact"]
+    commands = ["CmdSend", "CmdClear", "CmdContact", "CmdMore", "CmdLatest"]
     back_screen = MainScreen
     short_help = "Screen to see a thread, and reply to it."
     long_help = """
         This screen displays a thread, a list of messages between several
         recipients (probably you and someone else).  You should see the list
-        of more recent messages here.  You can also reply to this thread
-        right away and send your reply.
+        of more recent messages here.  Use the |ymore|n command to see older
+        messages, and the |ylatest|n command to see the most recent ones
+        again.  You can also reply to this thread right away and send
+        your reply.
         Type text to simply add it to the text content to be sent.  For instance:
             |yhello, how is it going?|n
         If you want to delete the content you have typed, you can use the
@@ -344,6 +381,12 @@ class ThreadScreen(BaseScreen):
         additional help with the |yhelp|n command.
     """
 
+    def open(self):
+        """The screen opens, display the most recent messages."""
+        super(ThreadScreen, self).open()
+        if "before" in self.db:
+            del self.db["before"]
+
     def get_text(self):
         """Display the new message screen."""
         self.db["go_back"] = False
@@ -361,7 +404,7 @@ class ThreadScreen(BaseScreen):
         screen = dedent("""
             Messages with {}
             |lccontact|ltCONTACT|le to edit the contact for this conversation.
-
+            {}
             {}
 
             Text message (use {clear} to clear your current text):
@@ -369,17 +412,31 @@ class ThreadScreen(BaseScreen):
 
                 {send}
         """.strip("\n"))
-        texts = list(reversed(thread.text_set.order_by("db_date_sent").reverse()[:10]))
-
-        # Browse the list of texts in this thread
+        texts, more = Text.objects.get_page(thread, self.db.get("before"))
+        self.db["more"] = more
+        if texts:
+            oldest = texts[0]
+            self.db["oldest"] = (oldest.db_date_sent, oldest.id)
+        older = []
+        if more:
+            older.append("({} to see older messages)".format(self.format_cmd("more")))
+        if self.db.get("before"):
+            older.append("({} to see the latest messages)".format(self.format_cmd("latest")))
+        older = " ".join(older)
+
+        # Browse the list of texts in this thread, only format each sender once
+        senders = {}
         messages = []
         for text in texts:
-            sender = text.sender
-            if sender.db_phone_number == number:
-                sender = "You"
-            else:
-                sender = self.app.format(sender.db_phone_number)
-            sender = "|c" + sender + "|n"
+            phone_number = text.sender.db_phone_number
+            sender = senders.get(phone_number)
+            if sender is None:
+                if phone_number == number:
+                    sender = "You"
+                else:
+                    sender = self.app.format(phone_number)
+                sender = "|c" + sender + "|n"
+                senders[phone_number] = sender
 
             content = text.content + " (" + text.sent_ago + ")"
             content = wrap(content, 75 - len(sender) - 3)
@@ -393,7 +450,7 @@ class ThreadScreen(BaseScreen):
         recipients = [self.app.format(number) for number in recipients]
         recipients = ", ".join(recipients)
         messages = "\n".join(messages)
-        return screen.format(recipients, messages, content, clear=self.format_cmd("clear"), send=self.format_cmd("send"))
+        return screen.format(recipients, older, messages, content, clear=self.format_cmd("clear"), send=self.format_cmd("send"))
 
     def no_match(self, string):
         """Command no match, to write the text content."""
@@ -502,6 +559,54 @@ class CmdNew(AppCommand):
         self.screen.next(NewTextScreen)
 
 
+class CmdSearch(AppCommand):
+
+    """
+    Search your texts.
+
+    Usage:
+        search <words>
+
+    Display the most recent texts, sent or received, containing all
+    the specified words.  For instance:
+        |ysearch meeting tomorrow|n
+    """
+
+    key = "search"
+
+    def func(self):
+        """Execute the command."""
+        screen = self.screen
+        number = screen.app.phone_number
+        query = self.args.strip()
+        if not query:
+            self.msg("Specify the words to search.")
+            return
+
+        texts = Text.objects.search(query, number, count=10)
+        if not texts:
+            self.msg("No text matches {}.".format(query))
+            return
+
+        # Only format each sender once
+        senders = {}
+        lines = ["Texts matching {}:".format(query)]
+        for text in texts:
+            phone_number = text.sender.db_phone_number
+            sender = senders.get(phone_number)
+            if sender is None:
+                if phone_number == number:
+                    sender = "You"
+                else:
+                    sender = screen.app.format(phone_number)
+                senders[phone_number] = sender
+
+            content = crop(text.content.replace("\n", "  "), 50)
+            lines.append("  |c{}|n: {} ({})".format(sender, content, text.sent_ago))
+
+        self.msg("\n".join(lines))
+
+
 class CmdSend(AppCommand):
 
     """
@@ -540,11 +645,13 @@ class CmdSend(AppCommand):
             screen.back()
         else:
             del screen.db["content"]
+            if "before" in screen.db:
+                del screen.db["before"]
 
         # Notify the recipients
+        devices = DIRECTORY.find_all(text.recipients)
         for number in text.recipients:
-            devices = search_tag(number, category="phone number")
-            for device in devices:
+            for device in devices.get(number, []):
                 NewTextScreen.notify(device, text)
 
 
@@ -652,6 +759,102 @@ class CmdClear(AppCommand):
         screen.display()
 
 
+class CmdMoreThreads(AppCommand):
+
+    """
+    Display older conversations.
+
+    Usage:
+        more
+
+    The most recent conversations are displayed first.  Use this command
+    to display older conversations.
+    """
+
+    key = "more"
+
+    def func(self):
+        """Execute the command."""
+        screen = self.screen
+        if not screen.db.get("more"):
+            self.msg("There are no older conversations.")
+        else:
+            screen.db["start"] = screen.db.get("start", 0) + THREADS_PER_PAGE
+
+        screen.display()
+
+
+class CmdLatestThreads(AppCommand):
+
+    """
+    Display the latest conversations.
+
+    Usage:
+        latest
+
+    After using the |ymore|n command to display older conversations,
+    use this command to display the most recent conversations again.
+    """
+
+    key = "latest"
+
+    def func(self):
+        """Execute the command."""
+        screen = self.screen
+        if "start" in screen.db:
+            del screen.db["start"]
+
+        screen.display()
+
+
+class CmdMore(AppCommand):
+
+    """
+    Display older messages in this conversation.
+
+    Usage:
+        more
+
+    The most recent messages are displayed first.  Use this command to
+    display the messages sent before them.
+    """
+
+    key = "more"
+
+    def func(self):
+        """Execute the command."""
+        screen = self.screen
+        if not screen.db.get("more"):
+            self.msg("There are no older messages in this conversation.")
+        else:
+            screen.db["before"] = screen.db.get("oldest")
+
+        screen.display()
+
+
+class CmdLatest(AppCommand):
+
+    """
+    Display the latest messages in this conversation.
+
+    Usage:
+        latest
+
+    After using the |ymore|n command to display older messages, use this
+    command to display the most recent messages again.
+    """
+
+    key = "latest"
+
+    def func(self):
+        """Execute the command."""
+        screen = self.screen
+        if "before" in screen.db:
+            del screen.db["before"]
+
+        screen.display()
+
+
 class CmdContact(AppCommand):
 
     """
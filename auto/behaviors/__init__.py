@@ -11,6 +11,9 @@ inate abilities, but adding a behavior to a character is quite simple.
 Behaviors:
     driver: Driving a vehicle to a specific destination.
 
+Behaviors can ask to be woken up later, once or at a regular interval,
+by the central behavior scheduler (see `auto.behaviors.scheduler`).
+
 """
 
 from auto.behaviors.behaviorhandler import BEHAVIORS
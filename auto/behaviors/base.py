@@ -4,6 +4,8 @@
 
 from evennia.utils.utils import lazy_property
 
+from auto.behaviors.scheduler import SCHEDULER
+
 class Behavior(object):
 
     """Abstract class for behaviors."""
@@ -28,3 +30,39 @@ class Behavior(object):
 
         """
         pass
+
+    def at_wake(self):
+        """
+        The behavior has been woken up by the scheduler.
+
+        Override this method to have the character act at regular
+        intervals, after calling `wake_in` or `wake_every`.
+
+        """
+        pass
+
+    def wake_in(self, delay):
+        """
+        Wake up the behavior in `delay` seconds.
+
+        Args:
+            delay (int or float): the number of seconds before waking up.
+
+        """
+        SCHEDULER.schedule(self, delay)
+
+    def wake_every(self, interval, delay=None):
+        """
+        Wake up the behavior every `interval` seconds.
+
+        Args:
+            interval (int or float): the number of seconds between wake-ups.
+            delay (int or float, optional): the number of seconds before
+                    the first wake-up (`interval` by default).
+
+        """
+        SCHEDULER.schedule(self, interval if delay is None else delay, interval)
+
+    def sleep(self):
+        """Cancel the wake-up of the behavior."""
+        SCHEDULER.cancel(self)
@@ -10,8 +10,10 @@ behaviors is generally hard-coded in the `Character` (or subsequent) class.
 """
 
 from evennia.utils.utils import inherits_from
+from twisted.internet import defer
 
 from auto.behaviors.driver import Driver
+from logic.object.bulk import add_tag, fan_out, tagged
 
 BEHAVIORS = {
     "driver": Driver,
@@ -35,6 +37,7 @@ class BehaviorHandler(object):
     def __init__(self, character):
         self._character = character
         self._behaviors = []
+        self._names = {}
         self._find_behaviors()
 
     def __repr__(self):
@@ -48,24 +51,35 @@ class BehaviorHandler(object):
         return iter(self._behaviors)
 
     def __contains__(self, name):
-        return name in [type(behavior).name for behavior in self._behaviors]
+        return name in self._names
 
     def __getitem__(self, name):
         """Return the behavior."""
-        return [behavior for behavior in self._behaviors if type(behavior).name == name][0]
+        return self._names[name]
 
     def _find_behaviors(self):
-        """Build the list of behaviors."""
-        names = [type(behavior).name for behavior in self._behaviors]
-        behaviors = self._behaviors
-        for name, behavior in BEHAVIORS.items():
-            if name in names:
+        """
+        Build the list of behaviors.
+
+        All the behavior tags are read at once (from the tag cache if it
+        has been prefetched, otherwise in one query).
+
+        """
+        names = self._character.tags.get(category="behavior", return_list=True)
+        for name in names:
+            if name in self._names or name not in BEHAVIORS:
                 continue
 
-            if self._character.tags.get(name, category="behavior"):
-                behaviors.append(behavior(self, self._character))
+            behavior = BEHAVIORS[name](self, self._character)
+            self._behaviors.append(behavior)
+            self._names[name] = behavior
 
+        self._index()
+
+    def _index(self):
+        """Sort the behaviors and index them by name."""
         self._behaviors.sort(key=lambda behavior: type(behavior).name)
+        self._names = dict((type(behavior).name, behavior) for behavior in self._behaviors)
 
     def get(self, name):
         """Return the behavior of this specified name or None.
@@ -77,8 +91,7 @@ class BehaviorHandler(object):
             behavior: the behavior or None if not found.
 
         """
-        behaviors = [behavior for behavior in self._behaviors if type(behavior).name == name]
-        return behaviors[0] if behaviors else None
+        return self._names.get(name)
 
     def add(self, name, recursive=True):
         """Add a new behavior for this character.
@@ -97,6 +110,14 @@ class BehaviorHandler(object):
             The behavior shouldn't be already present in this character's
             (or pchar's) behavior list.
 
+            Characters of a prototype are tagged and have their behaviors
+            created in chunks that don't block the reactor, each chunk
+            in a transaction.
+
+        Returns:
+            deferred (Deferred): a deferred fired when all characters
+                    have been updated.
+
         Raises:
             KeyError: the behavior name couldn't be found.
 
@@ -113,13 +134,30 @@ class BehaviorHandler(object):
                 new_behavior = self.get(name)
                 new_behavior.at_behavior_creation(prototype=True)
                 if recursive:
-                    # This is a prototype, add the behavior to its characters
-                    for char in getattr(self._character, "characters", []):
-                        char.behaviors.add(name, recursive=False)
+                    # This is a prototype, add the behavior to its characters,
+                    # tagging them chunk by chunk
+                    ids = tagged(self._character.key, "pchar")
+                    return fan_out(ids, lambda char: char.behaviors._at_behavior_added(name),
+                            title="Adding behavior {} to {}".format(name, self._character.key),
+                            prepare=lambda chunk: add_tag(chunk, name, "behavior"))
             elif self._character.db.prototype:
                 new_behavior = self.get(name)
                 new_behavior.at_behavior_creation(prototype=False)
 
+        return defer.succeed(None)
+
+    def _at_behavior_added(self, name):
+        """The behavior tag has been added in bulk, create the behavior.
+
+        Args:
+            name (str): name of the behavior that was added.
+
+        """
+        self._find_behaviors()
+        new_behavior = self.get(name)
+        if new_behavior and self._character.db.prototype:
+            new_behavior.at_behavior_creation(prototype=False)
+
     def remove(self, name):
         """Remove a behavior.
 
@@ -136,7 +174,12 @@ class BehaviorHandler(object):
         if self._character.tags.get(name, category="behavior"):
             self._character.tags.remove(name, category="behavior")
 
+        behavior = self.get(name)
+        if behavior:
+            behavior.sleep()
+
         self._behaviors[:] = [behavior for behavior in self._behaviors if type(behavior).name != name]
+        self._index()
 
     def db(self, name):
         """
@@ -28,6 +28,25 @@ class Driver(Behavior):
 
     name = "driver"
 
+    def act(self, action, vehicle, *args):
+        """Perform a driving action on the vehicle, without using commands.
+
+        Args:
+            action (str): the name of the vehicle method (like "set_speed").
+            vehicle (Vehicle): the vehicle driven by this character.
+            Other positional arguments are sent to the vehicle method.
+
+        Returns:
+            result: the value returned by the vehicle method, or None
+                    if the action couldn't be performed.
+
+        """
+        try:
+            return getattr(vehicle, action)(self.character, *args)
+        except ValueError as err:
+            log.debug("#{}-{}: cannot {}: {}".format(vehicle.id, self.character,
+                    action, err))
+
     def drive_to(self, address):
         """Plan to drive to a specific address.
 
@@ -58,7 +77,7 @@ class Driver(Behavior):
             gps.find_path()
             log.debug("GPS: {}".format(gps.path))
             self.db["destinations"] = gps.path
-            self.character.execute_cmd("speed {}".format(desired_speed))
+            self.act("set_speed", vehicle, desired_speed)
             vehicle.clear_messages()
 
     def pre_turn(self, driver, vehicle):
@@ -71,7 +90,7 @@ class Driver(Behavior):
             name = get_direction(abs_direction)["name"]
             log.debug("#{}-{}: turn {} {}-{}".format(
                     vehicle.id, self.character, name, previous, next))
-            driver.execute_cmd("turn {}".format(name))
+            self.act("prepare_turn", vehicle, name)
 
             # Find the final coordinates if necessary
             final = destinations[-1][2]
@@ -103,12 +122,12 @@ class Driver(Behavior):
             if distance <= 0.5:
                 side = self.db["side"]
                 log.debug("#{}-{}: try to park on {} side".format(vehicle.id, self.character, side))
-                driver.execute_cmd("park {}".format(side))
+                self.act("park", vehicle, side)
                 if vehicle.location: # The vehicle is parked
                     vehicle.stop_monitoring()
             elif distance < 4 and vehicle.db.desired_speed > 5:
-                driver.execute_cmd("speed 5")
+                self.act("set_speed", vehicle, 5)
                 log.debug("#{}-{}: slow down to 5 MPH".format(vehicle.id, self.character))
             elif distance < 7 and vehicle.db.desired_speed > 10:
-                driver.execute_cmd("speed 10")
+                self.act("set_speed", vehicle, 10)
                 log.debug("#{}-{}: slow down to 10 MPH".format(vehicle.id, self.character))
@@ -0,0 +1,393 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module containing the behavior scheduler.
+
+A single scheduler (`SCHEDULER`) wakes up the behaviors of all
+characters.  Rather than having one script per character, behaviors
+ask to be woken up later, once or at a regular interval:
+    behavior.wake_in(delay): call `at_wake` in `delay` seconds.
+    behavior.wake_every(interval): call `at_wake` every `interval` seconds.
+    behavior.sleep(): cancel the wake-up of the behavior.
+
+Wake-ups are placed in a hierarchical timing wheel, so scheduling and
+cancelling them doesn't depend on the number of scheduled behaviors.
+The scheduler is called at a fixed interval (see the `tickers.behaviors`
+module) and runs the due behaviors in batches, with a time budget per
+tick: the behaviors not run during this tick are run during the next
+one.
+
+The schedule is kept in memory.  When a wake-up is scheduled or
+cancelled, it is saved at the next flush in the "scheduler" storage of
+the behavior handler (`char.behaviors.db`).  Regular wake-ups are
+saved with their first due time and interval, so that waking up a
+behavior doesn't need to save anything: the next due time is computed
+again when the schedule is restored.  Characters with a saved schedule
+are tagged, so that the schedule can be restored when the server starts.
+
+"""
+
+from collections import deque
+import math
+import time
+
+from django.conf import settings
+from evennia.objects.models import ObjectDB
+
+from logic.object.bulk import fan_out, tagged
+from world.log import logger
+
+## Constants
+TICK_INTERVAL = getattr(settings, "BEHAVIOR_TICK_INTERVAL", 1)
+TIME_BUDGET = getattr(settings, "BEHAVIOR_TIME_BUDGET", 0.05)
+FLUSH_INTERVAL = getattr(settings, "BEHAVIOR_FLUSH_INTERVAL", 60)
+SLOTS = 64
+LEVELS = 4
+STORAGE = "scheduler"
+TAG = ("scheduled", "behavior schedule")
+log = logger("behaviors")
+
+class TimingWheel(object):
+
+    """
+    Hierarchical timing wheel.
+
+    Entries are scheduled at a given tick (an integer).  The first
+    wheel has one slot per tick, the second one slot per turn of the
+    first wheel, and so on.  When a wheel has done a full turn, the next
+    slot of the upper wheel is cascaded to lower wheels.  Entries too far
+    in the future for all wheels are kept in an overflow list.
+
+    """
+
+    def __init__(self, slots=SLOTS, levels=LEVELS):
+        self.slots = slots
+        self.levels = levels
+        self.wheels = [[[] for i in range(slots)] for level in range(levels)]
+        self.overflow = []
+        self.current = 0
+
+    def __len__(self):
+        count = len(self.overflow)
+        for wheel in self.wheels:
+            count += sum(len(slot) for slot in wheel)
+
+        return count
+
+    def add(self, tick, entry):
+        """
+        Add an entry to the wheel.
+
+        Args:
+            tick (int): the tick at which the entry is due.
+            entry (any): the entry to return when it's due.
+
+        Note:
+            Entries due at the current tick or before are due
+            at the next tick.
+
+        """
+        self._place(max(tick, self.current + 1), entry)
+
+    def _place(self, tick, entry):
+        """Place an entry in the right wheel, or in the overflow list."""
+        delta = tick - self.current
+        for level in range(self.levels):
+            if delta < self.slots ** (level + 1):
+                index = (tick // self.slots ** level) % self.slots
+                self.wheels[level][index].append((tick, entry))
+                return
+
+        self.overflow.append((tick, entry))
+
+    def advance(self, tick):
+        """
+        Advance the wheel up to the given tick.
+
+        Args:
+            tick (int): the tick to advance to.
+
+        Returns:
+            due (list): the entries due, in order.
+
+        """
+        due = []
+        while self.current < tick:
+            self.current += 1
+            current = self.current
+
+            # Cascade upper wheels which have done a full turn
+            for level in range(1, self.levels):
+                span = self.slots ** level
+                if current % span:
+                    break
+
+                index = (current // span) % self.slots
+                entries = self.wheels[level][index]
+                self.wheels[level][index] = []
+                for entry_tick, entry in entries:
+                    self._place(entry_tick, entry)
+            else:
+                entries = self.overflow
+                self.overflow = []
+                for entry_tick, entry in entries:
+                    self._place(entry_tick, entry)
+
+            index = current % self.slots
+            entries = self.wheels[0][index]
+            self.wheels[0][index] = []
+            for entry_tick, entry in entries:
+                if entry_tick <= current:
+                    due.append(entry)
+                else:
+                    self._place(entry_tick, entry)
+
+        return due
+
+
+class BehaviorScheduler(object):
+
+    """Central scheduler to wake up behaviors."""
+
+    def __init__(self):
+        self.wheel = TimingWheel()
+        self.start = None
+        self.entries = {}
+        self.ready = deque()
+        self.dirty = set()
+        self._version = 0
+
+    def _begin(self, now):
+        """Set the time of the first tick, if not set yet."""
+        if self.start is None:
+            self.start = now
+
+    def _tick(self, timestamp):
+        """Return the tick at which this timestamp is due."""
+        return int(math.ceil((timestamp - self.start) / float(TICK_INTERVAL)))
+
+    @staticmethod
+    def _next_due(due, interval, now):
+        """Return the first due time, at the given interval, not before now."""
+        if interval and due < now:
+            due += math.ceil((now - due) / float(interval)) * interval
+
+        return due
+
+    def schedule(self, behavior, delay, interval=None, now=None):
+        """
+        Schedule the wake-up of a behavior.
+
+        Args:
+            behavior (Behavior): the behavior to wake up.
+            delay (int or float): the number of seconds before waking up.
+            interval (int or float, optional): if set, wake the behavior
+                    up every `interval` seconds after the first time.
+            now (float, optional): the current time.
+
+        Note:
+            A behavior has only one wake-up: scheduling it again
+            replaces its previous wake-up.
+
+        """
+        now = time.time() if now is None else now
+        self._begin(now)
+        key = (behavior.character.pk, type(behavior).name)
+        self._add(key, now + delay, interval, now + delay)
+        self.dirty.add(key[0])
+
+    def _add(self, key, due, interval, first):
+        """Add a wake-up in the wheel, replacing the previous one."""
+        self._version += 1
+        self.entries[key] = (due, interval, self._version, first)
+        self.wheel.add(self._tick(due), (key, self._version))
+
+    def cancel(self, behavior):
+        """
+        Cancel the wake-up of a behavior.
+
+        Args:
+            behavior (Behavior): the behavior.
+
+        Note:
+            The entry stays in the wheel, but is ignored when due.
+
+        """
+        key = (behavior.character.pk, type(behavior).name)
+        if self.entries.pop(key, None):
+            self.dirty.add(key[0])
+
+    def get(self, behavior):
+        """
+        Return the wake-up time and interval of a behavior.
+
+        Args:
+            behavior (Behavior): the behavior.
+
+        Returns:
+            due, interval (tuple or None): the timestamp of the next wake-up
+                    and the interval, or None if the behavior isn't scheduled.
+
+        """
+        key = (behavior.character.pk, type(behavior).name)
+        entry = self.entries.get(key)
+        return entry[:2] if entry else None
+
+    def tick(self, now=None, budget=TIME_BUDGET):
+        """
+        Wake up the due behaviors.
+
+        Args:
+            now (float, optional): the current time.
+            budget (float, optional): the maximum number of seconds to
+                    spend waking up behaviors, None for no limit.
+
+        Returns:
+            count (int): the number of behaviors woken up.
+
+        """
+        now = time.time() if now is None else now
+        self._begin(now)
+        tick = int((now - self.start) // TICK_INTERVAL)
+        for key, version in self.wheel.advance(tick):
+            entry = self.entries.get(key)
+            if entry and entry[2] == version:
+                self.ready.append(key)
+
+        count = 0
+        started = time.time()
+        while self.ready:
+            if budget is not None and count and time.time() - started >= budget:
+                log.debug("{} behaviors left for the next tick".format(len(self.ready)))
+                break
+
+            self._wake(self.ready.popleft(), now)
+            count += 1
+
+        return count
+
+    def _wake(self, key, now):
+        """Wake up a behavior."""
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+
+        char_id, name = key
+        try:
+            character = ObjectDB.objects.get(id=char_id)
+        except ObjectDB.DoesNotExist:
+            self.dirty.discard(char_id)
+            return
+
+        behavior = character.behaviors.get(name)
+        if behavior is None:
+            self.dirty.add(char_id)
+            return
+
+        due, interval, version, first = entry
+        if interval:
+            # The saved schedule doesn't change
+            self._add(key, self._next_due(due + interval, interval, now),
+                    interval, first)
+        else:
+            self.dirty.add(char_id)
+
+        try:
+            behavior.at_wake()
+        except Exception:
+            log.exception("An error occurred while waking up {} of {}(#{})".format(
+                    name, character, char_id))
+
+    def flush(self):
+        """
+        Save the schedule of characters modified since the last flush.
+
+        Returns:
+            count (int): the number of characters saved.
+
+        """
+        dirty = self.dirty
+        self.dirty = set()
+        if not dirty:
+            return 0
+
+        schedules = dict((char_id, {}) for char_id in dirty)
+        for (char_id, name), (due, interval, version, first) in self.entries.items():
+            if char_id in schedules:
+                schedules[char_id][name] = (first, interval)
+
+        count = 0
+        for character in ObjectDB.objects.filter(id__in=list(dirty)):
+            try:
+                self.save(character, schedules[character.id])
+            except Exception:
+                log.exception("An error occurred while saving the schedule of {}(#{})".format(
+                        character, character.id))
+            else:
+                count += 1
+
+        return count
+
+    def save(self, character, schedule):
+        """
+        Save the schedule of a character.
+
+        Args:
+            character (Character): the character.
+            schedule (dict): the schedule as {name: (first, interval)}.
+
+        Note:
+            The character is tagged when it gets its first entry
+            and untagged when it loses its last one.
+
+        """
+        storage = character.behaviors.db(STORAGE)
+        scheduled = bool(storage)
+        for name in list(storage.keys()):
+            if name not in schedule:
+                del storage[name]
+
+        for name, value in schedule.items():
+            if storage.get(name) != value:
+                storage[name] = value
+
+        if schedule and not scheduled:
+            character.tags.add(*TAG)
+        elif scheduled and not schedule:
+            character.tags.remove(*TAG)
+
+    def restore(self, character, now=None):
+        """
+        Restore the saved schedule of a character.
+
+        Args:
+            character (Character): the character.
+            now (float, optional): the current time.
+
+        Note:
+            Single wake-ups missed while the server was down are due
+            at the next tick.  Regular wake-ups are due at their next
+            interval.
+
+        """
+        now = time.time() if now is None else now
+        self._begin(now)
+        for name, (first, interval) in character.behaviors.db(STORAGE).items():
+            key = (character.id, name)
+            if key not in self.entries:
+                due = self._next_due(first, interval, now) if interval else max(first, now)
+                self._add(key, due, interval, first)
+
+    def restore_all(self):
+        """
+        Restore the schedule of all tagged characters.
+
+        Returns:
+            deferred (Deferred): a deferred fired when all characters
+                    have been restored.
+
+        """
+        return fan_out(tagged(*TAG), self.restore, title="Restoring behavior schedules")
+
+
+SCHEDULER = BehaviorScheduler()
@@ -14,6 +14,7 @@ class BaseType(object):
     You can override the following methods.  Note that they are called
     ONLY if the type is defined on an object, and not on a prototype:
         at_type_creation: the type has been added to an object.
+        at_type_removal: the type is about to be removed from an object.
         at_server_start: the server starts, useful to re-do some actions.
 
     """
@@ -39,6 +40,15 @@ class BaseType(object):
         """
         pass
 
+    def at_type_removal(self):
+        """
+        The type is about to be removed from an object.
+
+        Override this method to clean up what the type has created.
+
+        """
+        pass
+
     def at_server_start(self, prototype=False):
         """The server has restarted.
 
@@ -4,9 +4,11 @@
 High-tech device types.
 """
 
+from collections import Mapping, MutableSequence, MutableSet
 import datetime
 import os
 from textwrap import dedent, wrap
+import time
 
 from django.utils.timezone import make_aware
 from evennia.utils import gametime
@@ -14,17 +16,48 @@ from evennia.utils.utils import all_from_module, class_from_module, crop, inheri
 
 from evennia.contrib.random_string_generator import RandomStringGenerator
 
-from auto.apps.base import BaseApp, MainScreen
+from auto.apps.base import BaseApp, MainScreen, PERSISTENT_CMDSET
 from auto.types.base import BaseType
+from logic.phones import DIRECTORY
+from web.notifications.models import Notification as StoredNotification
+from world.log import app as log
 
 ## Constants
 PHONE_GENERATOR = RandomStringGenerator("phone number", r"[0-9]{3}-[0-9]{4}")
 APPS = {}
+APP_TIMINGS = {}
+SCREEN_KEYS = ("current_screen", "screen_storage", "screen_tree")
+ACTIVE_COMPUTERS = {}
+NOTIFICATIONS_DISPLAYED = 10
 
 ## Functions
-def load_apps(path="auto.apps", errors=None):
-    """Dynamically-load the apps stored in modules."""
-    errors = errors or []
+def _plain(value):
+    """Return a copy of a stored value, with plain dicts, lists and sets."""
+    if isinstance(value, Mapping):
+        return dict((key, _plain(item)) for key, item in value.items())
+    elif isinstance(value, MutableSequence):
+        return [_plain(item) for item in value]
+    elif isinstance(value, MutableSet):
+        return set(_plain(item) for item in value)
+    elif isinstance(value, tuple):
+        return tuple(_plain(item) for item in value)
+
+    return value
+
+def load_apps(path="auto.apps", errors=None, reload=False):
+    """Dynamically-load the apps stored in modules.
+
+    The registry of app classes (`APPS`, {folder: {app name: class}})
+    is only built once, unless `reload` is set.  The time needed to
+    import every module is kept in `APP_TIMINGS`.
+
+    """
+    if errors is None:
+        if APPS and not reload:
+            return []
+
+        errors = []
+
     relpath = path.replace(".", os.path.sep)
     for content in os.listdir(relpath):
         if content == "base.py":
@@ -32,11 +65,16 @@ def load_apps(path="auto.apps", errors=None):
 
         if os.path.isfile(relpath + os.path.sep + content) and content.endswith(".py") and not content.startswith("_"):
             # Obviously a module, try to load it
+            module = path + "." + content[:-3]
+            before = time.time()
             try:
-                variables = all_from_module(path + "." + content[:-3])
+                variables = all_from_module(module)
             except Exception as err:
-                errors.append((path + "." + content[:-3], str(err)))
+                errors.append((module, str(err)))
             else:
+                APP_TIMINGS[module] = time.time() - before
+                log.debug("{}s: importing {}".format(round(APP_TIMINGS[module], 3), module))
+
                 # Explore the module, looking for a class
                 app = None
                 for var in variables.values():
@@ -59,10 +97,27 @@ def load_apps(path="auto.apps", errors=None):
 
     return errors
 
+def flush_screens():
+    """Save the screen state of all computers being used.
+
+    Returns:
+        flushed (int): the number of flushed computers.
+
+    """
+    computers = list(ACTIVE_COMPUTERS.values())
+    for computer in computers:
+        try:
+            computer.flush_screen()
+        except Exception:
+            log.exception("An error occurred while saving the screen of {}(#{})".format(
+                    computer.obj, computer.obj.id))
+
+    return len(computers)
+
 def return_appearance(type, looker, number=False, header=""):
     """Return the formatted appearance for a phone or computer."""
-    phone_number = type.obj.tags.get(category="phone number")
-    if not isinstance(phone_number, str):
+    phone_number = DIRECTORY.get_number(type.obj)
+    if not phone_number:
         phone_number = "|gunset|n"
     else:
         phone_number = phone_number[:3] + "-" + phone_number[3:]
@@ -85,10 +140,15 @@ def return_appearance(type, looker, number=False, header=""):
                                                                      {number}
         """.rstrip("\n").format(number=phone_number)
 
-    # Display the notifications
-    notifications = type.notifications.all()
+    # Display the most recent notifications
+    notifications = type.notifications.all(count=NOTIFICATIONS_DISPLAYED)
     if notifications:
         text += "\n\n"
+        if len(notifications) == NOTIFICATIONS_DISPLAYED:
+            older = type.notifications.count() - NOTIFICATIONS_DISPLAYED
+            if older:
+                s = "" if older == 1 else "s"
+                text += "\n({} older notification{s})".format(older, s=s)
         for notification in notifications:
             title = crop(notification.title, 55, "...")
             content = "\n    ".join(wrap(notification.content, 74))
@@ -127,11 +187,7 @@ class Phone(BaseType):
     @property
     def number(self):
         """Return the phone number of this object or None."""
-        number = self.obj.tags.get(category="phone number")
-        if not number or not isinstance(number, str):
-            return None
-
-        return number
+        return DIRECTORY.get_number(self.obj)
 
     @property
     def prettu_number(self):
@@ -147,8 +203,16 @@ class Phone(BaseType):
         db = self.db
         if not prototype and "number" not in db:
             number = PHONE_GENERATOR.get()
+            while DIRECTORY.exists(number):
+                number = PHONE_GENERATOR.get()
+
             db["number"] = number
-            self.obj.tags.add(number.replace("-", ""), category="phone number")
+            DIRECTORY.add(self.obj, number)
+
+    def at_type_removal(self):
+        """The type is about to be removed."""
+        DIRECTORY.remove(self.obj)
+        self.db.pop("number", None)
 
     def return_appearance(self, looker):
         """Return the appearance of the phone."""
@@ -202,19 +266,61 @@ class Computer(BaseType):
         number = True if self.obj.types.get("phone") else False
         return return_appearance(self, looker, number=number, header=header)
 
+    @property
+    def ui(self):
+        """Return the screen state, kept in memory while the computer is used.
+
+        The screen state (current screen, screen storage and screen
+        tree) is read from the type storage the first time, then
+        modified in memory.  It is saved in the type storage by
+        `flush_screen`, when the interface is quit, when the user is
+        unpuppeted and when the server stops.
+
+        """
+        state = self.obj.ndb._screen_state
+        if state is None:
+            db = self.db
+            state = {}
+            for key in SCREEN_KEYS:
+                if key in db:
+                    state[key] = _plain(db[key])
+
+            self.obj.ndb._screen_state = state
+
+        if self.obj.pk:
+            ACTIVE_COMPUTERS[self.obj.pk] = self
+
+        return state
+
+    def flush_screen(self):
+        """Save the screen state in the type storage."""
+        ACTIVE_COMPUTERS.pop(self.obj.pk, None)
+        state = self.obj.ndb._screen_state
+        if state is None:
+            return
+
+        db = self.db
+        for key in SCREEN_KEYS:
+            if key in state:
+                db[key] = state[key]
+            elif key in db:
+                del db[key]
+
     def quit(self):
         """Quit the interface, removing the CmdSet if necessary."""
         db = self.db
         used = db.get("used")
         if used and used.cmdset.has("computer"):
             used.cmdset.remove("commands.high_tech.ComputerCmdSet")
+        if used and used.db._aven_using:
             del used.db._aven_using
 
         if used:
             del db["used"]
 
-        if "screen_tree" in db:
-            del db["screen_tree"]
+        self.ui.pop("screen_tree", None)
+        self.flush_screen()
+        self.obj.ndb._screen_state = None
 
     def use(self, user, screen=None, app_name=None, folder="app", db=None):
         """Use the computer.
@@ -224,7 +330,13 @@ class Computer(BaseType):
 
         """
         used = self.db.get("used")
-        if used is user:
+        if used is user and not user.cmdset.has("computer"):
+            # The non-persistent CmdSet was lost (server reload), restore it
+            user.cmdset.add("commands.high_tech.ComputerCmdSet", permanent=PERSISTENT_CMDSET)
+            for cmdset in user.cmdset.get():
+                if cmdset.key == "computer" and getattr(cmdset, "screen", None):
+                    cmdset.screen.display()
+        elif used is user:
             user.msg("You already are using it.")
         elif used:
             user.msg("{} is already using it.".format(used.get_display_name(user)))
@@ -243,15 +355,15 @@ class Computer(BaseType):
                 Screen = MainScreen
             self.db["used"] = user
             screen = Screen(self.obj, user, self, app)
-            if "screen_tree" not in self.db:
-                self.db["screen_tree"] = [(type(screen).__module__ + "." + type(screen).__name__, app_name, folder, None)]
+            if "screen_tree" not in self.ui:
+                self.ui["screen_tree"] = [(type(screen).__module__ + "." + type(screen).__name__, app_name, folder, None)]
             if db:
                 screen.db.update(db)
             screen._save()
             screen.open()
             screen.display()
             user.db._aven_using = self.obj
-            user.cmdset.add("commands.high_tech.ComputerCmdSet", permanent=True)
+            user.cmdset.add("commands.high_tech.ComputerCmdSet", permanent=PERSISTENT_CMDSET)
 
 
 class ApplicationHandler(object):
@@ -261,27 +373,31 @@ class ApplicationHandler(object):
     This handler, set on the computer type, allows to add and remove,
     install and uninstall applications.  The `AppHandler` (~type.apps`)
     is created right away, but individual applications are only created
-    if the handler's `load` or `install` method is called.  In both
-    cases, the user (the object using the computer) must be provided.
+    when they are first accessed (through `get` or when iterating over
+    the handler), with the user given to the handler's `load` method.
 
     """
 
     def __init__(self, obj, type):
         self.obj = obj
         self.type = type
-        self._apps = []
+        self._user = None
+        self._apps = {}
 
     def __iter__(self):
-        return iter(self._apps)
+        for folder, apps in self.type.db.get("apps", {}).items():
+            for app_name in apps:
+                app = self.get(app_name, folder)
+                if app:
+                    yield app
 
     def get(self, app_name, folder="app"):
         """
         Return an instanciated App object or None.
 
-        This method looks into the instanciated App objects, that is,
-        these that are loaded (with an active user).  It shouldn't be
-        used to check an app is installed unless someone is currently
-        using the phone (the handler has been loaded with an active user).
+        The App object is created the first time it is needed, with the
+        user the handler has been loaded with.  Apps that are not
+        installed on this computer aren't created.
 
         Args:
             app_name (str): the name of the application to find.
@@ -291,11 +407,17 @@ class ApplicationHandler(object):
             app (App or None): the application, or None if not found.
 
         """
-        for app in self._apps:
-            if type(app).app_name == app_name and type(app).folder == folder:
-                return app
+        key = (folder, app_name)
+        app = self._apps.get(key)
+        if app is None:
+            AppClass = APPS.get(folder, {}).get(app_name)
+            if AppClass is None or app_name not in self.type.db.get("apps", {}).get(folder, []):
+                return None
+
+            app = AppClass(self.obj, self._user, self.type)
+            self._apps[key] = app
 
-        return None
+        return app
 
     def add(self, app_name, folder="app"):
         """
@@ -335,47 +457,81 @@ class ApplicationHandler(object):
                 self.add(app_name, folder)
 
     def load(self, user):
-        """Load the apps, creating the App objects."""
-        # Delete all application objects
-        self._apps[:] = []
+        """Load the apps for this user.
 
-        db = self.type.db
-        folders = db.get("apps", {})
-        for folder, apps in folders.items():
-            for app_name in apps:
-                AppClass = APPS.get(folder, {}).get(app_name, {})
-                app = AppClass(self.obj, user, self.type)
-                self._apps.append(app)
+        App objects aren't created at this point, but when they are
+        first accessed.
+
+        """
+        # Delete all application objects
+        self._apps.clear()
+        self._user = user
 
 
 class NotificationHandler(object):
 
-    """Notification handler, to handle giving notifications."""
+    """Notification handler, to handle giving notifications.
+
+    Notifications are stored in their own table (see the
+    `web.notifications` app), indexed by device, group and timestamp.
+    Adding or clearing notifications doesn't touch the type storage,
+    and only a limited number of notifications is kept by device.
+
+    """
 
     def __init__(self, obj, type):
         self.obj = obj
         self.type = type
+        self._migrate()
 
-    @lazy_property
-    def db(self):
-        """Return the DB for the notificaiton handler."""
+    def _migrate(self):
+        """Move the notifications stored in the type storage, if any."""
         db = self.type.db
-        if "notifications" not in db:
-            db["notifications"] = []
-        return db["notifications"]
-
-    def all(self):
-        """Return all notifications."""
-        notifications = []
-        for info in self.db:
-            notification = Notification(**info)
-            notification.obj = self.obj
-            notification.handler = self
-            notifications.append(notification)
-
-        return notifications
-
-    def add(self, title, screen, app, folder="app", content="", db=None, group=None):
+        if "notifications" in db:
+            for kwargs in db["notifications"]:
+                kwargs = dict(kwargs)
+                self.add(timestamp=kwargs.pop("timestamp", None), **kwargs)
+            del db["notifications"]
+
+    def _wrap(self, stored):
+        """Return a Notification object from a stored notification."""
+        notification = Notification(title=stored.db_title,
+                screen=stored.db_screen, app=stored.db_app,
+                folder=stored.db_folder, content=stored.db_content,
+                timestamp=stored.db_timestamp, db=stored.db_data,
+                group=stored.db_group)
+        notification.obj = self.obj
+        notification.handler = self
+        return notification
+
+    @property
+    def type_name(self):
+        return type(self.type).name
+
+    def all(self, start=0, count=None):
+        """
+        Return the notifications, oldest first.
+
+        Args:
+            start (int, optional): the number of most recent notifications
+                    to skip.
+            count (int, optional): the number of notifications to return
+                    (the most recent ones), all by default.
+
+        Returns:
+            notifications (list of Notification): the notifications.
+
+        """
+        stored = StoredNotification.objects.for_device(self.obj,
+                self.type_name, start, count)
+        return [self._wrap(notification) for notification in list(stored)[::-1]]
+
+    def count(self):
+        """Return the number of notifications."""
+        return StoredNotification.objects.filter(db_device=self.obj,
+                db_type=self.type_name).count()
+
+    def add(self, title, screen, app, folder="app", content="", db=None, group=None, timestamp=None):
         """Add a new notificaiton.
 
         Args:
@@ -386,6 +542,7 @@ class NotificationHandler(object):
             content (str, optional): the content of the notification.
             db (dict, optional): db attributes to give to the screen.
             group (str, optional): a group identifier [1].
+            timestamp (float, optional): the game time of the notification.
 
         [1] Notifications can be grouped using a group identifier.  Notifications
             that have this identifier can be removed.  This is useful in
@@ -394,22 +551,14 @@ class NotificationHandler(object):
             app, you want to remove the unread notification for this thread.
 
         """
-        timestamp = gametime.gametime(absolute=True)
-        kwargs = {
-                "title": title,
-                "screen": screen,
-                "app": app,
-                "folder": folder,
-                "content": content,
-                "db": db,
-                "group": group,
-                "timestamp": timestamp,
-        }
-        notification = Notification(**kwargs)
-        notification.obj = self.obj
-        notification.handler = self
-        self.db.append(kwargs)
-        return notification
+        if timestamp is None:
+            timestamp = gametime.gametime(absolute=True)
+
+        stored = StoredNotification.objects.notify(self.obj, self.type_name, db_title=title,
+                db_screen=screen, db_app=app, db_folder=folder,
+                db_content=content or "", db_data=db, db_group=group,
+                db_timestamp=timestamp)
+        return self._wrap(stored)
 
     def clear(self, group=None):
         """Clear all notifications, or all notifications from a group.
@@ -418,13 +567,7 @@ class NotificationHandler(object):
             group (str, optional): the optional name of the group to clear.
 
         """
-        if group is None:
-            while self.db:
-                del self.db[0]
-        elif self.db:
-            for kwargs in list(self.db):
-                if kwargs.get("group") == group:
-                    self.db.remove(kwargs)
+        StoredNotification.objects.clear_for(self.obj, self.type_name, group=group)
 
 
 class Notification(object):
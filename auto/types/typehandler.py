@@ -11,10 +11,12 @@ several types.  The specific data is stored in the object (or prototype) attribu
 from collections import OrderedDict
 
 from evennia.utils.utils import inherits_from
+from twisted.internet import defer
 
 from auto.types.clothes import Clothes
 from auto.types.container import Container
 from auto.types.high_tech import Computer, Phone
+from logic.object.bulk import add_tag, fan_out, tagged
 
 ## Constants
 # You can change the type order here, it will be reflected in the type list of every object.
@@ -39,6 +41,9 @@ class TypeHandler(object):
     def __init__(self, obj):
         self._obj = obj
         self._types = []
+        self._names = {}
+        self._has = {}
+        self._can = {}
         self._find_types()
 
     def __repr__(self):
@@ -52,21 +57,34 @@ class TypeHandler(object):
         return iter(self._types)
 
     def __contains__(self, name):
-        return name in [type(type_obj).name for type_obj in self._types]
+        return name in self._names
 
     def _find_types(self):
-        """Build the list of tyupes."""
-        sorted_types = list(TYPES.keys())
-        current_names = [type(type_obj).name for type_obj in self._types]
-        types = self._types
-        for name, obj_type in TYPES.items():
-            if name in current_names:
+        """
+        Build the list of types.
+
+        All the type tags are read at once (from the tag cache if it
+        has been prefetched, otherwise in one query).
+
+        """
+        names = self._obj.tags.get(category="obj_type", return_list=True)
+        for name in names:
+            if name in self._names or name not in TYPES:
                 continue
 
-            if self._obj.tags.get(name, category="obj_type"):
-                types.append(obj_type(self, self._obj))
+            type_obj = TYPES[name](self, self._obj)
+            self._types.append(type_obj)
+            self._names[name] = type_obj
 
-        types.sort(key=lambda type_obj: sorted_types.index(type(type_obj).name))
+        self._index()
+
+    def _index(self):
+        """Sort the types and reset the cached lookups."""
+        order = dict((name, i) for i, name in enumerate(TYPES.keys()))
+        self._types.sort(key=lambda type_obj: order[type(type_obj).name])
+        self._names = dict((type(type_obj).name, type_obj) for type_obj in self._types)
+        self._has.clear()
+        self._can.clear()
 
     def get(self, name):
         """Return the type of this specified name or None.
@@ -78,8 +96,7 @@ class TypeHandler(object):
             type: the type or None if not found.
 
         """
-        types = [obj_type for obj_type in self._types if type(obj_type).name == name]
-        return types[0] if types else None
+        return self._names.get(name)
 
     def add(self, name, recursive=True):
         """Add a new type for this object.
@@ -98,6 +115,14 @@ class TypeHandler(object):
             The type shouldn't be already present in this object's
             (or prototype's) type list.
 
+            Objects of a prototype are tagged and have their types
+            created in chunks that don't block the reactor, each chunk
+            in a transaction.
+
+        Returns:
+            deferred (Deferred): a deferred fired when all objects
+                    have been updated.
+
         Raises:
             KeyError: the type name couldn't be found.
 
@@ -114,13 +139,30 @@ class TypeHandler(object):
                 new_type = self.get(name)
                 new_type.at_type_creation(prototype=True)
                 if recursive:
-                    # This is a prototype, add the type to its objects
-                    for obj in getattr(self._obj, "objs", []):
-                        obj.types.add(name, recursive=False)
+                    # This is a prototype, add the type to its objects,
+                    # tagging them chunk by chunk
+                    ids = tagged(self._obj.key, "pobj")
+                    return fan_out(ids, lambda obj: obj.types._at_type_added(name),
+                            title="Adding type {} to {}".format(name, self._obj.key),
+                            prepare=lambda chunk: add_tag(chunk, name, "obj_type"))
             elif self._obj.db.prototype:
                 new_type = self.get(name)
                 new_type.at_type_creation(prototype=False)
 
+        return defer.succeed(None)
+
+    def _at_type_added(self, name):
+        """The type tag has been added in bulk, create the type.
+
+        Args:
+            name (str): name of the type that was added.
+
+        """
+        self._find_types()
+        new_type = self.get(name)
+        if new_type and self._obj.db.prototype:
+            new_type.at_type_creation(prototype=False)
+
     def remove(self, name):
         """Remove a type.
 
@@ -134,10 +176,15 @@ class TypeHandler(object):
         if name not in TYPES:
             raise KeyError("Unknown type: {}".format(name))
 
+        type_obj = self.get(name)
+        if type_obj and not inherits_from(self._obj, "typeclasses.prototypes.PObj"):
+            type_obj.at_type_removal()
+
         if self._obj.tags.get(name, category="obj_type"):
             self._obj.tags.remove(name, category="obj_type")
 
         self._types[:] = [type_obj for type_obj in self._types if type(type_obj).name != name]
+        self._index()
 
     def db(self, name):
         """
@@ -177,15 +224,15 @@ class TypeHandler(object):
 
         Note:
             A type supports a behavior if it has a method or attribute with
-            the same name.
+            the same name.  The result is cached until types change.
 
         """
-        types = []
-        for type in self._types:
-            if hasattr(type, name):
-                types.append(type)
+        types = self._has.get(name)
+        if types is None:
+            types = [type for type in self._types if hasattr(type, name)]
+            self._has[name] = types
 
-        return types
+        return list(types)
 
     def can(self, name):
         """
@@ -203,11 +250,12 @@ class TypeHandler(object):
             a list with the computer type if it is present on the
             handler, since the computer type has a `can_use` class attribute.
             Note that this class attribute can be a method too.
+            The result is cached until types change.
 
         """
-        types = []
-        for type in self._types:
-            if getattr(type, "can_{}".format(name), None):
-                types.append(type)
+        types = self._can.get(name)
+        if types is None:
+            types = [type for type in self._types if getattr(type, "can_{}".format(name), None)]
+            self._can[name] = types
 
-        return types
+        return list(types)
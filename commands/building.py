@@ -444,8 +444,9 @@ class CmdNew(UnixCommand):
 
         # Add types
         for name in types:
-            pobj.types.add(name)
-            self.msg("  Adding type '{}' to the object prototype.".format(name))
+            deferred = pobj.types.add(name)
+            deferred.addCallback(lambda _, name=name: self.msg(
+                    "  Adding type '{}' to the object prototype.".format(name)))
 
     def create_obj(self, args):
         """
@@ -8,8 +8,7 @@ from evennia import default_cmds
 from evennia.utils.utils import inherits_from
 
 from commands.command import Command
-from logic.geo import distance_between, get_direction, NAME_DIRECTIONS
-from typeclasses.vehicles import Crossroad, log
+from logic.geo import NAME_DIRECTIONS
 
 # Constants
 CATEGORY = "Driving"
@@ -136,82 +135,13 @@ class CmdPark(Command):
             self.msg("|rAre you, or are you not, in a vehicle?  Hard to say...|n")
             return
 
-        # Make sure we are currently driving
-        if vehicle.db.driver is not self.caller:
-            self.msg("|gYou aren't driving {}.|n".format(vehicle.key))
-            return
-
-        # Check the speed
-        if vehicle.db.speed > 10:
-            self.msg("|gYou are still driving too fast.|n")
-            return
-
-        # Get both sides of the current coordinate
-        x, y, z = vehicle.db.coords
-
-        # The Z coordinate could be invalid at this point, if there's a slope.
-        previous = vehicle.db.previous_crossroad
-        direction = vehicle.db.direction
-        distance = distance_between(int(round(x)), int(round(y)), 0,
-                previous.x, previous.y, 0)
-
-        if (x, y) != (previous.x, previous.y):
-            street = previous.db.exits[direction]
-
-            try:
-                assert distance > 0
-                x, y, z = street["coordinates"][distance - 1]
-            except AssertionError:
-                x, y, z = previous.x, previous.y, previous.z
-            except IndexError:
-                log.warning("Cannot find the Z coordinate for vehicle " \
-                        "#{}, trying to park at {} {}.".format(
-                        vehicle.id, x, y))
-
-                self.msg("|gIt seems you can't park here.|n")
-                return
+        try:
+            infos = vehicle.park(self.caller, self.args)
+        except ValueError as err:
+            self.msg(str(err))
         else:
-            self.msg("|gNow, you cannot park in the middle of a crossroad.|n")
-            return
-
-        # Get the matching street
-        log.debug("Parking #{} on {} {} {}".format(vehicle.id, x, y, z))
-        closest, name, streets = Crossroad.get_street(x, y, z)
-        if not streets:
-            self.msg("|gYou don't find any free spot to park.|n")
-            return
-
-        # Park left of right, according to the specified direction
-        args = self.args if self.args.strip() else get_direction((direction + 2) % 8)["name"]
-        infos = get_direction(args)
-        if infos is None or infos["direction"] in (8, 9):
-            self.msg("|rYou have specified an unknown direction: {}.|n".format(self.args))
-            return
-
-        side_direction = infos["direction"]
-        if (side_direction + 2) % 8 != direction and (side_direction - 2) % 8 != direction:
-            self.msg("|r{} isn't a valid direction in which to park.|n\n|gCheck the street direction.|n".format(infos["name"]))
-            return
-
-        spot = streets.get(side_direction)
-        log.debug("  Parking #{} in {}, found {}".format(vehicle.id, infos["name"], spot))
-
-        # If there's no room there
-        if spot and spot["room"] is None:
-            self.msg("|gYou don't find any free spot to park.|n")
-            return
-
-        room = spot["room"]
-        vehicle.location = room
-        vehicle.stop()
-        numbers = "-".join(str(n) for n in spot["numbers"])
-        self.caller.msg("You park {} on the {sidewalk} sidewalk.".format(
-                vehicle.key, sidewalk=infos["name"]))
-        self.caller.location.msg_contents("{driver} parks {vehicle} on the {sidewalk} sidewalk.",
-                exclude=[self.caller], mapping=dict(driver=self.caller,
-                vehicle=vehicle, sidewalk=infos["name"]))
-        vehicle.msg_contents("{vehicle} pulls up in front of {numbers} {street}",
-                mapping=dict(vehicle=vehicle, numbers=numbers, street=name))
+            self.msg("You park {} on the {sidewalk} sidewalk.".format(
+                    vehicle.key, sidewalk=infos["name"]))
 
 
 class CmdSpeed(Command):
@@ -270,36 +200,15 @@ class CmdSpeed(Command):
             self.msg("|rAre you, or are you not, in a vehicle?  Hard to say.|n..")
             return
 
-        # Make sure we are currently driving
-        if vehicle.db.driver is not self.caller:
-            self.msg("|gYou aren't driving {}|n.".format(vehicle.key))
-            return
-
-        # If the vehicle is parked, un-park it
-        if vehicle.location is not None:
-            vehicle.location = None
-
         # Change the speed
-        current = vehicle.db.speed
         desired = self.args.strip()
-
         try:
-            desired = int(desired)
-            assert desired >= 0
-        except (ValueError, AssertionError):
-            self.msg("|rSorry, this is not a valid speed.|n")
+            vehicle.set_speed(self.caller, desired)
+        except ValueError as err:
+            self.msg(str(err))
         else:
-            vehicle.db.desired_speed = desired
             self.msg("You're now planning to drive at {} MPH.".format(desired))
 
-            # Display a message to the vehicle if the speed changes
-            if current < desired:
-                vehicle.msg_contents("{} begins to speed up.".format(
-                        vehicle.key))
-            elif current > desired:
-                vehicle.msg_contents("{} begins to slow down.".format(
-                        vehicle.key))
-
 
 class CmdTurn(Command):
 
@@ -355,24 +264,17 @@ class CmdTurn(Command):
             self.msg("|rAre you, or are you not, in a vehicle?  Hard to say.|n..")
             return
 
-        # Make sure we are currently driving
-        if vehicle.db.driver is not self.caller:
-            self.msg("|gYou aren't driving {}.|n".format(vehicle.key))
-            return
-
         # Proceed to turn
         name = self.raw_string.strip().lower()
         if name.startswith("turn "):
             name = name[5:]
 
-        direction = vehicle.db.direction
-        infos = get_direction(name)
-        if infos is None or infos["direction"] in (8, 9):
-            self.msg("|gThe direction you specified is unknown.|n")
-            return
-
-        vehicle.db.expected_direction = infos["direction"]
-        self.msg("You prepare to turn {} on the next open crossroad.".format(infos["name"]))
+        try:
+            infos = vehicle.prepare_turn(self.caller, name)
+        except ValueError as err:
+            self.msg(str(err))
+        else:
+            self.msg("You prepare to turn {} on the next open crossroad.".format(infos["name"]))
 
 
 class DrivingCmdSet(default_cmds.CharacterCmdSet):
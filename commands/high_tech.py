@@ -144,7 +144,7 @@ class ComputerCmdSet(CmdSet):
         if obj:
             type = obj.types.get("computer")
             type.apps.load(self.cmdsetobj)
-            screen, app_name, folder = type.db["current_screen"]
+            screen, app_name, folder = type.ui["current_screen"]
             app = None
             if app_name:
                 app = type.apps.get(app_name, folder)
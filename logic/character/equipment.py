@@ -19,6 +19,7 @@ Some `can_*` methods can receive either a single object or a list of objects.
 Additionally, this handler is responsible for the inventory and smooth
 equipment nesting:
     character.equipment.limbs: return the dictionary of limbs for that character.
+    character.equipment.equiped: return the cached dictionary of {limb key: object}.
     character.equipment.first_level: return a dictionary of
             {limb: equiped_or_held_object}
     character.equipment.all(): return all objects on that equipment and what
@@ -34,9 +35,55 @@ from evennia.utils.utils import inherits_from
 
 from logic.character.limbs import Limb
 from logic.character import limbs as LIMBS
+from logic.object.bulk import get_tags, prefetch
 from logic.object.sets import ContainerSet, ObjectSet
 from world.log import character as log
 
+# Memoized limb definitions, {limb set name: OrderedDict of {key: limb}}
+_LIMB_SETS = {}
+
+def _build_limbs(limbs, character):
+    """Check a list of limbs and return the ordered dictionary of key: limb."""
+    if not isinstance(limbs, list) or not all([isinstance(limb, Limb) for limb in limbs]):
+        raise ValueError("the character {!r} has an incorrect list of limbs".format(character))
+
+    ret = OrderedDict()
+    for limb in limbs:
+        ret[limb.key] = limb
+
+    return ret
+
+def get_limbs(name, character=None):
+    """
+    Return the ordered dictionary of limbs for this limb set name.
+
+    Limb sets are defined in the `logic.character.limbs` module.  They
+    are checked and converted only once, then kept in memory.
+
+    Args:
+        name (str): the name of the limb set, like "HUMAN".
+        character (Character, optional): the character, for error messages.
+
+    Returns:
+        limbs (OrderedDict): the limbs as {key: limb}.  This dictionary
+                is shared, it should not be modified.
+
+    Raises:
+        ValueError: the limb set name is incorrect.
+
+    """
+    limbs = _LIMB_SETS.get(name)
+    if limbs is None:
+        if not name.isupper():
+            raise ValueError("the character {!r} has an incorrect name of limbs: {!r}".format(character, name))
+        if not hasattr(LIMBS, name):
+            raise ValueError("the character {!r} has a name of limbs which can't be found in the limbs module: {!r}".format(character, name))
+
+        limbs = _build_limbs(getattr(LIMBS, name), character)
+        _LIMB_SETS[name] = limbs
+
+    return limbs
+
 class EquipmentHandler(object):
 
     """Equipment handler for characters.
@@ -48,30 +95,107 @@ class EquipmentHandler(object):
 
     def __init__(self, character):
         self.character = character
+        self._equiped = None
+        self._tree = None
 
     @property
     def limbs(self):
         """Return the ordered dictionary of key: limb."""
-        ret = OrderedDict()
         limbs = self.character.attributes.get("custom_limbs")
         if limbs is None:
             # Assume that `character.db.limbs` contain the name of the list.
             name = self.character.attributes.get("limbs", "HUMAN")
-            if not name.isupper():
-                raise ValueError("the character {!r} has an incorrect name of limbs: {!r}".format(self.character, name))
-            if not hasattr(LIMBS, name):
-                raise ValueError("the character {!r} has a name of limbs which can't be found in the limbs module: {!r}".format(self.character, name))
+            return get_limbs(name, self.character)
+
+        return _build_limbs(limbs, self.character)
+
+    @property
+    def equiped(self):
+        """
+        Return the dictionary of {limb key: object} for this character.
 
-            limbs = getattr(LIMBS, name)
+        The dictionary is built from a single tag query the first time,
+        then kept in memory.  It is updated when objects move in or out
+        of the character, or when their "eq" tag changes.
 
-        # Check that the list of limbs is a list of Limb objects
-        if not isinstance(limbs, list) or not all([isinstance(limb, Limb) for limb in limbs]):
-            raise ValueError("the character {!r} has an incorrect list of limbs".format(self.character))
+        """
+        if self._equiped is None:
+            contents = self.character.contents
+            tags = get_tags([obj.id for obj in contents], "eq")
+            equiped = {}
+            for obj in contents:
+                for key in tags.get(obj.id, []):
+                    equiped.setdefault(key, obj)
+            self._equiped = equiped
+
+        return self._equiped
+
+    def update(self, obj):
+        """
+        Update the cached equipment for this object.
 
-        for limb in limbs:
-            ret[limb.key] = limb
+        This method is called when the object has moved in or out of
+        the character, or when its "eq" tag has changed.
 
-        return ret
+        Args:
+            obj (Object): the object to update.
+
+        """
+        self._tree = None
+        equiped = self._equiped
+        if equiped is None:
+            return
+
+        for key, other in list(equiped.items()):
+            if other == obj:
+                del equiped[key]
+
+        if obj.pk and obj.location == self.character:
+            for key in obj.tags.get(category="eq", return_list=True):
+                equiped.setdefault(key, obj)
+
+    def invalidate(self):
+        """
+        Invalidate the cached inventory tree.
+
+        This method is called when an object has moved in or out of
+        one of the character's containers, at any depth.
+
+        """
+        self._tree = None
+
+    @property
+    def tree(self):
+        """
+        Return the inventory tree of this character.
+
+        The tree is a list of tuples (obj, depth, limb_key), in the order
+        of exploration: a first-level object (depth 1, with its limb key
+        or None), then its contents (depth 2, limb key None), and so on.
+        It is built in a single pass, then kept in memory until an object
+        moves in or out of the character's inventory.
+
+        """
+        if self._tree is None:
+            contents = self.character.contents
+            tree = []
+            explored = set([self.character.id])
+            to_explore = [(obj, 1) for obj in reversed(contents)]
+            while to_explore:
+                obj, depth = to_explore.pop()
+                if obj is None or obj.id in explored:
+                    # Protect against infinite recursion
+                    continue
+
+                explored.add(obj.id)
+                tree.append((obj, depth))
+                to_explore.extend((content, depth + 1) for content in reversed(obj.contents))
+
+            prefetch([obj for obj, depth in tree])
+            self._tree = [(obj, depth, obj.tags.get(category="eq") if depth == 1 else None)
+                    for obj, depth in tree]
+
+        return self._tree
 
     @property
     def first_level(self):
@@ -89,14 +213,10 @@ class EquipmentHandler(object):
                     (or None) as value.
 
         """
-        limbs = self.limbs.values()
+        equiped = self.equiped
         first_level = OrderedDict()
-
-        # Get all contents, we'll filter afterward
-        contents = self.character.contents
-        for limb in limbs:
-            objs = [obj for obj in contents if obj.tags.get(limb.key, category="eq")]
-            first_level[limb] = objs[0] if objs else None
+        for limb in self.limbs.values():
+            first_level[limb] = equiped.get(limb.key)
 
         return first_level
 
@@ -121,27 +241,16 @@ class EquipmentHandler(object):
             recursively checking for contents.
 
         """
-        def _explore_contents(to_update, objects):
-            for obj in objects:
-                to_update.append(obj)
-                _explore_contents(to_update, obj.contents)
-
         objs = []
         looker = looker or self.character
-        for obj in self.character.contents:
-            if obj is not None:
-                if only_visible and not obj.access(looker, "view"):
-                    # this is not visible to the character, skip
-                    continue
+        visible = True
+        for obj, depth, _ in self.tree:
+            if depth == 1 and only_visible:
+                # Only first-level objects are checked, their contents follow
+                visible = obj.access(looker, "view")
 
+            if visible:
                 objs.append(obj)
-                for content in obj.contents:
-                    if content in objs:
-                        # Protect against infinite recursion
-                        continue
-
-                    objs.append(content)
-                    _explore_contents(objs, content.contents)
 
         return objs
 
@@ -179,33 +288,27 @@ class EquipmentHandler(object):
         limbs = self.limbs
         nested = ContainerSet()
         nested.default_factory = ObjectSet
-        objs = self.all(only_visible=True, looker=looker)
+        visible = True
 
         # If only_show, apply a filter
         for obj in list(only_show):
             while obj.location and obj.location != self.character:
                 obj = obj.location
                 only_show.append(obj)
+        only_show = set(only_show)
 
-        for obj in objs:
-            depth = 0
-            if obj != self.character and only_show and obj not in only_show:
-                continue
+        for obj, depth, limb_key in self.tree:
+            if depth == 1:
+                visible = obj.access(looker, "view")
 
-            parent = obj
-            while parent != self.character:
-                depth += 1
-                parent = parent.location
-                if parent is None:
-                    obj = None
-                    break
+            if not visible:
+                continue
 
-            if obj is None:
+            if only_show and obj not in only_show:
                 continue
 
             # If a first level object, try to get the limb
-            if obj.location == self.character:
-                limb_key = obj.tags.get(category="eq")
+            if depth == 1:
                 if limb_key is None:
                     log.warning("Character {}(#{}): the object {}(#{}) was found in the inventory without a proper container or limb attached to it".format(
                             self.character.key, self.character.id, obj.key, obj.id))
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module containing the stat scheduler, to regenerate stats and expire modifiers.
+
+A single scheduler (`SCHEDULER`) handles all characters.  Rather than
+having one script or ticker per character, the scheduler is called at
+a fixed interval (see the `tickers.stats` module) and updates all
+watched characters at once:
+    Regeneration: the vitality (`p_vit`, `m_vit`) goes up and the
+            weariness (`p_wea`, `m_wea`) goes down with time.  The
+            fractions of points are accumulated in one array per stat,
+            indexed by character, and the stat is only modified when a
+            whole point has been gained or lost.  Characters whose stats
+            are all at rest, and dead characters, are no longer watched.
+    Timed modifiers: `SCHEDULER.add_modifier(stat, value, duration)`
+            changes the stat modifier and schedules its removal.
+            Modifiers are kept in a heap ordered by expiry time, so
+            only expired modifiers are examined at each tick.  The heap
+            refers to the character and stat name, not to the stat
+            itself, so that modifiers are removed from the current
+            stats of the character (`character.stats`).
+
+"""
+
+from array import array
+import heapq
+import time
+
+from django.conf import settings
+from evennia.objects.models import ObjectDB
+
+from world.log import character as log
+
+## Constants
+REGEN_INTERVAL = getattr(settings, "STATS_REGEN_INTERVAL", 5)
+
+class StatScheduler(object):
+
+    """Central scheduler for stat regeneration and timed modifiers."""
+
+    # Regeneration rates, in points per second
+    rates = {
+        "p_vit": 0.1,
+        "m_vit": 0.1,
+        "p_wea": -0.5,
+        "m_wea": -0.5,
+    }
+
+    def __init__(self):
+        self.handlers = []
+        self.rows = {}
+        self.pending = dict((name, array("d")) for name in self.rates)
+        self.modifiers = []
+        self.scheduled = {}
+        self.last_tick = None
+        self._counter = 0
+
+    def watch(self, handler):
+        """
+        Watch the stats of a character, to regenerate them.
+
+        Args:
+            handler (StatsHandler): the stats handler of the character.
+
+        """
+        key = handler.character.pk
+        if key is None:
+            return
+
+        row = self.rows.get(key)
+        if row is not None:
+            # A new stats handler replaces the previous one
+            self.handlers[row] = handler
+            return
+
+        self.rows[key] = len(self.handlers)
+        self.handlers.append(handler)
+        for column in self.pending.values():
+            column.append(0.0)
+
+    def unwatch(self, handler):
+        """
+        Stop watching the stats of a character.
+
+        The last row is moved in place of the removed one, so that
+        arrays stay contiguous.
+
+        Args:
+            handler (StatsHandler): the stats handler of the character.
+
+        """
+        key = handler.character.pk
+        row = self.rows.get(key)
+        if row is None or self.handlers[row] is not handler:
+            return
+
+        del self.rows[key]
+
+        last = len(self.handlers) - 1
+        if row != last:
+            moved = self.handlers[last]
+            self.handlers[row] = moved
+            self.rows[moved.character.pk] = row
+            for column in self.pending.values():
+                column[row] = column[last]
+
+        self.handlers.pop()
+        for column in self.pending.values():
+            column.pop()
+
+    def add_modifier(self, stat, value, duration, now=None):
+        """
+        Add a timed modifier to a stat.
+
+        Args:
+            stat (Stat): the stat to modify.
+            value (int or float): the value to add to the stat modifier.
+            duration (int or float): the duration of the modifier, in seconds.
+            now (float, optional): the current time.
+
+        """
+        now = time.time() if now is None else now
+        expires_at = now + duration
+        stat.timed.append((expires_at, value))
+        stat.mod += value
+        self.schedule(stat, expires_at, value)
+
+    def schedule(self, stat, expires_at, value):
+        """
+        Schedule the expiry of a stat modifier, already applied.
+
+        A modifier is only scheduled once, even if the stats of the
+        character are read again from the database.
+
+        """
+        character = stat.character
+        if character is None or not character.pk:
+            return
+
+        key = (character.pk, stat.name, expires_at, value)
+        if self.scheduled.get(key, 0) >= stat.timed.count((expires_at, value)):
+            return
+
+        self.scheduled[key] = self.scheduled.get(key, 0) + 1
+        self._counter += 1
+        heapq.heappush(self.modifiers, (expires_at, self._counter, key))
+
+    def tick(self, now=None):
+        """
+        Regenerate the stats and expire the modifiers.
+
+        Args:
+            now (float, optional): the current time.
+
+        """
+        now = time.time() if now is None else now
+        elapsed = now - self.last_tick if self.last_tick is not None else 0
+        self.last_tick = now
+        self.expire(now)
+        if elapsed > 0:
+            self.regenerate(elapsed)
+
+    def expire(self, now):
+        """Remove the expired modifiers."""
+        modifiers = self.modifiers
+        while modifiers and modifiers[0][0] <= now:
+            expires_at, _, key = heapq.heappop(modifiers)
+            count = self.scheduled.pop(key, 1) - 1
+            if count:
+                self.scheduled[key] = count
+
+            pk, name, expires_at, value = key
+            try:
+                character = ObjectDB.objects.get(id=pk)
+            except ObjectDB.DoesNotExist:
+                continue
+
+            stat = getattr(character.stats, name)
+            if (expires_at, value) not in stat.timed:
+                # The modifier has already been removed
+                continue
+
+            stat.timed.remove((expires_at, value))
+            try:
+                stat.mod -= value
+            except Exception:
+                log.exception("An error occurred while expiring a modifier on {!r}".format(stat))
+
+    def regenerate(self, elapsed):
+        """Regenerate the stats of watched characters.
+
+        Dead characters (without physical vitality) don't regenerate
+        and are no longer watched.
+
+        """
+        dead = [handler.p_vit.current <= 0 or bool(handler.character.db.dead)
+                for handler in self.handlers]
+        at_rest = [True] * len(self.handlers)
+        for name, rate in self.rates.items():
+            column = self.pending[name]
+            delta = rate * elapsed
+            for row, handler in enumerate(self.handlers):
+                if dead[row]:
+                    column[row] = 0.0
+                    continue
+
+                stat = getattr(handler, name)
+                limit = stat.max if rate > 0 else stat.min
+                if limit is not None and (stat.base - limit) * rate >= 0:
+                    column[row] = 0.0
+                    continue
+
+                at_rest[row] = False
+                column[row] += delta
+                points = int(column[row])
+                if points:
+                    column[row] -= points
+                    try:
+                        stat.base += points
+                    except Exception:
+                        log.exception("An error occurred while regenerating {!r}".format(stat))
+
+        for handler in [handler for row, handler in enumerate(self.handlers) if at_rest[row]]:
+            self.unwatch(handler)
+
+
+SCHEDULER = StatScheduler()
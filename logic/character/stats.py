@@ -27,6 +27,7 @@ But they're really objects with other properties.
     stat.mod: get/set the modifier, a number. base+mod is the stat current value.
     stat.min: get/set the stat minimum value. A stat cannot go beyond it.
     stat.max: get/set the stat maximum value. A stat cannot go beyond it.
+    stat.timed: the list of timed modifiers, as (expires_at, value) tuples.
 
 A few examples:
     character.stats.p_str.base # Get the current base of the physical strength
@@ -36,9 +37,48 @@ A few examples:
     character.stats.p_vit.min # Get the minimum value of p_health (0)
     character.stats.p_vit.max # Get the maximum value of p_health (100 except modifiers)
 
+Vitality and weariness regenerate with time, and timed modifiers can
+be added to any stat, through the scheduler (see `logic.character.regen`):
+    SCHEDULER.add_modifier(character.stats.p_str, 2, 60) # +2 for 1 minute
+
+Stats are kept in memory: changing a stat doesn't write to the database
+right away.  Modified stats are marked as dirty and written in a single
+attribute write per character (`handler.flush()`).  Dirty handlers are
+flushed every `STATS_FLUSH_INTERVAL` seconds (see `flush_all` and the
+`tickers.stats` module), when the character is unpuppeted and when the
+server stops or reloads.
+
 """
 
-from evennia.utils.utils import lazy_property
+from django.conf import settings
+
+from logic.character.regen import SCHEDULER
+from world.log import character as log
+
+## Constants
+FLUSH_INTERVAL = getattr(settings, "STATS_FLUSH_INTERVAL", 10)
+
+# Handlers with dirty stats, {character ID: handler}
+_DIRTY = {}
+
+def flush_all():
+    """
+    Flush all the stats handlers with dirty stats.
+
+    Returns:
+        flushed (int): the number of flushed handlers.
+
+    """
+    handlers = list(_DIRTY.values())
+    _DIRTY.clear()
+    for handler in handlers:
+        try:
+            handler.flush()
+        except Exception:
+            log.exception("An error occurred while saving the stats of {}(#{})".format(
+                    handler.character, handler.character.id))
+
+    return len(handlers)
 
 class StatsHandler(object):
 
@@ -72,6 +112,7 @@ class StatsHandler(object):
     def __init__(self, character):
         self.character = character
         self._in_cache = {}
+        self._dirty = set()
 
     @property
     def p_vit(self):
@@ -190,7 +231,7 @@ class StatsHandler(object):
         """Change the mental charisma."""
         self._error_set("m_cha", value)
 
-    @lazy_property
+    @property
     def db_read(self):
         """Return the database in which to read only, not write.
 
@@ -228,6 +269,49 @@ class StatsHandler(object):
         self._in_cache["db"] = db
         return db
 
+    @property
+    def dirty(self):
+        """Return the names of the stats that haven't been saved yet."""
+        return set(self._dirty)
+
+    def mark_dirty(self, name):
+        """
+        Mark a stat as modified, to be saved at the next flush.
+
+        Args:
+            name (str): the name of the modified stat.
+
+        """
+        self._dirty.add(name)
+        if self.character.pk:
+            _DIRTY[self.character.pk] = self
+            if name in SCHEDULER.rates:
+                SCHEDULER.watch(self)
+
+    def flush(self):
+        """
+        Save the dirty stats, in one attribute write.
+
+        Stats that haven't been modified are kept as they were saved.
+
+        """
+        _DIRTY.pop(self.character.pk, None)
+        if not self._dirty or not self.character.pk:
+            return
+
+        stats = {}
+        for name, values in self.db_read.items():
+            stats[name] = dict(values)
+
+        for name in self._dirty:
+            stat = self._in_cache.get(name)
+            if stat is not None:
+                stats[name] = stat.serialize()
+
+        self._dirty.clear()
+        self.character.db.stats = stats
+        self._in_cache["db"] = self.character.db.stats
+
     def _retrieve(self, name, from_class=None, default=None):
         """Retrieve the stat from the cache, or create it."""
         from_class = from_class or Stat
@@ -246,6 +330,13 @@ class StatsHandler(object):
             # Create the stat
             stat = from_class(self, name, **kwargs)
             self._in_cache[name] = stat
+
+            # Schedule the timed modifiers and regeneration
+            for expires_at, value in stat.timed:
+                SCHEDULER.schedule(stat, expires_at, value)
+            if name in SCHEDULER.rates and self.character.pk:
+                SCHEDULER.watch(self)
+
             return stat
 
     def _error_set(self, name, value):
@@ -266,13 +357,14 @@ class Stat(object):
 
     """
 
-    def __init__(self, handler, name, base=10, mod=0, min=None, max=None):
+    def __init__(self, handler, name, base=10, mod=0, min=None, max=None, timed=None):
         self.handler = handler
         self.name = name
         self._base = base
         self._mod = mod
         self._min = min
         self._max = max
+        self.timed = [tuple(modifier) for modifier in timed or []]
 
     @property
     def character(self):
@@ -340,21 +432,29 @@ class Stat(object):
         if self._max is not None and self._base > self._max:
             self._base = self._max
 
-    def _save(self):
-        """Save the stat in the handler.
-
-        This should be done automatically and shouldn't have to be called directly.
-
-        """
-        handler = self.handler
-        db = handler.db_write
-        db[self.name] = {
+    def serialize(self):
+        """Return the dictionary of values to be saved for this stat."""
+        values = {
                 "base": self._base,
                 "mod": self._mod,
         }
 
         if self._max is not None:
-            db[self.name].update({"max": self._max})
+            values["max"] = self._max
+
+        if self.timed:
+            values["timed"] = list(self.timed)
+
+        return values
+
+    def _save(self):
+        """Mark the stat as dirty in the handler.
+
+        This should be done automatically and shouldn't have to be called directly.
+        The stat will be written to the database when the handler is flushed.
+
+        """
+        self.handler.mark_dirty(self.name)
 
     def hit(self, old_value, new_value):
         """The base of this stat has changed.
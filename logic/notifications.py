@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+"""Module containing the notification queue.
+
+Apps don't deliver their notifications right away: `BaseApp.notify`
+adds a delivery job to the queue, and the queue is processed in
+batches at a fixed interval (see the `tickers.notifications` module).
+The command sending a text, for instance, doesn't have to wait for
+all its recipients to be notified.
+
+Processing a batch:
+    Jobs for the same device and notification group are coalesced:
+            only the most recent is delivered, but it keeps the place
+            and time of the first one in the queue.
+    Jobs are grouped by location, then by device, so that the room
+            of a device is only looked up once per batch.
+    The delivery latency (the time between queuing and delivery)
+            is recorded, the most recent ones being kept in `latencies`.
+
+Use the `QUEUE` object:
+    QUEUE.add(app, obj, title, ...): queue a notification.
+    QUEUE.discard(obj, group): remove queued notifications.
+    QUEUE.process(): deliver a batch of notifications.
+
+"""
+
+from collections import OrderedDict, deque
+import time
+
+from django.conf import settings
+from evennia.utils.utils import inherits_from
+
+from world.log import logger
+
+## Constants
+NOTIFY_INTERVAL = getattr(settings, "NOTIFICATION_INTERVAL", 1)
+BATCH_SIZE = getattr(settings, "NOTIFICATION_BATCH_SIZE", 200)
+log = logger("notifications")
+
+class NotificationQueue(object):
+
+    """Queue of notifications to deliver."""
+
+    def __init__(self):
+        self.jobs = OrderedDict()
+        self.latencies = deque(maxlen=100)
+        self.delivered = 0
+        self._counter = 0
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def add(self, app, obj, title, message="", content="", screen=None,
+            db=None, group=None, now=None):
+        """
+        Queue a notification.
+
+        Args:
+            app (App class): the application sending the notification.
+            obj (Object): the object being notified.
+            title (str): the title of the notification.
+            message (str, optional): the message to be displayed by the location.
+            content (str, optional): the content of the notification.
+            screen (str, optional): the screen's path.
+            db (dict, optional): the optional arguments to give to the screen.
+            group (str, optional): the notification group.
+            now (float, optional): the current time.
+
+        Note:
+            If a notification of the same group is already queued for
+            this object, it is replaced.
+
+        """
+        now = time.time() if now is None else now
+        if group is None:
+            self._counter += 1
+            key = (obj.pk, self._counter)
+        else:
+            key = (obj.pk, group)
+
+        previous = self.jobs.get(key)
+        queued_at = previous[-1] if previous else now
+        self.jobs[key] = (app, obj, title, message, content, screen, db,
+                group, queued_at)
+
+    def discard(self, obj, group=None):
+        """
+        Remove the queued notifications of an object.
+
+        Args:
+            obj (Object): the object being notified.
+            group (str, optional): the notification group.  If not
+                    set, remove all notifications for this object.
+
+        """
+        if group is not None:
+            self.jobs.pop((obj.pk, group), None)
+        else:
+            for key in [key for key in self.jobs if key[0] == obj.pk]:
+                del self.jobs[key]
+
+    def process(self, count=BATCH_SIZE, now=None):
+        """
+        Deliver a batch of notifications.
+
+        Args:
+            count (int, optional): the maximum number of notifications
+                    to deliver.  If None, deliver all queued notifications.
+            now (float, optional): the current time.
+
+        Returns:
+            delivered (int): the number of delivered notifications.
+
+        """
+        jobs = []
+        while self.jobs and (count is None or len(jobs) < count):
+            jobs.append(self.jobs.popitem(last=False)[1])
+
+        if not jobs:
+            return 0
+
+        # Group jobs by location and device
+        jobs.sort(key=lambda job: (job[1].db_location_id or 0, job[1].pk or 0))
+        rooms = {}
+        for app, obj, title, message, content, screen, db, group, queued_at in jobs:
+            location = obj.location
+            key = location.pk if location else None
+            if key not in rooms:
+                rooms[key] = find_room(location)
+
+            try:
+                app.deliver(obj, title, message, content, screen, db, group,
+                        room=rooms[key])
+            except Exception:
+                log.exception("An error occurred while notifying {}(#{})".format(obj, obj.id))
+
+        now = time.time() if now is None else now
+        latencies = [now - job[-1] for job in jobs]
+        self.latencies.extend(latencies)
+        self.delivered += len(jobs)
+        log.debug("Delivered {} notifications (max latency={}s, {} left)".format(
+                len(jobs), round(max(latencies), 3), len(self.jobs)))
+        return len(jobs)
+
+
+def find_room(location):
+    """Return the room containing this location, or None."""
+    while location is not None and not inherits_from(location, "typeclasses.rooms.Room"):
+        location = location.location
+
+    return location
+
+
+QUEUE = NotificationQueue()
@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+
+"""Module containing bulk operations on objects.
+
+Prototypes can have thousands of objects, characters or rooms.  Updating
+them one at a time (querying and updating tags for each, calling hooks
+on each) would block the reactor for a long time.  The functions in this
+module update tags with set-based queries inside a transaction, and call
+per-object hooks in chunks, giving control back to the reactor between
+chunks.
+
+Functions:
+    tagged(key, category): return the IDs of objects having this tag.
+    get_tags(ids, category): return the tags of several objects in a category.
+    add_tag(ids, key, category): add a tag to several objects at once.
+    rename_tag(old_key, new_key, category): rename a tag on all objects.
+    fan_out(ids, callback): call a callback on objects, in chunks.
+    prefetch(objs): load the tags and attributes of several objects at once.
+    prefetch_contents(location): prefetch the contents of a location.
+
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+from evennia.objects.models import ObjectDB
+from evennia.typeclasses.tags import Tag
+from twisted.internet import defer, task
+
+from world.log import tasks as log
+
+## Constants
+CHUNK_SIZE = 100
+TAG_MODEL = "objectdb"
+_THROUGH = ObjectDB.db_tags.through
+_ATTR_THROUGH = ObjectDB.db_attributes.through
+
+## Functions
+def _get_tag(key, category):
+    """Return the Tag object or None."""
+    return Tag.objects.filter(db_key=key, db_category=category,
+            db_model=TAG_MODEL, db_tagtype=None).first()
+
+def _clean(key, category):
+    """Return the key and category as the tag handler would store them."""
+    key = str(key).strip().lower()
+    category = category.strip().lower() if category else category
+    return key, category
+
+def reset_tag_caches(ids):
+    """
+    Reset the tag cache of the objects currently in memory.
+
+    Args:
+        ids (iterable of int): the IDs of the objects to reset.
+
+    Note:
+        Objects that are not in memory, or whose tag handler hasn't
+        been created yet, are left alone: they will read their tags
+        from the database when needed.
+
+    """
+    ids = set(ids)
+    for obj in ObjectDB.get_all_cached_instances():
+        if obj.id in ids and "tags" in obj.__dict__:
+            obj.tags.reset_cache()
+
+def tagged(key, category):
+    """
+    Return the IDs of the objects having this tag.
+
+    Args:
+        key (str): the tag key.
+        category (str): the tag category.
+
+    Returns:
+        ids (list of int): the IDs of the tagged objects.
+
+    """
+    key, category = _clean(key, category)
+    return list(_THROUGH.objects.filter(tag__db_key=key,
+            tag__db_category=category, tag__db_model=TAG_MODEL,
+            tag__db_tagtype=None).values_list("objectdb_id", flat=True))
+
+def get_tags(ids, category):
+    """
+    Return the tag keys of several objects for a category, in one query.
+
+    Args:
+        ids (list of int): the IDs of the objects to query.
+        category (str): the tag category.
+
+    Returns:
+        tags (dict): a dictionary of {object ID: list of tag keys}.
+                Objects without tag in this category are not present.
+
+    """
+    _, category = _clean("", category)
+    tags = defaultdict(list)
+    for obj_id, key in _THROUGH.objects.filter(objectdb_id__in=list(ids),
+            tag__db_category=category, tag__db_model=TAG_MODEL,
+            tag__db_tagtype=None).values_list("objectdb_id", "tag__db_key"):
+        tags[obj_id].append(key)
+
+    return dict(tags)
+
+def add_tag(ids, key, category):
+    """
+    Add a tag to several objects at once.
+
+    Args:
+        ids (list of int): the IDs of the objects to tag.
+        key (str): the tag key.
+        category (str): the tag category.
+
+    Returns:
+        added (list of int): the IDs of the objects that didn't have
+                this tag before.
+
+    """
+    key, category = _clean(key, category)
+    ids = list(ids)
+    with transaction.atomic():
+        tag, _ = Tag.objects.get_or_create(db_key=key, db_category=category,
+                db_model=TAG_MODEL, db_tagtype=None)
+        existing = set(_THROUGH.objects.filter(tag=tag,
+                objectdb_id__in=ids).values_list("objectdb_id", flat=True))
+        added = [id for id in ids if id not in existing]
+        _THROUGH.objects.bulk_create([_THROUGH(objectdb_id=id, tag_id=tag.id)
+                for id in added])
+
+    reset_tag_caches(added)
+    return added
+
+def rename_tag(old_key, new_key, category):
+    """
+    Rename a tag for all the objects having it.
+
+    Args:
+        old_key (str): the current key of the tag.
+        new_key (str): the new key of the tag.
+        category (str): the tag category.
+
+    Returns:
+        ids (list of int): the IDs of the objects whose tag was renamed.
+
+    Note:
+        If no tag with `new_key` exists, the tag is simply renamed
+        (one query).  Otherwise, objects are moved to the existing tag.
+
+    """
+    old_key, category = _clean(old_key, category)
+    new_key, _ = _clean(new_key, category)
+    with transaction.atomic():
+        old = _get_tag(old_key, category)
+        if old is None:
+            return []
+
+        ids = list(_THROUGH.objects.filter(tag=old).values_list(
+                "objectdb_id", flat=True))
+        new = _get_tag(new_key, category)
+        if new is None:
+            Tag.objects.filter(id=old.id).update(db_key=new_key)
+        else:
+            already = _THROUGH.objects.filter(tag=new,
+                    objectdb_id__in=ids).values_list("objectdb_id", flat=True)
+            _THROUGH.objects.filter(tag=old).exclude(
+                    objectdb_id__in=list(already)).update(tag=new)
+            old.delete()
+
+    reset_tag_caches(ids)
+    log.info("Renamed tag {!r} to {!r} (category={!r}) on {} objects".format(
+            old_key, new_key, category, len(ids)))
+    return ids
+
+def fan_out(ids, callback, chunk_size=CHUNK_SIZE, progress=None, title="fan-out",
+        prepare=None):
+    """
+    Call `callback` on every object, in chunks.
+
+    The first chunk is processed right away.  The following chunks
+    are processed by a cooperative task, giving control back to the
+    reactor between chunks, so that a prototype with thousands of
+    objects doesn't freeze the game.  Each chunk is processed in a
+    transaction, so that the changes made by `prepare` and `callback`
+    on a chunk are saved together.
+
+    Args:
+        ids (list of int): the IDs of the objects to process.
+        callback (callable): the callback, receiving the object as argument.
+        chunk_size (int, optional): the number of objects per chunk.
+        progress (callable, optional): a callback called after each
+                chunk, with the number of processed objects and the
+                total number of objects as arguments.
+        title (str, optional): the title of the operation in the logs.
+        prepare (callable, optional): a callback called with the list
+                of IDs of each chunk, before its objects are processed.
+                It should return the list of IDs of the objects to
+                process in this chunk (for instance, the objects that
+                were actually modified).
+
+    Returns:
+        deferred (Deferred): a deferred fired when all objects have been
+                processed.
+
+    """
+    ids = list(ids)
+    total = len(ids)
+
+    def process(start):
+        chunk = ids[start:start + chunk_size]
+        with transaction.atomic():
+            if prepare:
+                chunk = prepare(chunk)
+
+            for obj in ObjectDB.objects.filter(id__in=chunk):
+                try:
+                    with transaction.atomic():
+                        callback(obj)
+                except Exception:
+                    log.exception("{}: error while processing {}(#{})".format(
+                            title, obj, obj.id))
+
+        done = min(start + chunk_size, total)
+        log.debug("{}: {}/{} objects processed".format(title, done, total))
+        if progress:
+            progress(done, total)
+
+    def process_remaining():
+        for start in range(chunk_size, total, chunk_size):
+            process(start)
+            yield
+
+    if total:
+        process(0)
+
+    if total > chunk_size:
+        return task.cooperate(process_remaining()).whenDone()
+
+    return defer.succeed(None)
+
+def _cachekey(key, category):
+    """Return the cache key used by tag and attribute handlers."""
+    return "%s-%s" % (key.lower(), category.lower() if category else None)
+
+def _prime(handler, entries, **filters):
+    """Fill the handler cache with entries, marking it as complete."""
+    cache = {}
+    for entry in entries:
+        if all(getattr(entry, field) == value for field, value in filters.items()):
+            cache[_cachekey(entry.db_key, entry.db_category)] = entry
+
+    handler._cache = cache
+    if hasattr(handler, "_catcache"):
+        handler._catcache = {}
+    handler._cache_complete = True
+
+def prefetch(objs, prototypes=True):
+    """
+    Load the tags and attributes of several objects at once.
+
+    This function loads the tags (including aliases) and attributes of
+    all objects in two queries and fills the cache of their tag, alias
+    and attribute handlers.  Reading tags and attributes on these
+    objects afterward doesn't query the database.
+
+    Args:
+        objs (list of Object): the objects to prefetch.
+        prototypes (bool, optional): also prefetch the prototypes of
+                these objects, if any.
+
+    Note:
+        Objects whose handlers already have a complete cache are skipped.
+
+    """
+    objs = [obj for obj in objs if obj is not None and obj.pk and not (
+            obj.tags._cache_complete and obj.attributes._cache_complete)]
+    if not objs:
+        return
+
+    ids = [obj.id for obj in objs]
+    tags = defaultdict(list)
+    for conn in _THROUGH.objects.filter(objectdb_id__in=ids,
+            tag__db_model=TAG_MODEL).select_related("tag"):
+        tags[conn.objectdb_id].append(conn.tag)
+
+    attributes = defaultdict(list)
+    for conn in _ATTR_THROUGH.objects.filter(objectdb_id__in=ids,
+            attribute__db_model=TAG_MODEL,
+            attribute__db_attrtype=None).select_related("attribute"):
+        attributes[conn.objectdb_id].append(conn.attribute)
+
+    others = []
+    for obj in objs:
+        _prime(obj.tags, tags[obj.id], db_tagtype=None)
+        _prime(obj.aliases, tags[obj.id], db_tagtype="alias")
+        _prime(obj.attributes, attributes[obj.id])
+        if prototypes:
+            prototype = obj.attributes._cache.get(_cachekey("prototype", None))
+            if prototype is not None:
+                prototype = prototype.value
+                if prototype is not None and prototype not in others:
+                    others.append(prototype)
+
+    if others:
+        prefetch(others, prototypes=False)
+
+def prefetch_contents(location, recursive=False, exclude=None):
+    """
+    Prefetch the tags and attributes of the contents of a location.
+
+    Args:
+        location (Object): the location whose contents should be prefetched.
+        recursive (bool, optional): also prefetch the contents of the
+                contents, and so on.
+        exclude (Object, optional): an object to exclude from the contents.
+
+    Returns:
+        contents (list of Object): the prefetched objects.
+
+    """
+    contents = location.contents_get(exclude=exclude)
+    if recursive:
+        explored = set()
+        to_explore = list(contents)
+        contents = []
+        while to_explore:
+            obj = to_explore.pop(0)
+            if obj.id in explored:
+                continue
+
+            explored.add(obj.id)
+            contents.append(obj)
+            to_explore.extend(obj.contents)
+
+    prefetch(contents)
+    return contents
@@ -14,6 +14,8 @@ from collections import OrderedDict, defaultdict
 
 from evennia.utils.utils import list_to_string
 
+from logic.object.bulk import prefetch
+
 class OrderedDefaultDict(defaultdict):
 
     """A defaultdict retaining key ordering like OrdereedDict."""
@@ -64,6 +66,7 @@ class ObjectSet(list):
             names (list of str): the list of names.
 
         """
+        prefetch(self)
         dictionary = OrderedDefaultDict(list)
         for obj in self:
             singular = obj.key
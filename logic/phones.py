@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+"""Module containing the phone directory.
+
+The phone directory links phone numbers to devices (objects with the
+phone type).  Phone numbers are stored as tags (category "phone
+number") on the devices themselves: the directory reads all of them
+in one query the first time it is needed, then keeps them in memory.
+It is kept in sync when the phone type is added to or removed from
+a device, and when a device is deleted.
+
+Use the `DIRECTORY` object:
+    DIRECTORY.get_number(device): return the phone number of a device.
+    DIRECTORY.find(number): return the devices having this phone number.
+    DIRECTORY.find_all(numbers): return the devices for several numbers at once.
+    DIRECTORY.add(device, number): give a phone number to a device.
+    DIRECTORY.remove(device): remove the phone number of a device.
+    DIRECTORY.discard(device): forget a device about to be deleted.
+
+"""
+
+from collections import defaultdict
+
+from evennia.objects.models import ObjectDB
+
+from world.log import logger
+
+# Constants
+CATEGORY = "phone number"
+log = logger("phones")
+
+class PhoneDirectory(object):
+
+    """In-memory index of phone numbers to device IDs."""
+
+    def __init__(self):
+        self.numbers = None
+        self.devices = None
+
+    def load(self):
+        """Load all phone numbers from the database (one query)."""
+        numbers = defaultdict(set)
+        devices = {}
+        through = ObjectDB.db_tags.through
+        for obj_id, number in through.objects.filter(
+                tag__db_category=CATEGORY, tag__db_model="objectdb",
+                tag__db_tagtype=None).values_list("objectdb_id", "tag__db_key"):
+            number = str(number)
+            numbers[number].add(obj_id)
+            devices[obj_id] = number
+
+        self.numbers = numbers
+        self.devices = devices
+        log.debug("Loaded {} phone numbers".format(len(numbers)))
+
+    def clear(self):
+        """Clear the directory, it will be loaded again when needed."""
+        self.numbers = None
+        self.devices = None
+
+    def _ensure_loaded(self):
+        if self.numbers is None:
+            self.load()
+
+    @staticmethod
+    def clean(number):
+        """Return the phone number without dash."""
+        return str(number).replace("-", "")
+
+    def get_number(self, device):
+        """
+        Return the phone number of a device, or None.
+
+        The number is read from the directory, without querying the
+        device tags: the directory is kept in sync by `add` and `remove`.
+
+        Args:
+            device (Object): the device.
+
+        Returns:
+            number (str or None): the phone number, without dash.
+
+        """
+        self._ensure_loaded()
+        return self.devices.get(device.id)
+
+    def find(self, number):
+        """
+        Return the devices having this phone number.
+
+        Args:
+            number (str): the phone number (with or without dash).
+
+        Returns:
+            devices (list of Object): the devices with this phone number.
+
+        """
+        number = self.clean(number)
+        return self.find_all([number]).get(number, [])
+
+    def find_all(self, numbers):
+        """
+        Return the devices for several phone numbers at once.
+
+        All devices are retrieved in a single query, whatever the
+        number of phone numbers.
+
+        Args:
+            numbers (list of str): the phone numbers (with or without dash).
+
+        Returns:
+            devices (dict): a dictionary of {number: list of devices}.
+                    Phone numbers without device are not present.
+
+        """
+        self._ensure_loaded()
+        numbers = [self.clean(number) for number in numbers]
+        ids = set()
+        for number in numbers:
+            ids.update(self.numbers.get(number, ()))
+
+        found = defaultdict(list)
+        if ids:
+            for device in ObjectDB.objects.filter(id__in=list(ids)).order_by("id"):
+                found[self.devices[device.id]].append(device)
+
+        return dict(found)
+
+    def exists(self, number):
+        """Return whether this phone number is used by a device."""
+        self._ensure_loaded()
+        return bool(self.numbers.get(self.clean(number)))
+
+    def add(self, device, number):
+        """
+        Give a phone number to a device.
+
+        Args:
+            device (Object): the device.
+            number (str): the phone number (with or without dash).
+
+        """
+        self._ensure_loaded()
+        number = self.clean(number)
+        device.tags.clear(category=CATEGORY)
+        device.tags.add(number, category=CATEGORY)
+        self._index(device.id, number)
+
+    def remove(self, device):
+        """
+        Remove the phone number of a device.
+
+        Args:
+            device (Object): the device.
+
+        """
+        self._ensure_loaded()
+        self._unindex(device.id)
+        device.tags.clear(category=CATEGORY)
+
+    def discard(self, device):
+        """
+        Forget the phone number of a device about to be deleted.
+
+        Unlike `remove`, the tags of the device aren't modified.
+
+        Args:
+            device (Object): the device.
+
+        """
+        if self.devices is not None:
+            self._unindex(device.id)
+
+    def _index(self, device_id, number):
+        """Add the device and number to the index."""
+        self._unindex(device_id)
+        self.devices[device_id] = number
+        self.numbers[number].add(device_id)
+
+    def _unindex(self, device_id):
+        """Remove the device from the index."""
+        number = self.devices.pop(device_id, None)
+        if number is not None:
+            self.numbers[number].discard(device_id)
+            if not self.numbers[number]:
+                del self.numbers[number]
+
+
+DIRECTORY = PhoneDirectory()
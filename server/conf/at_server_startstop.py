@@ -25,8 +25,14 @@ import sys
 from evennia import TICKER_HANDLER as ticker_handler
 from evennia import ScriptDB, create_script
 
-from auto.types.high_tech import load_apps
+from auto.behaviors.scheduler import FLUSH_INTERVAL as BEHAVIOR_FLUSH_INTERVAL
+from auto.behaviors.scheduler import SCHEDULER, TICK_INTERVAL as BEHAVIOR_TICK_INTERVAL
+from auto.types.high_tech import flush_screens, load_apps
+from logic.character.regen import REGEN_INTERVAL
+from logic.character.stats import FLUSH_INTERVAL, flush_all
+from logic.notifications import NOTIFY_INTERVAL, QUEUE
 import tickers
+from web.text.managers import ARCHIVE_INTERVAL
 from world.log import begin, end, main, app
 
 def at_server_start():
@@ -56,6 +62,15 @@ def at_server_start():
 
     # Launch tickers
     ticker_handler.add(3, tickers.vehicles.move)
+    ticker_handler.add(FLUSH_INTERVAL, tickers.stats.flush)
+    ticker_handler.add(REGEN_INTERVAL, tickers.stats.regenerate)
+    ticker_handler.add(ARCHIVE_INTERVAL, tickers.texts.archive)
+    ticker_handler.add(NOTIFY_INTERVAL, tickers.notifications.deliver)
+    ticker_handler.add(BEHAVIOR_TICK_INTERVAL, tickers.behaviors.wake)
+    ticker_handler.add(BEHAVIOR_FLUSH_INTERVAL, tickers.behaviors.flush)
+
+    # Restore the behavior schedules
+    SCHEDULER.restore_all()
 
     # Load the apps
     errors = load_apps()
@@ -67,6 +82,20 @@ def at_server_stop():
     This is called just before the server is shut down, regardless
     of it is for a reload, reset or shutdown.
     """
+    # Save the modified stats
+    flushed = flush_all()
+    main.info("Saved the stats of {} characters".format(flushed))
+
+    # Save the behavior schedules
+    flushed = SCHEDULER.flush()
+    main.info("Saved the behavior schedules of {} characters".format(flushed))
+
+    # Deliver the queued notifications
+    QUEUE.process(count=None)
+
+    # Save the screens of computers being used
+    flushed = flush_screens()
+    main.info("Saved the screens of {} computers".format(flushed))
     end()
 
 
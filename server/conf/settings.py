@@ -69,6 +69,45 @@ SCREENREADER_REGEX_STRIP = r"\+-+|\+$|\+~|---+|~~+|==+"
 SEARCH_MULTIMATCH_REGEX = r"(?P<number>[0-9]+)\.(?P<name>.*)"
 SEARCH_MULTIMATCH_TEMPLATE = "  {number}.{name}{aliases}{info}\n"
 
+# Stats: interval (in seconds) between two saves of modified stats
+STATS_FLUSH_INTERVAL = 10
+
+# Stats: interval (in seconds) between two regenerations of stats
+STATS_REGEN_INTERVAL = 5
+
+# Computers: should the interface CmdSet be saved in the database?
+COMPUTER_PERSISTENT_CMDSET = False
+
+# Notifications: interval (in seconds) between two deliveries of notifications
+NOTIFICATION_INTERVAL = 1
+
+# Notifications: maximum number of notifications delivered at once
+NOTIFICATION_BATCH_SIZE = 200
+
+# Notifications: maximum number of notifications kept per device
+NOTIFICATION_MAX = 100
+
+# Behaviors: interval (in seconds) between two wake-ups of behaviors
+BEHAVIOR_TICK_INTERVAL = 1
+
+# Behaviors: maximum time (in seconds) spent waking up behaviors at each tick
+BEHAVIOR_TIME_BUDGET = 0.05
+
+# Behaviors: interval (in seconds) between two saves of behavior schedules
+BEHAVIOR_FLUSH_INTERVAL = 60
+
+# Callbacks: maximum number of compiled callbacks kept in memory
+CALLBACK_CODE_CACHE_SIZE = 2000
+
+# Texts: age (in days of game time) of texts to archive
+TEXT_ARCHIVE_AGE = 90
+
+# Texts: number of texts in an archive
+TEXT_ARCHIVE_SIZE = 100
+
+# Texts: interval (in seconds) between two archivings of old texts
+TEXT_ARCHIVE_INTERVAL = 3600
+
 ## Web
 INSTALLED_APPS += (
         "anymail",
@@ -77,6 +116,7 @@ INSTALLED_APPS += (
         "web.evapp",
         "web.help_system",
         "web.mailgun",
+        "web.notifications",
         "web.text",
 )
 
@@ -13,6 +13,7 @@ from auto.apps import contact as app
 from auto.apps import base
 from auto.types.high_tech import load_apps
 from commands.objects import CmdUse
+from logic.phones import DIRECTORY
 
 class TestContact(CommandTest):
 
@@ -49,6 +50,7 @@ class TestContact(CommandTest):
 
         # Create a phone in self.char3's inventory
         type(__import__("auto").types.high_tech.PHONE_GENERATOR).script = None
+        DIRECTORY.clear()
         self.user = create_object("typeclasses.characters.Character", key="user", location=self.room1)
         load_apps()
         self.prototype = create_object("typeclasses.prototypes.PObj", key="aven_phone")
@@ -114,3 +116,22 @@ class TestContact(CommandTest):
         self.assertIsInstance(self.screen, app.MainScreen)
         self.execute_cmd(self.user, "back")
         self.assertIsInstance(self.screen, base.MainScreen)
+
+    def test_index(self):
+        """Test the contact index, to format numbers and search names."""
+        self.open()
+        contacts = self.screen.app
+        contacts.add("Helga", "Hufflepuff", "1113535")
+        contacts.add("Harry", "Potter", "1112020")
+        contacts.add("Hermione", "Granger")
+        self.assertEqual(contacts.format("111-2020"), "Harry Potter")
+        self.assertEqual([c.name for c in contacts.search("h")], ["Helga Hufflepuff", "Harry Potter", "Hermione Granger"])
+        self.assertEqual([c.name for c in contacts.search("po")], ["Harry Potter"])
+        self.assertEqual([c.name for c in contacts.search("harry potter")], ["Harry Potter"])
+        self.assertEqual(contacts.search("x"), [])
+
+        # The index is rebuilt when contacts are modified
+        contacts.update(contacts.search("potter")[0], last_name="Weasley")
+        self.assertEqual(contacts.format("1112020"), "Harry Weasley")
+        contacts.remove(contacts.search("weasley")[0])
+        self.assertEqual(contacts.format("1112020"), "111-2020")
@@ -13,6 +13,7 @@ from auto.apps import text as app
 from auto.apps import base
 from auto.types.high_tech import load_apps
 from commands.objects import CmdUse
+from logic.phones import DIRECTORY
 from web.text.models import Text, Thread
 
 class TestText(CommandTest):
@@ -50,6 +51,7 @@ class TestText(CommandTest):
 
         # Create a phone in self.char3's inventory
         type(__import__("auto").types.high_tech.PHONE_GENERATOR).script = None
+        DIRECTORY.clear()
         self.user = create_object("typeclasses.characters.Character", key="user", location=self.room1)
         load_apps()
         self.prototype = create_object("typeclasses.prototypes.PObj", key="aven_phone")
@@ -223,6 +225,69 @@ class TestText(CommandTest):
         self.user.execute_cmd("back")
         self.assertIsInstance(self.screen, base.MainScreen)
 
+    def test_more(self):
+        """Test to display older and latest messages in a thread."""
+        number = self.phone1.types.get("phone").number
+        for i in range(12):
+            Text.objects.send(number, ["2231818"], "Message {}".format(i))
+        self.open()
+        self.user.execute_cmd("1")
+        self.assertIsInstance(self.screen, app.ThreadScreen)
+        text = self.screen.get_text()
+        self.assertIn("Message 11", text)
+        self.assertNotIn("Message 1 ", text)
+        self.assertIn("|lcmore", text)
+
+        # Display older messages
+        self.user.execute_cmd("more")
+        self.assertIsNotNone(self.screen.db.get("before"))
+        text = self.screen.get_text()
+        self.assertIn("Message 0", text)
+        self.assertIn("|lclatest", text)
+
+        # Display the latest messages again
+        self.user.execute_cmd("latest")
+        self.assertNotIn("before", self.screen.db)
+        self.assertIn("Message 11", self.screen.get_text())
+
+        # The older messages aren't displayed when the thread opens again
+        self.user.execute_cmd("more")
+        self.user.execute_cmd("back")
+        self.user.execute_cmd("1")
+        self.assertIsInstance(self.screen, app.ThreadScreen)
+        self.assertNotIn("before", self.screen.db)
+
+    def test_more_threads(self):
+        """Test to display older and latest threads."""
+        number = self.phone1.types.get("phone").number
+        for i in range(app.THREADS_PER_PAGE + 1):
+            Text.objects.send(number, ["55500{:02}".format(i)], "Thread {}".format(i))
+        self.open()
+        self.assertIsInstance(self.screen, app.MainScreen)
+        text = self.screen.get_text()
+        self.assertIn("555-0020", text)
+        self.assertNotIn("555-0000", text)
+        self.assertIn("|lcmore", text)
+
+        # Display older threads
+        self.user.execute_cmd("more")
+        self.assertEqual(self.screen.db.get("start"), app.THREADS_PER_PAGE)
+        text = self.screen.get_text()
+        self.assertIn("555-0000", text)
+        self.assertNotIn("|lcmore", text)
+        self.assertIn("|lclatest", text)
+        self.user.execute_cmd(str(app.THREADS_PER_PAGE + 1))
+        self.assertIsInstance(self.screen, app.ThreadScreen)
+        self.assertIn("Thread 0", self.screen.get_text())
+
+        # Display the latest threads again
+        self.user.execute_cmd("back")
+        self.assertIsInstance(self.screen, app.MainScreen)
+        self.user.execute_cmd("more")
+        self.user.execute_cmd("latest")
+        self.assertNotIn("start", self.screen.db)
+        self.assertIn("555-0020", self.screen.get_text())
+
     def test_contact(self):
         """Test the contact button on the ThreadScreen."""
         number = self.phone1.types.get("phone").number
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+"""Test for the behavior scheduler."""
+
+from evennia.utils.create import create_object
+from evennia.utils.test_resources import EvenniaTest
+
+from auto.behaviors.scheduler import BehaviorScheduler, SCHEDULER, TimingWheel
+
+class TestScheduler(EvenniaTest):
+
+    """Test the behavior scheduler and its timing wheel."""
+
+    def setUp(self):
+        super(TestScheduler, self).setUp()
+        self.char3 = create_object("typeclasses.characters.Character", key="char3", location=self.room1)
+        self.char3.behaviors.add("driver")
+        self.behavior = self.char3.behaviors.get("driver")
+        self.woken = []
+        self.behavior.at_wake = lambda: self.woken.append(self.char3.id)
+
+    def test_wheel(self):
+        """Entries are due at their tick, whatever their wheel."""
+        wheel = TimingWheel(slots=4, levels=2)
+        for tick in (1, 3, 4, 5, 14, 17, 40):
+            wheel.add(tick, tick)
+
+        due = []
+        for tick in range(1, 50):
+            for entry in wheel.advance(tick):
+                self.assertEqual(entry, tick)
+                due.append(entry)
+
+        self.assertEqual(due, [1, 3, 4, 5, 14, 17, 40])
+        self.assertEqual(len(wheel), 0)
+
+    def test_wake(self):
+        """Wake up a behavior once and at an interval."""
+        scheduler = BehaviorScheduler()
+        scheduler.schedule(self.behavior, 5, now=100)
+        self.assertEqual(scheduler.tick(now=104), 0)
+        self.assertEqual(scheduler.tick(now=105), 1)
+        self.assertEqual(self.woken, [self.char3.id])
+        self.assertIsNone(scheduler.get(self.behavior))
+
+        # Wake up every 10 seconds
+        scheduler.schedule(self.behavior, 10, 10, now=105)
+        scheduler.tick(now=115)
+        scheduler.tick(now=125)
+        self.assertEqual(len(self.woken), 3)
+        self.assertEqual(scheduler.get(self.behavior), (135, 10))
+
+        # Cancel the wake-up
+        scheduler.cancel(self.behavior)
+        scheduler.tick(now=135)
+        self.assertEqual(len(self.woken), 3)
+
+    def test_persistence(self):
+        """Save and restore the schedule."""
+        scheduler = BehaviorScheduler()
+        scheduler.schedule(self.behavior, 30, 60, now=100)
+        self.assertEqual(scheduler.flush(), 1)
+        self.assertEqual(dict(self.char3.behaviors.db("scheduler")), {"driver": (130, 60)})
+        self.assertTrue(self.char3.tags.get("scheduled", category="behavior schedule"))
+
+        # Regular wake-ups don't change the saved schedule
+        self.assertEqual(scheduler.tick(now=130), 1)
+        self.assertEqual(scheduler.flush(), 0)
+        self.assertEqual(dict(self.char3.behaviors.db("scheduler")), {"driver": (130, 60)})
+
+        # Restore the schedule in a new scheduler
+        restored = BehaviorScheduler()
+        restored.restore(self.char3, now=100)
+        self.assertEqual(restored.get(self.behavior), (130, 60))
+
+        # Missed wake-ups are due at the next interval
+        restored = BehaviorScheduler()
+        restored.restore(self.char3, now=251)
+        self.assertEqual(restored.get(self.behavior), (310, 60))
+
+        # Cancelling the wake-up removes the saved schedule
+        scheduler.cancel(self.behavior)
+        self.assertEqual(scheduler.flush(), 1)
+        self.assertEqual(dict(self.char3.behaviors.db("scheduler")), {})
+        self.assertFalse(self.char3.tags.get("scheduled", category="behavior schedule"))
+
+    def test_remove_behavior(self):
+        """Removing the behavior cancels its wake-up."""
+        self.behavior.wake_every(60)
+        self.assertIsNotNone(SCHEDULER.get(self.behavior))
+        SCHEDULER.flush()
+        self.assertTrue(self.char3.tags.get("scheduled", category="behavior schedule"))
+
+        self.char3.behaviors.remove("driver")
+        self.assertIsNone(SCHEDULER.get(self.behavior))
+        SCHEDULER.flush()
+        self.assertEqual(dict(self.char3.behaviors.db("scheduler")), {})
+        self.assertFalse(self.char3.tags.get("scheduled", category="behavior schedule"))
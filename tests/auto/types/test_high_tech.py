@@ -7,8 +7,9 @@ Test for the computer type.
 from evennia.commands.default.tests import CommandTest
 from evennia.utils.create import create_object
 
-from auto.types.high_tech import APPS, load_apps
+from auto.types.high_tech import APPS, NOTIFICATIONS_DISPLAYED, load_apps, return_appearance
 from commands.objects import CmdUse
+from logic.phones import DIRECTORY
 
 class TestComputer(CommandTest):
 
@@ -22,6 +23,7 @@ class TestComputer(CommandTest):
         """Create the prototype and smart phone."""
         super(TestComputer, self).setUp()
         type(__import__("auto").types.high_tech.PHONE_GENERATOR).script = None
+        DIRECTORY.clear()
         self.prototype = create_object("typeclasses.prototypes.PObj", key="smartphone")
         self.prototype.types.add("phone")
         self.prototype.types.add("computer")
@@ -39,3 +41,64 @@ class TestComputer(CommandTest):
         """Build and use a smart phone."""
         self.assertTrue(len(list(self.smartphone.types)) == 2)
 
+    def test_notifications(self):
+        """Add and clear notifications on the smart phone."""
+        notifications = self.smartphone.types.get("computer").notifications
+        notifications.add("First", "screen", "text", group="a", timestamp=1)
+        notifications.add("Second", "screen", "text", group="b", timestamp=2)
+        notifications.add("Third", "screen", "text", group="a", timestamp=3)
+        self.assertEqual(notifications.count(), 3)
+        self.assertEqual([n.title for n in notifications.all()], ["First", "Second", "Third"])
+        self.assertEqual([n.title for n in notifications.all(count=2)], ["Second", "Third"])
+
+        # Notifications are kept by type
+        self.assertEqual(self.smartphone.types.get("phone").notifications.count(), 0)
+
+        # Clear a group
+        notifications.clear(group="a")
+        self.assertEqual([n.title for n in notifications.all()], ["Second"])
+
+    def test_appearance_notifications(self):
+        """Only the most recent notifications are displayed."""
+        computer = self.smartphone.types.get("computer")
+        for i in range(NOTIFICATIONS_DISPLAYED + 2):
+            computer.notifications.add("Notification {}".format(i), "screen",
+                    "text", timestamp=i + 1)
+
+        text = return_appearance(computer, self.char1)
+        self.assertIn("Notification {}".format(NOTIFICATIONS_DISPLAYED + 1), text)
+        self.assertNotIn("Notification 1 ", text)
+        self.assertIn("(2 older notifications)", text)
+
+    def test_lazy_apps(self):
+        """Apps are only created when accessed."""
+        apps = self.smartphone.types.get("computer").apps
+        apps.load(self.char1)
+        self.assertEqual(apps._apps, {})
+        text = apps.get("text")
+        self.assertEqual(type(text), APPS["app"]["text"])
+        self.assertIs(apps.get("text"), text)
+        self.assertIsNone(apps.get("contact"))
+        self.assertEqual(list(apps), [text])
+
+    def test_screen_state(self):
+        """The screen state is kept in memory and saved when quitting."""
+        self.use()
+        computer = self.smartphone.types.get("computer")
+        self.assertIn("screen_tree", computer.ui)
+        self.assertNotIn("screen_tree", computer.db)
+        self.assertNotIn("current_screen", computer.db)
+
+        # Flushing saves the screen state
+        computer.flush_screen()
+        self.assertEqual(computer.db["current_screen"][0], "auto.apps.base.MainScreen")
+
+        # The saved state is read back as plain values
+        self.smartphone.ndb._screen_state = None
+        self.assertIs(type(computer.ui["screen_tree"]), list)
+        self.assertEqual(computer.ui["current_screen"][0], "auto.apps.base.MainScreen")
+
+        # Quitting removes the screen tree
+        computer.quit()
+        self.assertNotIn("screen_tree", computer.db)
+        self.assertIsNone(self.smartphone.ndb._screen_state)
@@ -262,3 +262,46 @@ class TestEquipment(EvenniaTest):
         self.char3.equipment.hold(self.hat, limb)
         self.assertEqual(self.hat.tags.get(category="eq"), "right_hand")
         self.assertEqual(self.hat.location, self.char3)
+
+    def test_equiped(self):
+        """The cached equipment should follow objects and tags."""
+        equipment = self.char3.equipment
+        self.assertEqual(equipment.equiped, {})
+
+        # Hold then wear the hat
+        self.hat.location = self.char3
+        equipment.hold(self.hat, equipment.limbs["left_hand"])
+        self.assertEqual(equipment.equiped, {"left_hand": self.hat})
+        equipment.wear(self.hat, equipment.limbs["head"])
+        self.assertEqual(equipment.equiped, {"head": self.hat})
+
+        # Changing the tag directly should update the cache
+        self.bag1.location = self.char3
+        self.bag1.tags.add("left_hand", category="eq")
+        self.assertIs(equipment.first_level[equipment.limbs["left_hand"]], self.bag1)
+
+        # Moving the object out of the character should update the cache
+        self.hat.location = self.room1
+        self.assertEqual(equipment.equiped, {"left_hand": self.bag1})
+        self.assertIs(equipment.limbs, type(equipment)(self.char3).limbs)
+
+        # An object can be equiped on several limbs
+        self.bag2.tags.add("right_hand", category="eq")
+        self.bag2.tags.add("back", category="eq")
+        self.bag2.location = self.char3
+        self.assertIs(equipment.equiped["right_hand"], self.bag2)
+        self.assertIs(equipment.equiped["back"], self.bag2)
+
+    def test_tree(self):
+        """The inventory tree should be invalidated when objects move."""
+        equipment = self.char3.equipment
+        self.bag1.location = self.char3
+        self.bag1.tags.add("left_hand", category="eq")
+        self.bag2.location = self.bag1
+        self.assertEqual(equipment.tree, [(self.bag1, 1, "left_hand"), (self.bag2, 2, None)])
+
+        # Moving an object deep in the inventory should update the tree
+        self.apple1.location = self.bag2
+        self.assertEqual(equipment.all(), [self.bag1, self.bag2, self.apple1])
+        self.apple1.location = self.room1
+        self.assertEqual(equipment.all(), [self.bag1, self.bag2])
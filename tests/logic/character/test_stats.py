@@ -5,6 +5,9 @@
 from evennia.utils.create import create_object
 from evennia.utils.test_resources import EvenniaTest
 
+from logic.character.regen import StatScheduler
+from logic.character.stats import _DIRTY
+
 class TestStats(EvenniaTest):
 
     """Test chracter stats."""
@@ -84,3 +87,100 @@ class TestStats(EvenniaTest):
         self.assertTrue(self.char3.db.dead)
         stat.mod = 0
         self.assertFalse(self.char3.db.dead)
+
+    def test_flush(self):
+        """Modified stats should be saved in one write when flushed."""
+        stats = self.char3.stats
+        stats.p_str.base = 5
+        stats.p_str.mod = 1
+        stats.m_vit.base = 80
+        self.assertEqual(stats.dirty, set(["p_str", "m_vit"]))
+        self.assertFalse(self.char3.attributes.has("stats"))
+
+        stats.flush()
+        self.assertEqual(stats.dirty, set())
+        self.assertEqual(self.char3.db.stats["p_str"], {"base": 5, "mod": 1, "max": 20})
+        self.assertEqual(self.char3.db.stats["m_vit"]["base"], 80)
+
+        # A new handler should read the saved stats
+        self.assertEqual(type(stats)(self.char3).p_str.current, 6)
+
+    def test_scheduler(self):
+        """Stats should regenerate and timed modifiers expire."""
+        scheduler = StatScheduler()
+        stats = self.char3.stats
+        stats.p_vit.base = 50
+        stats.p_wea.base = 10
+        scheduler.watch(stats)
+        scheduler.tick(now=100)
+        scheduler.tick(now=105)
+        self.assertEqual(stats.p_wea.base, 8)
+        self.assertEqual(stats.p_vit.base, 50)
+        scheduler.tick(now=115)
+        self.assertEqual(stats.p_vit.base, 51)
+
+        # Add a timed modifier
+        scheduler.add_modifier(stats.p_str, 3, 20, now=115)
+        self.assertEqual(stats.p_str.current, 5)
+        self.assertEqual(stats.p_str.timed, [(135, 3)])
+        scheduler.tick(now=130)
+        self.assertEqual(stats.p_str.current, 5)
+        scheduler.tick(now=140)
+        self.assertEqual(stats.p_str.current, 2)
+        self.assertEqual(stats.p_str.timed, [])
+
+    def test_scheduler_dead(self):
+        """Dead characters shouldn't regenerate."""
+        scheduler = StatScheduler()
+        stats = self.char3.stats
+        stats.p_vit.base = 0
+        self.char3.db.dead = True
+        scheduler.watch(stats)
+        scheduler.tick(now=100)
+        scheduler.tick(now=200)
+        self.assertEqual(stats.p_vit.base, 0)
+        self.assertTrue(self.char3.db.dead)
+        self.assertEqual(scheduler.handlers, [])
+
+    def test_scheduler_new_handler(self):
+        """A new stats handler replaces the previous one."""
+        scheduler = StatScheduler()
+        old = self.char3.stats
+        old.p_wea.base = 10
+        old.flush()
+        scheduler.watch(old)
+        new = type(old)(self.char3)
+        scheduler.watch(new)
+        self.assertEqual(scheduler.handlers, [new])
+
+        # The previous handler can't unwatch the new one
+        scheduler.unwatch(old)
+        self.assertEqual(scheduler.handlers, [new])
+        scheduler.tick(now=100)
+        scheduler.tick(now=104)
+        self.assertEqual(new.p_wea.base, 8)
+
+    def test_scheduler_new_handler_modifier(self):
+        """Timed modifiers should expire on the current stats handler."""
+        scheduler = StatScheduler()
+        old = self.char3.stats
+        scheduler.add_modifier(old.p_str, 3, 20, now=100)
+        old.flush()
+
+        # Re-create the stats handler, which reads the timed modifier again
+        del self.char3.__dict__["stats"]
+        new = self.char3.stats
+        self.assertEqual(new.p_str.timed, [(120, 3)])
+        scheduler.schedule(new.p_str, 120, 3)
+        self.assertEqual(len(scheduler.modifiers), 1)
+        new.p_wea.base = 10
+
+        # The modifier expires on the new handler only
+        scheduler.tick(now=100)
+        scheduler.tick(now=125)
+        self.assertEqual(new.p_str.current, 2)
+        self.assertEqual(new.p_str.timed, [])
+        self.assertEqual(old.p_str.mod, 3)
+        self.assertIs(_DIRTY.get(self.char3.pk), new)
+        new.flush()
+        self.assertEqual(self.char3.db.stats["p_wea"]["base"], 10)
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+"""Test for bulk operations on objects."""
+
+from evennia.utils.create import create_object
+from evennia.utils.test_resources import EvenniaTest
+
+from logic.object.bulk import add_tag, fan_out, rename_tag, tagged
+
+class TestBulk(EvenniaTest):
+
+    """Test the bulk operations."""
+
+    def setUp(self):
+        super(TestBulk, self).setUp()
+        self.objs = [create_object("typeclasses.objects.Object",
+                key="object {}".format(i), location=self.room1) for i in range(5)]
+        self.ids = [obj.id for obj in self.objs]
+
+    def test_add_tag(self):
+        """Only objects without the tag should be returned."""
+        self.objs[0].tags.add("red", category="color")
+        self.objs[2].tags.add("red", category="color")
+        added = add_tag(self.ids, "Red", "color")
+        self.assertEqual(added, [self.ids[1], self.ids[3], self.ids[4]])
+        self.assertEqual(sorted(tagged("red", "color")), sorted(self.ids))
+        for obj in self.objs:
+            self.assertEqual(obj.tags.get(category="color"), "red")
+
+        # Tagging again doesn't add anything
+        self.assertEqual(add_tag(self.ids, "red", "color"), [])
+
+    def test_rename_tag(self):
+        """Renaming a tag should keep its objects."""
+        add_tag(self.ids[:2], "red", "color")
+        self.assertEqual(sorted(rename_tag("red", "blue", "color")), self.ids[:2])
+        self.assertEqual(tagged("red", "color"), [])
+        self.assertEqual(sorted(tagged("blue", "color")), self.ids[:2])
+        self.assertEqual(self.objs[0].tags.get(category="color"), "blue")
+
+        # Renaming an unknown tag does nothing
+        self.assertEqual(rename_tag("red", "green", "color"), [])
+
+    def test_rename_tag_merge(self):
+        """Renaming a tag to an existing tag should merge them."""
+        add_tag(self.ids[:3], "red", "color")
+        add_tag(self.ids[2:], "blue", "color")
+        self.assertEqual(sorted(rename_tag("red", "blue", "color")), self.ids[:3])
+        self.assertEqual(tagged("red", "color"), [])
+        self.assertEqual(sorted(tagged("blue", "color")), self.ids)
+
+        # The object which had both tags has only one
+        self.assertEqual(self.objs[2].tags.get(category="color",
+                return_list=True), ["blue"])
+
+    def test_fan_out(self):
+        """The first chunk should be processed right away."""
+        processed = []
+        progress = []
+        fan_out(self.ids, lambda obj: processed.append(obj.id), chunk_size=2,
+                progress=lambda done, total: progress.append((done, total)))
+        self.assertEqual(sorted(processed), self.ids[:2])
+        self.assertEqual(progress, [(2, 5)])
+
+        # A single chunk fires the deferred right away
+        processed = []
+        fired = []
+        deferred = fan_out(self.ids, lambda obj: processed.append(obj.id))
+        deferred.addCallback(fired.append)
+        self.assertEqual(sorted(processed), self.ids)
+        self.assertEqual(fired, [None])
+
+    def test_fan_out_prepare(self):
+        """Only the IDs returned by `prepare` should be processed."""
+        self.objs[1].tags.add("red", category="color")
+        processed = []
+        fan_out(self.ids, lambda obj: processed.append(obj.id),
+                prepare=lambda chunk: add_tag(chunk, "red", "color"))
+        self.assertEqual(sorted(processed),
+                [self.ids[0], self.ids[2], self.ids[3], self.ids[4]])
+        self.assertEqual(sorted(tagged("red", "color")), self.ids)
+
+    def test_fan_out_error(self):
+        """An error on one object shouldn't stop the others."""
+        processed = []
+        def callback(obj):
+            if obj.id == self.ids[1]:
+                raise ValueError("failed")
+            processed.append(obj.id)
+
+        fan_out(self.ids, callback)
+        self.assertEqual(sorted(processed),
+                [self.ids[0], self.ids[2], self.ids[3], self.ids[4]])
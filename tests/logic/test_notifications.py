@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+"""Test for the notification queue."""
+
+from evennia.utils.create import create_object
+from evennia.utils.test_resources import EvenniaTest
+
+from auto.types.high_tech import APPS, load_apps
+from logic.notifications import NotificationQueue
+from logic.phones import DIRECTORY
+
+class TestNotifications(EvenniaTest):
+
+    """Test the notification queue."""
+
+    def setUp(self):
+        super(TestNotifications, self).setUp()
+        type(__import__("auto").types.high_tech.PHONE_GENERATOR).script = None
+        DIRECTORY.clear()
+        load_apps()
+        self.queue = NotificationQueue()
+        self.prototype = create_object("typeclasses.prototypes.PObj", key="smartphone")
+        self.prototype.types.add("phone")
+        self.prototype.types.add("computer")
+        self.phone = self.prototype.create(key="phone", location=self.room1)
+        self.notifications = self.phone.types.get("computer").notifications
+
+    def test_process(self):
+        """Notifications are delivered in batches and coalesced by group."""
+        app = APPS["app"]["text"]
+        self.queue.add(app, self.phone, "First", group="a", now=1)
+        self.queue.add(app, self.phone, "Second", group="b", now=2)
+        self.queue.add(app, self.phone, "Third", group="a", now=3)
+        self.assertEqual(len(self.queue), 2)
+        self.assertEqual(self.notifications.count(), 0)
+
+        # Deliver one notification at a time
+        self.assertEqual(self.queue.process(count=1, now=5), 1)
+        self.assertEqual([n.title for n in self.notifications.all()], ["Third"])
+        self.assertEqual(list(self.queue.latencies), [4])
+        self.assertEqual(self.queue.process(now=5), 1)
+        self.assertEqual(self.notifications.count(), 2)
+        self.assertEqual(self.queue.process(), 0)
+
+        # Discard queued notifications
+        self.queue.add(app, self.phone, "Fourth", group="a")
+        self.queue.discard(self.phone, "a")
+        self.assertEqual(len(self.queue), 0)
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+"""Test for the phone directory."""
+
+from evennia.utils.create import create_object
+from evennia.utils.test_resources import EvenniaTest
+
+from logic.phones import DIRECTORY, PhoneDirectory
+
+class TestPhones(EvenniaTest):
+
+    """Test the phone directory."""
+
+    def setUp(self):
+        super(TestPhones, self).setUp()
+        self.directory = PhoneDirectory()
+        self.phone1 = create_object("typeclasses.objects.Object", key="phone 1", location=self.room1)
+        self.phone2 = create_object("typeclasses.objects.Object", key="phone 2", location=self.room1)
+
+    def test_find(self):
+        """Devices should be found by their phone numbers."""
+        self.phone1.tags.add("5551234", category="phone number")
+        self.assertEqual(self.directory.get_number(self.phone1), "5551234")
+        self.assertEqual(self.directory.find("555-1234"), [self.phone1])
+        self.assertEqual(self.directory.find("5550000"), [])
+
+        # Add and remove numbers
+        self.directory.add(self.phone2, "555-0000")
+        self.assertEqual(self.phone2.tags.get(category="phone number"), "5550000")
+        self.assertEqual(self.directory.find_all(["5551234", "5550000", "5559999"]),
+                {"5551234": [self.phone1], "5550000": [self.phone2]})
+        self.directory.remove(self.phone1)
+        self.assertIsNone(self.directory.get_number(self.phone1))
+        self.assertFalse(self.directory.exists("5551234"))
+
+    def test_delete(self):
+        """Deleted devices should be removed from the directory."""
+        DIRECTORY.clear()
+        DIRECTORY.add(self.phone1, "555-1234")
+        self.assertTrue(DIRECTORY.exists("5551234"))
+        self.phone1.delete()
+        self.assertFalse(DIRECTORY.exists("5551234"))
+        self.assertEqual(DIRECTORY.find("5551234"), [])
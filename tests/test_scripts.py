@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+"""Test for the event handler."""
+
+import hashlib
+
+from evennia.contrib.ingame_python.callbackhandler import CallbackHandler
+from evennia.utils.create import create_object, create_script
+from evennia.utils.test_resources import EvenniaTest
+
+from typeclasses import scripts
+from typeclasses.scripts import CODE_CACHE, compile_callback, get_syntax_error
+
+class TestEventHandler(EvenniaTest):
+
+    """Test the Avenew event handler."""
+
+    def setUp(self):
+        super(TestEventHandler, self).setUp()
+        self.handler = create_script("typeclasses.scripts.AvEventHandler")
+        CallbackHandler.script = self.handler
+        self.prototype = create_object("typeclasses.prototypes.PObj", key="phone")
+        self.obj = self.prototype.create(key="phone", location=self.room1)
+
+    def tearDown(self):
+        self.handler.delete()
+        CallbackHandler.script = None
+        super(TestEventHandler, self).tearDown()
+
+    def test_merged_callbacks(self):
+        """Callbacks of the prototype are merged and cached."""
+        self.handler.add_callback(self.prototype, "describe", "x = 1", valid=True)
+        callbacks = self.handler.get_callbacks(self.obj)
+        self.assertEqual([callback["code"] for callback in callbacks["describe"]], ["x = 1"])
+        self.assertIs(self.handler.get_callbacks(self.obj), callbacks)
+
+        # Adding a callback to the object clears the cache
+        self.handler.add_callback(self.obj, "describe", "x = 2", valid=True)
+        callbacks = self.handler.get_callbacks(self.obj)
+        self.assertEqual([callback["code"] for callback in callbacks["describe"]], ["x = 1", "x = 2"])
+
+        # Editing a callback of the prototype clears the cache
+        self.handler.edit_callback(self.prototype, "describe", 0, "x = 3", valid=True)
+        callbacks = self.handler.get_callbacks(self.obj)
+        self.assertEqual([callback["code"] for callback in callbacks["describe"]], ["x = 3", "x = 2"])
+
+        # Removing a callback clears the cache
+        self.handler.del_callback(self.obj, "describe", 0)
+        callbacks = self.handler.get_callbacks(self.obj)
+        self.assertEqual([callback["code"] for callback in callbacks["describe"]], ["x = 3"])
+
+    def test_compiled_code(self):
+        """The code of callbacks is compiled once."""
+        compiled = compile_callback("x = 1")
+        self.assertIs(compile_callback("x = 1"), compiled)
+        self.assertIsNone(get_syntax_error("x = 1"))
+        self.assertEqual(get_syntax_error("x = (").split(":")[0], "line 1")
+
+        # Calling callbacks uses the compiled code
+        self.handler.add_callback(self.obj, "test", "result.append(x)", valid=True)
+        key = hashlib.sha1("result.append(x)").hexdigest()
+        self.assertIn(key, CODE_CACHE)
+        CODE_CACHE[key] = compile("result.append(x + 1)", "<string>", "exec")
+        result = []
+        self.assertTrue(self.handler.call(self.obj, "test", locals={"result": result, "x": 1}))
+        self.assertEqual(result, [2])
+
+    def test_code_cache_size(self):
+        """The least recently used code objects are removed."""
+        size = scripts.CODE_CACHE_SIZE
+        scripts.CODE_CACHE_SIZE = 2
+        try:
+            CODE_CACHE.clear()
+            first = compile_callback("x = 1")
+            compile_callback("x = 2")
+            compile_callback("x = 1")
+            compile_callback("x = 3")
+            self.assertEqual(len(CODE_CACHE), 2)
+            self.assertIs(compile_callback("x = 1"), first)
+        finally:
+            scripts.CODE_CACHE_SIZE = size
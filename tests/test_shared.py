@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+"""Test for the shared behavior of Avenew objects."""
+
+from evennia.utils.create import create_object
+from evennia.utils.test_resources import EvenniaTest
+
+from logic.object.bulk import prefetch_contents
+
+class TestShared(EvenniaTest):
+
+    """Test the AvenewObject mix-in."""
+
+    def setUp(self):
+        super(TestShared, self).setUp()
+        self.room = create_object("typeclasses.rooms.Room", key="room")
+        self.bag = create_object("typeclasses.objects.Object", key="a bag", location=self.room)
+        self.apple = create_object("typeclasses.objects.Object", key="an apple", location=self.room)
+        self.bag.db.mass = 2
+        self.apple.db.mass = 0.5
+
+    def test_contents_order(self):
+        """Contents should be sorted by move order."""
+        self.assertEqual(self.room.contents, [self.bag, self.apple])
+        self.bag.location = self.room
+        self.assertEqual(self.room.contents, [self.apple, self.bag])
+
+    def test_mass(self):
+        """Aggregate masses should be updated when objects move."""
+        self.assertEqual(self.room.mass, 3.5)
+        self.assertEqual(self.bag.mass, 2)
+
+        # Put the apple in the bag
+        self.apple.location = self.bag
+        self.assertEqual(self.bag.mass, 2.5)
+        self.assertEqual(self.room.mass, 3.5)
+
+        # Change the apple's mass
+        self.apple.db.mass = 1
+        self.assertEqual(self.bag.mass, 3)
+        self.assertEqual(self.room.mass, 4)
+        self.apple.mass = 1.5
+        self.assertEqual(self.room.mass, 4.5)
+
+        # Move the bag out of the room
+        self.bag.location = None
+        self.assertEqual(self.room.mass, 1)
+        self.assertEqual(self.bag.mass, 3.5)
+
+    def test_shared_attributes(self):
+        """Attributes should be shared with the prototype, even when cached."""
+        apple = create_object("typeclasses.prototypes.PObj", key="apple")
+        apple.db.quality = 3
+        red_apple = apple.create(location=self.room)
+        self.assertEqual(red_apple.db.quality, 3)
+        self.assertTrue(red_apple.attributes.has("quality"))
+        self.assertIsNone(red_apple.db.color)
+        self.assertEqual(red_apple.attributes.get("color", "red"), "red")
+
+        # Change the prototype
+        apple.db.color = "green"
+        apple.db.quality = 4
+        self.assertEqual(red_apple.db.color, "green")
+        self.assertEqual(red_apple.db.quality, 4)
+
+        # Override and remove the object attribute
+        red_apple.db.quality = 5
+        self.assertEqual(red_apple.db.quality, 5)
+        self.assertEqual(apple.db.quality, 4)
+        del red_apple.db.quality
+        self.assertEqual(red_apple.db.quality, 4)
+
+    def test_prefetch(self):
+        """Prefetching contents should fill the handler caches."""
+        self.apple.location = self.bag
+        self.bag.tags.add("bag", category="kind")
+        for obj in (self.bag, self.apple):
+            obj.tags.reset_cache()
+            obj.attributes.reset_cache()
+
+        contents = prefetch_contents(self.room, recursive=True)
+        self.assertEqual(contents, [self.bag, self.apple])
+        for obj in contents:
+            self.assertTrue(obj.tags._cache_complete)
+            self.assertTrue(obj.attributes._cache_complete)
+        self.assertEqual(self.bag.tags.get(category="kind"), "bag")
+        self.assertEqual(self.apple.db.mass, 0.5)
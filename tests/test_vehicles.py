@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+
+"""Test for the driving actions of vehicles."""
+
+from evennia.utils.create import create_object
+from evennia.utils.test_resources import EvenniaTest
+
+class TestVehicles(EvenniaTest):
+
+    """Test the driving actions, shared by commands and behaviors."""
+
+    def setUp(self):
+        super(TestVehicles, self).setUp()
+        self.vehicle = create_object("typeclasses.vehicles.Vehicle", key="a car")
+        self.vehicle.db.driver = self.char1
+
+    def test_speed(self):
+        """Change the desired speed."""
+        self.vehicle.set_speed(self.char1, "25")
+        self.assertEqual(self.vehicle.db.desired_speed, 25)
+        self.assertRaises(ValueError, self.vehicle.set_speed, self.char1, "fast")
+        self.assertRaises(ValueError, self.vehicle.set_speed, self.char1, -5)
+        self.assertRaises(ValueError, self.vehicle.set_speed, self.char2, 10)
+        self.assertEqual(self.vehicle.db.desired_speed, 25)
+
+    def test_turn(self):
+        """Prepare to turn."""
+        infos = self.vehicle.prepare_turn(self.char1, "n")
+        self.assertEqual(infos["name"], "north")
+        self.assertEqual(self.vehicle.db.expected_direction, 6)
+        self.assertRaises(ValueError, self.vehicle.prepare_turn, self.char1, "up")
+        self.assertRaises(ValueError, self.vehicle.prepare_turn, self.char2, "south")
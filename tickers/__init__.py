@@ -1,3 +1,3 @@
 ﻿# -*- coding: utf-8 -*-
 
-from tickers import vehicles
+from tickers import behaviors, notifications, stats, texts, vehicles
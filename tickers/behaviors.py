@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tickers for behaviors.
+"""
+
+from auto.behaviors.scheduler import SCHEDULER
+
+def flush():
+    """Save the behavior schedules modified since the last flush."""
+    SCHEDULER.flush()
+
+def wake():
+    """Wake up the due behaviors."""
+    SCHEDULER.tick()
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tickers for notifications.
+"""
+
+from logic.notifications import QUEUE
+
+def deliver():
+    """Deliver a batch of queued notifications."""
+    QUEUE.process()
@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tickers for character stats.
+"""
+
+from logic.character.regen import SCHEDULER
+from logic.character.stats import flush_all
+
+def flush():
+    """Save the stats modified since the last flush."""
+    flush_all()
+
+def regenerate():
+    """Regenerate stats and expire timed modifiers."""
+    SCHEDULER.tick()
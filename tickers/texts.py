@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tickers for texts.
+"""
+
+from twisted.internet import task
+
+from web.text.models import Text
+from world.log import tasks as log
+
+## Constants
+ARCHIVING = []
+
+def archive():
+    """
+    Archive old texts.
+
+    Texts are archived by a cooperative task, one archive at a time,
+    giving control back to the reactor between archives.  If the
+    previous task is still running, nothing is done.
+
+    """
+    if ARCHIVING:
+        return
+
+    archived = []
+
+    def step():
+        for count in Text.objects.iter_archive():
+            archived.append(count)
+            yield
+
+    def done(result):
+        del ARCHIVING[:]
+        if archived:
+            log.info("Archived {} texts in {} archives".format(sum(archived), len(archived)))
+        return result
+
+    ARCHIVING.append(True)
+    deferred = task.cooperate(step()).whenDone()
+    deferred.addErrback(lambda failure: log.error("Error while archiving texts: {}".format(
+            failure.getTraceback())))
+    deferred.addBoth(done)
+    return deferred
@@ -110,9 +110,34 @@ class Character(AvenewObject, EventCharacter):
             if hasattr(obj, "types"):
                 types = obj.types.has("notifications")
                 if types:
-                    if types[0].notifications.all():
+                    if types[0].notifications.count():
                         self.msg("|c{} vibrates|n: you have new notifications.".format(obj.get_display_name(self).capitalize()))
 
+    def at_post_unpuppet(self, account, session=None, **kwargs):
+        """
+        Called just after the Account successfully disconnected from
+        this object, severing all connections.
+
+        Args:
+            account (Account): The account object that just disconnected
+                from this object.
+            session (Session): Session id controlling the connection that
+                just disconnected.
+
+        """
+        super(Character, self).at_post_unpuppet(account, session=session, **kwargs)
+
+        # Save the modified stats
+        if "stats" in self.__dict__:
+            self.stats.flush()
+
+        # Save the screen of the device in use
+        device = self.db._aven_using
+        if device:
+            computer = device.types.get("computer")
+            if computer:
+                computer.flush_screen()
+
     def at_before_say(self, message, **kwargs):
         """
         Before the object says something.
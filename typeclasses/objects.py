@@ -17,6 +17,7 @@ from evennia.contrib.ingame_python.typeclasses import EventObject
 from evennia.utils.utils import lazy_property
 
 from auto.types.typehandler import TypeHandler
+from logic.phones import DIRECTORY
 from typeclasses.shared import AvenewObject, SharedAttributeHandler
 
 class Object(AvenewObject, EventObject):
@@ -34,6 +35,11 @@ class Object(AvenewObject, EventObject):
     def types(self):
         return TypeHandler(self)
 
+    def at_object_delete(self):
+        """The object is about to be deleted, forget its phone number."""
+        DIRECTORY.discard(self)
+        return super(Object, self).at_object_delete()
+
     def return_appearance(self, looker):
         """Return the appearance depending on types."""
         for type in self.types:
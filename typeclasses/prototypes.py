@@ -19,6 +19,7 @@ from evennia.utils.utils import lazy_property
 
 from auto.behaviors.behaviorhandler import BehaviorHandler
 from auto.types.typehandler import TypeHandler
+from logic.object.bulk import rename_tag
 from typeclasses.characters import Character
 from typeclasses.objects import Object
 from typeclasses.rooms import Room
@@ -52,9 +53,7 @@ class PChar(AvenewObject, DefaultObject):
 
     def at_rename(self, old_name, new_name):
         """The key (name) of the prototype is changed."""
-        for character in search_tag(old_name, category="pchar"):
-            character.tags.remove(old_name, category="pchar")
-            character.tags.add(new_name, category="pchar")
+        rename_tag(old_name, new_name, category="pchar")
 
     def create(self, location=None):
         """Create a character on this prototype."""
@@ -100,11 +99,16 @@ class PObj(AvenewObject, DefaultObject):
         """Return the list of objects with the PObj's key."""
         return search_tag(self.key, category="pobj")
 
+    def at_attribute_change(self, key, category=None):
+        """An attribute has changed on the prototype."""
+        super(PObj, self).at_attribute_change(key, category)
+        if key == "mass" and category is None:
+            # Objects may share this mass, invalidate all aggregate masses
+            AvenewObject._mass_generation += 1
+
     def at_rename(self, old_name, new_name):
         """The key (name) of the prototype has changed."""
-        for obj in search_tag(old_name, category="pobj"):
-            obj.tags.remove(old_name, category="pobj")
-            obj.tags.add(new_name, category="pobj")
+        rename_tag(old_name, new_name, category="pobj")
 
     def create(self, location=None, key=None):
         """Create an object on this prototype."""
@@ -152,11 +156,16 @@ class PRoom(AvenewObject, DefaultObject):
         """Return the list of rooms of this prototype."""
         return search_tag(self.key, category="proom")
 
+    def at_attribute_change(self, key, category=None):
+        """An attribute has changed on the prototype."""
+        super(PRoom, self).at_attribute_change(key, category)
+        if key == "mass" and category is None:
+            # Rooms may share this mass, invalidate all aggregate masses
+            AvenewObject._mass_generation += 1
+
     def at_rename(self, old_name, new_name):
         """The key (name) of the prototype has changed."""
-        for room in search_tag(old_name, category="proom"):
-            room.tags.remove(old_name, category="proom")
-            room.tags.add(new_name, category="proom")
+        rename_tag(old_name, new_name, category="proom")
 
     def add_room(self, room):
         """Add an existing room to this prototype."""
@@ -16,6 +16,7 @@ from evennia.contrib.ingame_python.typeclasses import EventRoom
 from evennia.contrib.ingame_python.utils import register_events
 from evennia.utils.utils import lazy_property, list_to_string
 
+from logic.object.bulk import prefetch_contents
 from logic.object.sets import ObjectSet
 from typeclasses.shared import AvenewObject, SharedAttributeHandler
 
@@ -246,9 +247,9 @@ class Room(AvenewObject, EventRoom):
         if not looker:
             return
 
-        # Get and identify all objects
-        visible = (con for con in self.contents if con != looker and
-                                                    con.access(looker, "view"))
+        # Get and identify all objects, loading their tags and attributes at once
+        contents = prefetch_contents(self, exclude=looker)
+        visible = (con for con in contents if con.access(looker, "view"))
 
         exits = []
         for con in visible:
@@ -14,13 +14,74 @@ just overloads its hooks to have it perform its function.
 
 """
 
+from collections import OrderedDict
+import hashlib
+import sys
 from textwrap import dedent
+import traceback
 
+from django.conf import settings
 from evennia_wiki.models import Page
 from evennia import DefaultScript, AccountDB
 from evennia.contrib.ingame_python.scripts import EventHandler
+from evennia.contrib.ingame_python.utils import InterruptEvent
 from evennia.utils.utils import class_from_module, inherits_from
 
+from world.log import logger
+
+## Constants
+CODE_CACHE = OrderedDict()
+CODE_CACHE_SIZE = getattr(settings, "CALLBACK_CODE_CACHE_SIZE", 2000)
+log = logger("callbacks")
+
+def compile_callback(code):
+    """
+    Return the code object of a callback.
+
+    Code objects are cached by content hash, so the same code
+    is only compiled once.  The least recently used code objects
+    are removed when the cache is full.
+
+    Args:
+        code (str): the code of the callback.
+
+    Returns:
+        compiled (code): the code object.
+
+    Raises:
+        SyntaxError: the code couldn't be compiled.
+
+    """
+    source = code.encode("utf-8") if isinstance(code, unicode) else code
+    key = hashlib.sha1(source).hexdigest()
+    compiled = CODE_CACHE.pop(key, None)
+    if compiled is None:
+        # The file name is the one used by the event handler to report errors
+        compiled = compile(code, "<string>", "exec")
+        while len(CODE_CACHE) >= CODE_CACHE_SIZE:
+            CODE_CACHE.popitem(last=False)
+
+    CODE_CACHE[key] = compiled
+    return compiled
+
+def get_syntax_error(code):
+    """
+    Compile the code of a callback and return the syntax error, if any.
+
+    Args:
+        code (str): the code of the callback.
+
+    Returns:
+        error (str or None): the syntax error, or None if the code is valid.
+
+    """
+    try:
+        compile_callback(code)
+    except SyntaxError as err:
+        return "line {}: {}".format(err.lineno, err.msg)
+
+    return None
+
 class Script(DefaultScript):
     """
     A script type is customized by redefining some or all of its hook
@@ -104,6 +165,7 @@ class AvEventHandler(EventHandler):
     def at_start(self):
         """Start the script and generate documentation."""
         super(AvEventHandler, self).at_start()
+        self.clear_cache()
         self.generate_documentation()
 
     def generate_documentation(self):
@@ -185,19 +247,29 @@ class AvEventHandler(EventHandler):
     def get_events(self, obj):
         """
         Return a dictionary of the object's events.
+
+        The events of the object's prototype are merged with the
+        object's own events.  The result is cached by typeclass, and
+        shouldn't be modified.
+
         """
-        events = EventHandler.get_events(self, obj)
-        others = {}
+        if isinstance(obj, type):
+            return EventHandler.get_events(self, obj)
 
-        # If a character, look for a PChar
-        if not isinstance(obj, type) and obj.attributes.has("prototype"):
-            if obj.db.prototype:
-                others = EventHandler.get_events(self, obj.db.prototype)
+        prototype = obj.attributes.get("prototype")
+        key = (type(obj), type(prototype) if prototype else None)
+        cache = self._get_cache("merged_events")
+        events = cache.get(key)
+        if events is None:
+            events = EventHandler.get_events(self, obj)
+            others = EventHandler.get_events(self, prototype) if prototype else {}
 
-        # Merge both dictionaries
-        for name, event in others.items():
-            if name not in events:
-                events[name] = event
+            # Merge both dictionaries
+            for name, event in others.items():
+                if name not in events:
+                    events[name] = event
+
+            cache[key] = events
 
         return events
 
@@ -212,29 +284,198 @@ class AvEventHandler(EventHandler):
             A dictionary of the object's callbacks.
 
         Note:
-            This method can be useful to override in some contexts,
-            when several objects would share callbacks.
+            The callbacks of the object's prototype are merged with the
+            object's own callbacks.  The merged dictionary is cached
+            for the object and its prototype, and the cache is cleared
+            when a callback is added, edited or removed on either of
+            them.  The returned dictionary shouldn't be modified.
 
         """
-        callbacks = EventHandler.get_callbacks(self, obj)
-        others = {}
-
-        # If a character, look for a PChar
-        if obj.attributes.has("prototype"):
-            if obj.db.prototype:
-                others = EventHandler.get_callbacks(self, obj.db.prototype)
-
-        # Merge both dictionaries
-        for name, callback_list in others.items():
-            if name not in callbacks:
-                callbacks[name] = []
-            if name == "describe":
-                callbacks[name][:] = callback_list + callbacks[name]
-            else:
-                callbacks[name].extend(callback_list)
+        prototype = obj.attributes.get("prototype")
+        key = (obj.id, prototype.id if prototype else None)
+        cache = self._get_cache("merged_callbacks")
+        callbacks = cache.get(key)
+        if callbacks is None:
+            callbacks = EventHandler.get_callbacks(self, obj)
+            others = EventHandler.get_callbacks(self, prototype) if prototype else {}
+
+            # Merge both dictionaries
+            for name, callback_list in others.items():
+                if name not in callbacks:
+                    callbacks[name] = []
+                if name == "describe":
+                    callbacks[name][:] = callback_list + callbacks[name]
+                else:
+                    callbacks[name].extend(callback_list)
+
+            cache[key] = callbacks
 
         return callbacks
 
+    def add_callback(self, obj, callback_name, code, *args, **kwargs):
+        """Add a callback and clear the merged callbacks of this object."""
+        self.check_code(obj, callback_name, code, kwargs.get("author", args[0] if args else None))
+        result = super(AvEventHandler, self).add_callback(obj, callback_name, code, *args, **kwargs)
+        self.clear_cache(obj)
+        return result
+
+    def edit_callback(self, obj, callback_name, number, code, *args, **kwargs):
+        """Edit a callback and clear the merged callbacks of this object."""
+        self.check_code(obj, callback_name, code, kwargs.get("author", args[0] if args else None))
+        result = super(AvEventHandler, self).edit_callback(obj, callback_name, number, code,
+                *args, **kwargs)
+        self.clear_cache(obj)
+        return result
+
+    def del_callback(self, obj, callback_name, *args, **kwargs):
+        """Remove a callback and clear the merged callbacks of this object."""
+        result = super(AvEventHandler, self).del_callback(obj, callback_name, *args, **kwargs)
+        self.clear_cache(obj)
+        return result
+
+    def accept_callback(self, obj, callback_name, *args, **kwargs):
+        """Accept a callback and clear the merged callbacks of this object."""
+        result = super(AvEventHandler, self).accept_callback(obj, callback_name, *args, **kwargs)
+        self.clear_cache(obj)
+        return result
+
+    def check_code(self, obj, callback_name, code, author=None):
+        """
+        Compile the code of a callback being saved and report syntax errors.
+
+        The callback is saved even if it contains a syntax error, but
+        the error is logged and sent to the author, if any.
+
+        Args:
+            obj (Object): the object containing the callback.
+            callback_name (str): the name of the callback.
+            code (str): the code of the callback.
+            author (Object, optional): the author of the callback.
+
+        Returns:
+            error (str or None): the syntax error, or None if the code is valid.
+
+        """
+        error = get_syntax_error(code)
+        if error:
+            log.warning("Syntax error in the {} callback of {}(#{}): {}".format(
+                    callback_name, obj, obj.id, error))
+            if author:
+                author.msg("|rThe {} callback of {} contains a syntax error ({}).|n".format(
+                        callback_name, obj.get_display_name(author), error))
+
+        return error
+
+    def call(self, obj, callback_name, *args, **kwargs):
+        """
+        Call the connected callbacks.
+
+        Args:
+            obj (Object): the Evennia typeclassed object.
+            callback_name (str): the callback name to call.
+            *args: additional variables for this callback.
+
+        Kwargs:
+            number (int, optional): call just a specific callback.
+            parameters (str, optional): call a callback with parameters.
+            locals (dict, optional): a locals replacement.
+
+        Returns:
+            True to report the callback was called without interruption,
+            False otherwise.
+
+        Note:
+            This method does the same as the event handler's, but
+            executes the compiled code of callbacks (see
+            `compile_callback`) instead of their source code.
+
+        """
+        number = kwargs.get("number")
+        parameters = kwargs.get("parameters")
+        locals = kwargs.get("locals")
+
+        # Errors should not pass silently
+        allowed = ("number", "parameters", "locals")
+        if any(k for k in kwargs if k not in allowed):
+            raise TypeError("Unknown keyword arguments were specified " \
+                    "to call callbacks: {}".format(kwargs))
+
+        event = self.get_events(obj).get(callback_name)
+        if locals is None and not event:
+            log.error("The callback {} for the object {} (typeclass " \
+                    "{}) can't be found".format(callback_name, obj, type(obj)))
+            return False
+
+        # Prepare the locals if necessary
+        if locals is None:
+            locals = self.ndb.fresh_locals.copy()
+            for i, variable in enumerate(event[0]):
+                try:
+                    locals[variable] = args[i]
+                except IndexError:
+                    log.exception("callback {} of {} ({}): need variable " \
+                            "{} in position {}".format(callback_name, obj,
+                            type(obj), variable, i))
+                    return False
+        else:
+            locals = dict(locals)
+
+        callbacks = self.get_callbacks(obj).get(callback_name, [])
+        if event:
+            custom_call = event[2]
+            if custom_call:
+                callbacks = custom_call(callbacks, parameters)
+
+        # Now execute all the valid callbacks linked at this object
+        self.ndb.current_locals = locals
+        for callback in callbacks:
+            if not callback["valid"]:
+                continue
+
+            if number is not None and callback["number"] != number:
+                continue
+
+            try:
+                code = compile_callback(callback["code"])
+                exec(code, locals, locals)
+            except InterruptEvent:
+                return False
+            except Exception:
+                # Syntax errors are reported like other errors
+                etype, evalue, tb = sys.exc_info()
+                trace = traceback.format_exception(etype, evalue, tb)
+                self.handle_error(callback, trace)
+
+        return True
+
+    def _get_cache(self, name):
+        """Return the cache of this name, creating it if necessary."""
+        cache = getattr(self.ndb, name)
+        if cache is None:
+            cache = {}
+            setattr(self.ndb, name, cache)
+
+        return cache
+
+    def clear_cache(self, obj=None):
+        """
+        Clear the merged callbacks.
+
+        Args:
+            obj (Object, optional): the object (or prototype) whose
+                    callbacks have changed.  If not set, clear the
+                    merged callbacks and events of all objects.
+
+        """
+        if obj is None:
+            self.ndb.merged_events = {}
+            self.ndb.merged_callbacks = {}
+            return
+
+        cache = self._get_cache("merged_callbacks")
+        for key in [key for key in cache if obj.id in key]:
+            del cache[key]
+
 
 class Net(DefaultScript):
 
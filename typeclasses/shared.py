@@ -5,25 +5,66 @@ Module containing shared classes, usually handlers to be used for objects
 with prototypes.
 
 Classes:
+    AvenewObject - mix-in shared by all Avenew typeclasses.
+    AvenewAttributeHandler - attribute handler notifying its object of changes.
+    AvenewTagHandler - tag handler notifying its object of changes.
+    OrderedContentsHandler - contents cache keeping the move order.
     SharedAttributeHandler - share attributes between the objedct and its prototype.
 
 """
 
+from collections import OrderedDict
 import time
 
+from evennia.objects.models import ContentsHandler, ObjectDB
 from evennia.typeclasses.attributes import AttributeHandler
+from evennia.typeclasses.tags import TagHandler
+from evennia.utils.utils import lazy_property, make_iter
+
+from logic.object.bulk import prefetch
+
+# Sentinel to mark a missing value (None being a valid one)
+_MISSING = object()
 
 class AvenewObject(object):
 
     """Mix-in containing shared behavior that all typeclasses in the Avenew game should use."""
 
+    # Generation of the aggregate mass caches, increase it to invalidate them all
+    _mass_generation = 0
+
+    @lazy_property
+    def attributes(self):
+        return AvenewAttributeHandler(self)
+
+    @lazy_property
+    def tags(self):
+        return AvenewTagHandler(self)
+
+    @lazy_property
+    def contents_cache(self):
+        return OrderedContentsHandler(self)
+
     @property
     def location(self):
         return super(AvenewObject, self)._ObjectDB__location_get()
     @location.setter
     def location(self, location):
+        old_location = self.location
+        moved_at = time.time()
+        self._moved_at = moved_at
+        mass = 0
+        if _has_mass_cache(old_location) or _has_mass_cache(location):
+            mass = self.mass
+
         super(AvenewObject, self)._ObjectDB__location_set(location)
-        self.db._moved_at = time.time()
+        self.db._moved_at = moved_at
+        if mass:
+            _propagate_mass(old_location, -mass)
+            _propagate_mass(self.location, mass)
+
+        _update_equipment(old_location, self)
+        _update_equipment(self.location, self)
     @location.deleter
     def location(self):
         super(AvenewObject, self)._ObjectDB__location_del()
@@ -43,22 +84,100 @@ class AvenewObject(object):
 
         Notes:
             Also available as the `contents` property.
-            We had ordering of objects.
+            We had ordering of objects: the contents cache keeps
+            objects in the order they were moved in this location.
 
         """
-        con = self.contents_cache.get(exclude=exclude)
-        con.sort(key=lambda obj: obj.attributes.get("_moved_at", 0))
-        return con
+        return self.contents_cache.get(exclude=exclude)
     contents = property(contents_get)
 
     @property
-    def mass(self):
-        """Return the mass and these of contents."""
+    def moved_at(self):
+        """
+        Return the time this object was last moved (or 0).
+
+        The timestamp is kept in memory and only read from the
+        `_moved_at` attribute the first time it is needed.
+
+        """
+        moved_at = getattr(self, "_moved_at", None)
+        if moved_at is None:
+            moved_at = self.attributes.get("_moved_at", 0)
+            self._moved_at = moved_at
+
+        return moved_at
+
+    @property
+    def own_mass(self):
+        """Return the mass of this object, without its contents."""
         mass = self.db.mass
         if mass is None:
             mass = 1
 
-        return mass + sum(obj.mass for obj in self.contents)
+        return mass
+
+    @property
+    def mass(self):
+        """
+        Return the mass and these of contents.
+
+        The aggregate mass is computed once and then kept in memory.
+        It is updated incrementally when objects move in or out of
+        this object (or of its contents), or when their own mass
+        changes, so reading it doesn't browse the contents tree.
+
+        """
+        cache = getattr(self, "_mass_cache", None)
+        if cache is None or cache[0] != AvenewObject._mass_generation:
+            own = self.own_mass
+            total = own + sum(obj.mass for obj in self.contents)
+            cache = (AvenewObject._mass_generation, own, total)
+            self._mass_cache = cache
+
+        return cache[2]
+    @mass.setter
+    def mass(self, mass):
+        """Change the mass of this object (not of its contents)."""
+        self.db.mass = mass
+
+    def at_attribute_change(self, key, category=None):
+        """
+        Called by the attribute handler when an attribute has changed.
+
+        Args:
+            key (str): the key of the attribute added or removed.
+            category (str, optional): the attribute category.
+
+        """
+        if key == "mass" and category is None:
+            self._update_own_mass()
+
+    def at_tag_change(self, key, category=None):
+        """
+        Called by the tag handler when a tag has changed.
+
+        Args:
+            key (str): the key of the tag added or removed.
+            category (str, optional): the tag category.
+
+        """
+        if category == "eq":
+            _update_equipment(self.location, self)
+
+    def _update_own_mass(self):
+        """Update the aggregate mass after the own mass has changed."""
+        cache = getattr(self, "_mass_cache", None)
+        generation = AvenewObject._mass_generation
+        if cache is None or cache[0] != generation:
+            if _has_mass_cache(self.location):
+                # The old mass is unknown, invalidate all caches
+                AvenewObject._mass_generation += 1
+            return
+
+        own = self.own_mass
+        delta = own - cache[1]
+        self._mass_cache = (generation, own, cache[2] + delta)
+        _propagate_mass(self.location, delta)
 
     @property
     def locations(self):
@@ -177,16 +296,200 @@ class AvenewObject(object):
             candidates = self.location.contents
             if hasattr(self, "equipment"):
                 candidates += self.equipment.all(only_visible=True)
+            prefetch(candidates)
 
         results = super(AvenewObject, self).search(searchdata, candidates=candidates, **kwargs)
         if kwargs.get("quiet", False):
             results = list(results)
-            results.sort(key=lambda obj: obj.attributes.get("_moved_at", 0))
+            results.sort(key=get_moved_at)
 
         return results
 
 
-class SharedAttributeHandler(AttributeHandler):
+class OrderedContentsHandler(ContentsHandler):
+
+    """
+    A contents cache retaining the order in which objects were moved.
+
+    Evennia's default contents cache stores primary keys in a
+    dictionary.  This handler stores them in an ordered dictionary
+    instead, the last object moved into the location being at the end.
+    The move timestamps are only read when the cache is built (after
+    a reload, for instance), so that getting contents doesn't
+    access attributes at all.
+
+    """
+
+    def __init__(self, obj):
+        self.obj = obj
+        self._pkcache = OrderedDict()
+        self._idcache = obj.__class__.__instance_cache__
+        self.init()
+
+    def init(self):
+        """Re-initialize the cache, sorting objects by move time."""
+        objs = [obj for obj in ObjectDB.objects.filter(db_location=self.obj) if obj.pk]
+        objs.sort(key=get_moved_at)
+        for obj in objs:
+            self._pkcache[obj.pk] = None
+
+    def add(self, obj):
+        """Add an object at the end of the contents cache.
+
+        Args:
+            obj (Object): the object to add.
+
+        """
+        self._pkcache.pop(obj.pk, None)
+        self._pkcache[obj.pk] = None
+
+    def clear(self):
+        """Clear and re-initialize the contents cache."""
+        self._pkcache = OrderedDict()
+        self.init()
+
+
+def _has_mass_cache(location):
+    """Return whether a location in this chain has a valid mass cache."""
+    generation = AvenewObject._mass_generation
+    while location is not None:
+        cache = getattr(location, "_mass_cache", None)
+        if cache is not None and cache[0] == generation:
+            return True
+
+        location = location.location
+
+    return False
+
+
+def _propagate_mass(location, delta):
+    """Add `delta` to the aggregate mass of the location chain."""
+    generation = AvenewObject._mass_generation
+    while location is not None:
+        cache = getattr(location, "_mass_cache", None)
+        if cache is not None and cache[0] == generation:
+            location._mass_cache = (generation, cache[1], cache[2] + delta)
+
+        location = location.location
+
+
+def _update_equipment(location, obj):
+    """Update the equipment caches of the location chain, if created."""
+    parent = location
+    while parent is not None:
+        if "equipment" in parent.__dict__:
+            if parent is location:
+                parent.equipment.update(obj)
+            else:
+                parent.equipment.invalidate()
+
+        parent = parent.location
+
+
+def get_moved_at(obj):
+    """Return the move timestamp of any object, 0 if unknown."""
+    moved_at = getattr(obj, "moved_at", None)
+    if moved_at is None:
+        moved_at = obj.attributes.get("_moved_at", 0)
+
+    return moved_at
+
+
+class AvenewAttributeHandler(AttributeHandler):
+
+    """
+    Attribute handler notifying its object when attributes change.
+
+    After an attribute is added or removed, the object's
+    `at_attribute_change` hook is called with the attribute key and
+    category.  This allows to keep in-memory values (like the
+    aggregate mass) up to date without querying attributes again.
+    The handler also keeps a generation number, increased at every
+    change, so that other handlers can tell their cache is outdated.
+
+    """
+
+    def __init__(self, obj):
+        super(AvenewAttributeHandler, self).__init__(obj)
+        self._generation = 0
+
+    def add(self, key, value, category=None, lockstring="",
+            strattr=False, accessing_obj=None, default_access=True):
+        """Add an attribute and notify the object."""
+        super(AvenewAttributeHandler, self).add(key, value,
+                category=category, lockstring=lockstring, strattr=strattr,
+                accessing_obj=accessing_obj, default_access=default_access)
+        self._notify(key, category)
+
+    def remove(self, key, raise_exception=False, category=None,
+            accessing_obj=None, default_access=True):
+        """Remove an attribute and notify the object."""
+        super(AvenewAttributeHandler, self).remove(key,
+                raise_exception=raise_exception, category=category,
+                accessing_obj=accessing_obj, default_access=default_access)
+        for key in make_iter(key):
+            self._notify(key, category)
+
+    def clear(self, category=None, accessing_obj=None, default_access=True):
+        """Remove all attributes and notify the object."""
+        keys = [(attr.key, attr.category) for attr in self.all()
+                if category is None or attr.category == category]
+        super(AvenewAttributeHandler, self).clear(category=category,
+                accessing_obj=accessing_obj, default_access=default_access)
+        for key, attr_category in keys:
+            self._notify(key, attr_category)
+
+    def _notify(self, key, category=None):
+        """Call the object's `at_attribute_change` hook, if present."""
+        self._generation += 1
+        hook = getattr(self.obj, "at_attribute_change", None)
+        if hook:
+            hook(key, category)
+
+
+class AvenewTagHandler(TagHandler):
+
+    """
+    Tag handler notifying its object when tags change.
+
+    After a tag is added or removed, the object's `at_tag_change` hook
+    is called with the tag key and category.  This allows to keep
+    in-memory indexes (like the equipment of characters) up to date.
+
+    """
+
+    def add(self, tag=None, category=None, data=None):
+        """Add one or several tags and notify the object."""
+        super(AvenewTagHandler, self).add(tag=tag, category=category, data=data)
+        for key in make_iter(tag):
+            self._notify(key, category)
+
+    def remove(self, key, category=None):
+        """Remove one or several tags and notify the object."""
+        super(AvenewTagHandler, self).remove(key, category=category)
+        for key in make_iter(key):
+            self._notify(key, category)
+
+    def clear(self, category=None):
+        """Remove all tags and notify the object."""
+        keys = [(tag.db_key, tag.db_category) for tag in self._getcache()
+                if category is None or tag.db_category == category]
+        super(AvenewTagHandler, self).clear(category=category)
+        for key, tag_category in keys:
+            self._notify(key, tag_category)
+
+    def _notify(self, key, category=None):
+        """Call the object's `at_tag_change` hook, if present."""
+        if key is None:
+            return
+
+        category = category.strip().lower() if category else category
+        hook = getattr(self.obj, "at_tag_change", None)
+        if hook:
+            hook(key, category)
+
+
+class SharedAttributeHandler(AvenewAttributeHandler):
 
     """
     A shared attribute handler, to share attributes between object and prototype.
@@ -219,8 +522,67 @@ class SharedAttributeHandler(AttributeHandler):
     3
     >>> # Back to the prototype value
 
+    Simple lookups (a single key, without locks or options) are
+    resolved once on the object, then on its prototype, and the
+    result is kept in a per-object cache, misses included.  This
+    cache is cleared when the object's attributes change, or when
+    the prototype's attributes change (the prototype's handler
+    generation is then different).
+
     """
 
+    def __init__(self, obj):
+        super(SharedAttributeHandler, self).__init__(obj)
+        self._shared_cache = {}
+        self._prototype = _MISSING
+        self._prototype_generation = None
+
+    def _notify(self, key, category=None):
+        """Clear the shared cache and notify the object."""
+        self._shared_cache.clear()
+        self._prototype = _MISSING
+        super(SharedAttributeHandler, self)._notify(key, category)
+
+    def _resolve(self, key, category=None):
+        """
+        Return the Attribute object on the object or its prototype.
+
+        Args:
+            key (str): the attribute key.
+            category (str, optional): the attribute category.
+
+        Returns:
+            attribute (Attribute or None): the attribute, or `None` if
+                    neither the object nor its prototype have it.
+
+        """
+        prototype = self._prototype
+        if prototype is _MISSING:
+            prototype = AttributeHandler.get(self, "prototype")
+            self._prototype = prototype
+
+        generation = None
+        if prototype:
+            generation = getattr(prototype.attributes, "_generation", None)
+        if generation != self._prototype_generation:
+            self._shared_cache.clear()
+            self._prototype_generation = generation
+
+        cachekey = (key, category)
+        attr = self._shared_cache.get(cachekey, _MISSING)
+        if attr is _MISSING or (attr is not None and attr.pk is None):
+            attr = AttributeHandler.get(self, key, category=category,
+                    return_obj=True)
+            if prototype and (attr is None or attr.value is None):
+                shared = prototype.attributes.get(key, category=category,
+                        return_obj=True)
+                if shared is not None:
+                    attr = shared
+
+            self._shared_cache[cachekey] = attr
+
+        return attr
+
     def has(self, key=None, category=None):
         """
         Checks if the given Attribute (or list of Attributes) exists on
@@ -238,6 +600,9 @@ class SharedAttributeHandler(AttributeHandler):
                 the return is a list of booleans.
 
         """
+        if isinstance(key, basestring):
+            return self._resolve(key, category) is not None
+
         ret = super(SharedAttributeHandler, self).has(
                 key=key, category=category)
         if isinstance(ret, list):
@@ -293,6 +658,12 @@ class SharedAttributeHandler(AttributeHandler):
                 was found matching `key`.
 
         """
+        if isinstance(key, basestring) and not (return_obj or strattr or
+                raise_exception or accessing_obj or return_list):
+            attr = self._resolve(key, category)
+            value = attr.value if attr is not None else None
+            return default if value is None else value
+
         ret = super(SharedAttributeHandler, self).get(
                 key=key, default=None, category=category,
                 return_obj=return_obj, strattr=strattr,
@@ -11,7 +11,7 @@ from random import choice
 
 from evennia import DefaultObject, MONITOR_HANDLER
 
-from logic.geo import NAME_OPP_DIRECTIONS, coords_in, direction_between, distance_between
+from logic.geo import NAME_OPP_DIRECTIONS, coords_in, direction_between, distance_between, get_direction
 from typeclasses.rooms import Room
 from typeclasses.shared import AvenewObject
 from world.log import logger
@@ -858,6 +858,157 @@ class Vehicle(AvenewObject, DefaultObject):
         self.db.constant_speed = 0
         self.db.desired_speed = 0
 
+    # Driving actions, shared by the driving commands and NPC behaviors
+    def check_driver(self, driver):
+        """Check that `driver` is driving this vehicle.
+
+        Raises:
+            ValueError: `driver` isn't driving this vehicle.
+
+        """
+        if self.db.driver is not driver:
+            raise ValueError("|gYou aren't driving {}.|n".format(self.key))
+
+    def set_speed(self, driver, speed):
+        """Change the desired speed of the vehicle.
+
+        If the vehicle is parked, it leaves its parking spot.
+
+        Args:
+            driver (Character): the driver of this vehicle.
+            speed (int or str): the new desired speed, in MPH.
+
+        Raises:
+            ValueError: the action couldn't be performed, with the
+                    message to display to the driver.
+
+        """
+        self.check_driver(driver)
+
+        # If the vehicle is parked, un-park it
+        if self.location is not None:
+            self.location = None
+
+        try:
+            speed = int(speed)
+            assert speed >= 0
+        except (ValueError, AssertionError):
+            raise ValueError("|rSorry, this is not a valid speed.|n")
+
+        current = self.db.speed
+        self.db.desired_speed = speed
+
+        # Display a message to the vehicle if the speed changes
+        if current < speed:
+            self.msg_contents("{} begins to speed up.".format(self.key))
+        elif current > speed:
+            self.msg_contents("{} begins to slow down.".format(self.key))
+
+    def prepare_turn(self, driver, direction):
+        """Prepare to turn at the next open crossroad.
+
+        Args:
+            driver (Character): the driver of this vehicle.
+            direction (str): the name or alias of the direction.
+
+        Returns:
+            infos (dict): the direction information (see `get_direction`).
+
+        Raises:
+            ValueError: the action couldn't be performed, with the
+                    message to display to the driver.
+
+        """
+        self.check_driver(driver)
+        infos = get_direction(direction)
+        if infos is None or infos["direction"] in (8, 9):
+            raise ValueError("|gThe direction you specified is unknown.|n")
+
+        self.db.expected_direction = infos["direction"]
+        return infos
+
+    def park(self, driver, side=None):
+        """Park the vehicle on a sidewalk.
+
+        Args:
+            driver (Character): the driver of this vehicle.
+            side (str, optional): the name or alias of the direction
+                    in which to park.  If not set, park on the right.
+
+        Returns:
+            infos (dict): the direction information of the sidewalk.
+
+        Raises:
+            ValueError: the action couldn't be performed, with the
+                    message to display to the driver.
+
+        """
+        self.check_driver(driver)
+
+        # Check the speed
+        if self.db.speed > 10:
+            raise ValueError("|gYou are still driving too fast.|n")
+
+        # Get both sides of the current coordinate
+        x, y, z = self.db.coords
+
+        # The Z coordinate could be invalid at this point, if there's a slope.
+        previous = self.db.previous_crossroad
+        direction = self.db.direction
+        distance = distance_between(int(round(x)), int(round(y)), 0,
+                previous.x, previous.y, 0)
+
+        if (x, y) != (previous.x, previous.y):
+            street = previous.db.exits[direction]
+
+            try:
+                assert distance > 0
+                x, y, z = street["coordinates"][distance - 1]
+            except AssertionError:
+                x, y, z = previous.x, previous.y, previous.z
+            except IndexError:
+                log.warning("Cannot find the Z coordinate for vehicle " \
+                        "#{}, trying to park at {} {}.".format(
+                        self.id, x, y))
+
+                raise ValueError("|gIt seems you can't park here.|n")
+        else:
+            raise ValueError("|gNow, you cannot park in the middle of a crossroad.|n")
+
+        # Get the matching street
+        log.debug("Parking #{} on {} {} {}".format(self.id, x, y, z))
+        closest, name, streets = Crossroad.get_street(x, y, z)
+        if not streets:
+            raise ValueError("|gYou don't find any free spot to park.|n")
+
+        # Park left of right, according to the specified direction
+        side = side if side and side.strip() else get_direction((direction + 2) % 8)["name"]
+        infos = get_direction(side)
+        if infos is None or infos["direction"] in (8, 9):
+            raise ValueError("|rYou have specified an unknown direction: {}.|n".format(side))
+
+        side_direction = infos["direction"]
+        if (side_direction + 2) % 8 != direction and (side_direction - 2) % 8 != direction:
+            raise ValueError("|r{} isn't a valid direction in which to park.|n\n|gCheck the street direction.|n".format(infos["name"]))
+
+        spot = streets.get(side_direction)
+        log.debug("  Parking #{} in {}, found {}".format(self.id, infos["name"], spot))
+
+        # If there's no room there
+        if spot and spot["room"] is None:
+            raise ValueError("|gYou don't find any free spot to park.|n")
+
+        room = spot["room"]
+        self.location = room
+        self.stop()
+        numbers = "-".join(str(n) for n in spot["numbers"])
+        driver.location.msg_contents("{driver} parks {vehicle} on the {sidewalk} sidewalk.",
+                exclude=[driver], mapping=dict(driver=driver,
+                vehicle=self, sidewalk=infos["name"]))
+        self.msg_contents("{vehicle} pulls up in front of {numbers} {street}",
+                mapping=dict(vehicle=self, numbers=numbers, street=name))
+        return infos
+
     def start_monitoring(self):
         """Begin monitoring the vehicle's coordinates.
 
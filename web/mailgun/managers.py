@@ -4,6 +4,8 @@ from django.db import models
 from django.db.models import Q, Count
 from anymail.inbound import AnymailInboundMessage
 
+from world.utils import get_words
+
 
 class EmailManager(models.Manager):
 
@@ -61,4 +63,46 @@ class EmailManager(models.Manager):
         # Create the EmailMessage
         email = EmailMessage(db_thread=thread, db_date_created=date, db_sender=from_email, db_message_id=message_id, db_text=text, db_html=html)
         email.save()
+        EmailMessage.objects.index([email])
         return email
+
+    def index(self, emails):
+        """Index the words of these emails, to search them.
+
+        Args:
+            emails (list of EmailMessage): the emails to index.
+
+        """
+        from .models import EmailWord
+        EmailWord.objects.bulk_create([EmailWord(db_word=word, db_email=email)
+                for email in emails for word in get_words(email.db_text)])
+
+    def search(self, query, address=None, start=0, count=20):
+        """Search the emails containing all the words of a query.
+
+        Args:
+            query (str): the words to search.
+            address (str, optional): the email address of the one searching.
+                    If set, only the emails of threads in which this
+                    address participates are returned.
+            start (int, optional): the index of the first email.
+            count (int, optional): the number of emails to return.
+
+        Returns:
+            emails (list of EmailMessage): the matching emails, most recent first.
+
+        """
+        words = get_words(query)
+        if not words:
+            return []
+
+        emails = self.all()
+        for word in words:
+            emails = emails.filter(words__db_word=word)
+
+        if address is not None:
+            emails = emails.filter(db_thread__db_participants__db_email=address)
+
+        emails = emails.order_by("-db_date_created", "-id").select_related(
+                "db_sender", "db_thread")
+        return list(emails[start:start + count])
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import re
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+RE_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def get_words(string):
+    """Return the set of words to index in a string."""
+    if isinstance(string, bytes):
+        string = string.decode("utf-8", "replace")
+
+    return set(word[:30] for word in RE_WORD.findall(string.lower()) if len(word) >= 2)
+
+
+def index_emails(apps, schema_editor):
+    """Index the words of existing emails."""
+    EmailMessage = apps.get_model("mailgun", "EmailMessage")
+    EmailWord = apps.get_model("mailgun", "EmailWord")
+    words = []
+    for email_id, text in EmailMessage.objects.values_list("id", "db_text").iterator():
+        words.extend(EmailWord(db_word=word, db_email_id=email_id) for word in get_words(text))
+        if len(words) >= 1000:
+            EmailWord.objects.bulk_create(words)
+            words = []
+
+    EmailWord.objects.bulk_create(words)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mailgun', '0002_auto_20181104_2007'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailWord',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('db_word', models.CharField(max_length=30)),
+                ('db_email', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='words', to='mailgun.EmailMessage')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='emailword',
+            unique_together=set([('db_word', 'db_email')]),
+        ),
+        migrations.RunPython(index_emails, migrations.RunPython.noop),
+    ]
@@ -200,5 +200,22 @@ class EmailMessage(SharedMemoryModel):
             # Create the EmailMessage
             email = EmailMessage(db_thread=thread, db_sender=from_email, db_message_id=message_id, db_text=text, db_html=html)
             email.save()
+            EmailMessage.objects.index([email])
 
         return message_id
+
+
+class EmailWord(models.Model):
+
+    """A word in an email, to search emails.
+
+    Every email has one row per distinct word in its text (see
+    `world.utils.get_words`), created with the email.
+
+    """
+
+    db_word = models.CharField(max_length=30)
+    db_email = models.ForeignKey(EmailMessage, on_delete=models.CASCADE, related_name="words")
+
+    class Meta:
+        unique_together = ("db_word", "db_email")
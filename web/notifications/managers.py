@@ -0,0 +1,72 @@
+from __future__ import absolute_import, unicode_literals
+
+from django.conf import settings
+from django.db import models
+
+## Constants
+MAX_NOTIFICATIONS = getattr(settings, "NOTIFICATION_MAX", 100)
+
+class NotificationManager(models.Manager):
+
+    """Notification manager."""
+
+    def for_device(self, device, type_name, start=0, count=None):
+        """
+        Return the notifications of a device, most recent first.
+
+        Args:
+            device (Object): the device (phone or computer).
+            type_name (str): the name of the type owning the notifications.
+            start (int, optional): the index of the first notification.
+            count (int, optional): the number of notifications to return.
+
+        Returns:
+            notifications (QuerySet): the notifications.
+
+        """
+        query = self.filter(db_device=device, db_type=type_name).order_by(
+                "-db_timestamp", "-id")
+        if count is not None:
+            return query[start:start + count]
+
+        return query[start:]
+
+    def notify(self, device, type_name, **kwargs):
+        """
+        Create a notification for a device, evicting the oldest ones.
+
+        Only `MAX_NOTIFICATIONS` are kept by device and type: older
+        notifications are deleted in one query.
+
+        Args:
+            device (Object): the device (phone or computer).
+            type_name (str): the name of the type owning the notifications.
+            Other keyword arguments are given to the notification.
+
+        Returns:
+            notification (Notification): the new notification.
+
+        """
+        notification = self.create(db_device=device, db_type=type_name, **kwargs)
+        old = list(self.filter(db_device=device, db_type=type_name).order_by(
+                "-db_timestamp", "-id").values_list("id", flat=True)[MAX_NOTIFICATIONS:])
+        if old:
+            self.filter(id__in=old).delete()
+
+        return notification
+
+    def clear_for(self, device, type_name, group=None):
+        """
+        Delete the notifications of a device, in one query.
+
+        Args:
+            device (Object): the device (phone or computer).
+            type_name (str): the name of the type owning the notifications.
+            group (str, optional): only delete the notifications of this group.
+
+        """
+        query = self.filter(db_device=device, db_type=type_name)
+        if group is not None:
+            query = query.filter(db_group=group)
+
+        query.delete()
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import evennia.utils.picklefield
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('objects', '0009_remove_objectdb_db_player'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('db_type', models.CharField(default='', max_length=20)),
+                ('db_group', models.CharField(blank=True, max_length=100, null=True)),
+                ('db_timestamp', models.FloatField()),
+                ('db_title', models.CharField(max_length=255)),
+                ('db_content', models.TextField(blank=True, default='')),
+                ('db_screen', models.CharField(max_length=255)),
+                ('db_app', models.CharField(max_length=50)),
+                ('db_folder', models.CharField(default='app', max_length=50)),
+                ('db_data', evennia.utils.picklefield.PickledObjectField(null=True)),
+                ('db_device', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='objects.ObjectDB')),
+            ],
+        ),
+        migrations.AlterIndexTogether(
+            name='notification',
+            index_together=set([('db_device', 'db_type', 'db_timestamp'), ('db_device', 'db_type', 'db_group')]),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models
+from evennia.objects.models import ObjectDB
+from evennia.utils.idmapper.models import SharedMemoryModel
+from evennia.utils.picklefield import PickledObjectField
+
+from web.notifications.managers import NotificationManager
+
+class Notification(SharedMemoryModel):
+
+    """A notification on a device (phone or computer)."""
+
+    objects = NotificationManager()
+    db_device = models.ForeignKey(ObjectDB, on_delete=models.CASCADE, related_name="+")
+    db_type = models.CharField(max_length=20, default="")
+    db_group = models.CharField(max_length=100, null=True, blank=True)
+    db_timestamp = models.FloatField()
+    db_title = models.CharField(max_length=255)
+    db_content = models.TextField(blank=True, default="")
+    db_screen = models.CharField(max_length=255)
+    db_app = models.CharField(max_length=50)
+    db_folder = models.CharField(max_length=50, default="app")
+    db_data = PickledObjectField(null=True)
+
+    class Meta:
+        index_together = [
+            ("db_device", "db_type", "db_timestamp"),
+            ("db_device", "db_type", "db_group"),
+        ]
+
+    def __str__(self):
+        return "{}: {}".format(self.id, self.db_title)
@@ -1,30 +1,87 @@
 from __future__ import absolute_import, unicode_literals
 import datetime
 from collections import OrderedDict
+from hashlib import sha1
 
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
 from django.db.models import Q, Count
 from django.utils.timezone import make_aware
 
+from world.utils import get_words
+
 # Global imports
 _GAMETIME = None
 _THREAD = None
 _NUMBER = None
+_PARTICIPANT = None
+_TEXT_WORD = None
+_ARCHIVE = None
+_ARCHIVE_WORD = None
+
+# Constants
+ARCHIVE_AGE = getattr(settings, "TEXT_ARCHIVE_AGE", 90)
+ARCHIVE_SIZE = getattr(settings, "TEXT_ARCHIVE_SIZE", 100)
+ARCHIVE_INTERVAL = getattr(settings, "TEXT_ARCHIVE_INTERVAL", 3600)
+
+def get_participant_key(numbers):
+    """Return the canonical key of a set of phone numbers.
+
+    The key doesn't depend on the order of the numbers, nor on the
+    presence of dashes or duplicates.
+
+    Args:
+        numbers (list of str): the phone numbers.
+
+    Returns:
+        key (str): the participant key (a SHA-1 hex digest).
+
+    """
+    numbers = sorted(set(number.replace("-", "") for number in numbers))
+    return sha1(",".join(numbers).encode("utf-8")).hexdigest()
+
 
 class ThreadManager(models.Manager):
 
     """Thread manager."""
 
     def get_thread(self, numbers):
-        numbers = [number.replace("-", "") for number in numbers]
-        query = self.annotate(num_recipients=Count("db_recipients"))
-        for number in numbers:
-            query = query.filter(db_recipients__db_phone_number=number)
-        query = query.filter(num_recipients=len(numbers))
-        return query.first() if query.count() else None
+        """Return the thread between exactly these numbers, or None.
+
+        Args:
+            numbers (list of str): the phone numbers.
+
+        """
+        return self.filter(db_key=get_participant_key(numbers)).first()
 
 class TextManager(models.Manager):
 
+    def _get_numbers(self, numbers):
+        """Return the Number objects, creating the missing ones in bulk.
+
+        Args:
+            numbers (list of str): the phone numbers.
+
+        Returns:
+            numbers (dict): a dictionary of {phone number: Number}.
+
+        """
+        global _NUMBER
+        if not _NUMBER:
+            from web.text.models import Number as _NUMBER
+
+        numbers = set(number.replace("-", "") for number in numbers)
+        found = dict((obj.db_phone_number, obj) for obj in
+                _NUMBER.objects.filter(db_phone_number__in=numbers))
+        missing = [number for number in numbers if number not in found]
+        if missing:
+            _NUMBER.objects.bulk_create([_NUMBER(db_phone_number=number)
+                    for number in missing])
+            found.update((obj.db_phone_number, obj) for obj in
+                    _NUMBER.objects.filter(db_phone_number__in=missing))
+
+        return found
+
     def get_texts_for(self, number):
         """Get all messages sent by or received by the number."""
         number = number.replace("-", "")
@@ -34,9 +91,39 @@ class TextManager(models.Manager):
 
         q = self.filter(db_thread__db_recipients__db_phone_number=number)
         return q.order_by("-db_date_sent").prefetch_related(
-                "db_sender", "db_thread", "db_thread__db_recipients", "db_thread__db_read")
+                "db_sender", "db_thread", "db_thread__db_recipients")
+
+    def get_participations(self, number, start=0, count=None):
+        """Return the participations of a number, most recent first.
+
+        Every participation links a thread with its unread flag for
+        this number.  The thread and its last text are loaded in the
+        same query.
+
+        Args:
+            number (str): the phone number.
+            start (int, optional): the index of the first thread.
+            count (int, optional): the number of threads to return.
 
-    def get_threads_for(self, number):
+        Returns:
+            participations (QuerySet): the Participant objects.
+
+        """
+        global _PARTICIPANT
+        if not _PARTICIPANT:
+            from web.text.models import Participant as _PARTICIPANT
+
+        number = number.replace("-", "")
+        query = _PARTICIPANT.objects.filter(db_number__db_phone_number=number,
+                db_thread__db_last_text__isnull=False).order_by(
+                "-db_last_activity", "-id").select_related("db_thread",
+                "db_thread__db_last_text", "db_thread__db_last_text__db_sender")
+        if count is not None:
+            return query[start:start + count]
+
+        return query[start:]
+
+    def get_threads_for(self, number, start=0, count=None):
         """Return the thread messages for the given number.
 
         This method returns the list of texts sorted by threads.
@@ -44,20 +131,95 @@ class TextManager(models.Manager):
         method will return a dictionary with thread IDs as key, and
         the most recent text of the thread as value.
 
+        Args:
+            number (str): the phone number.
+            start (int, optional): the index of the first thread.
+            count (int, optional): the number of threads to return.
+
         """
         threads = OrderedDict()
-        for text in self.get_texts_for(number):
-            thread = text.db_thread
-            if thread and thread.id not in threads:
-                threads[thread.id] = text
+        for participant in self.get_participations(number, start, count):
+            thread = participant.db_thread
+            threads[thread.id] = thread.db_last_text
 
         return threads
 
-    def get_texts_with(self, numbers):
+    def get_page(self, thread, before=None, count=10):
+        """Return a page of texts in a thread, using keyset pagination.
+
+        Texts are read from the most recent to the oldest, using the
+        index on (thread, date sent): the cost doesn't depend on the
+        length of the thread.  When there are no more texts in the
+        text table, texts are read from the archives of the thread.
+
+        Args:
+            thread (Thread): the thread.
+            before (tuple, optional): the (date sent, ID) of the oldest text
+                    of the previous page.  If not set, return the most
+                    recent texts.
+            count (int, optional): the number of texts in the page.
+
+        Returns:
+            (texts, more) (tuple): the list of texts (oldest first) and
+                    whether there are older texts.  Archived texts are
+                    `ArchivedText` objects.
+
+        """
+        query = self.filter(db_thread=thread)
+        if before is not None:
+            date, text_id = before
+            query = query.filter(Q(db_date_sent__lt=date) | Q(
+                    db_date_sent=date, id__lt=text_id))
+
+        texts = list(query.order_by("-db_date_sent", "-id").select_related(
+                "db_sender")[:count + 1])
+        if len(texts) <= count:
+            texts += self._get_archived(thread, before, count + 1 - len(texts))
+
+        more = len(texts) > count
+        texts = texts[:count]
+        texts.reverse()
+        return texts, more
+
+    def _get_archived(self, thread, before, count):
+        """Return archived texts of a thread, most recent first.
+
+        Archives are only decompressed until enough texts are found.
+
+        Args:
+            thread (Thread): the thread.
+            before (tuple): the (date sent, ID) of the oldest text
+                    already displayed, or None.
+            count (int): the maximum number of texts to return.
+
+        """
+        global _ARCHIVE
+        if not _ARCHIVE:
+            from web.text.models import TextArchive as _ARCHIVE
+
+        archives = _ARCHIVE.objects.filter(db_thread=thread)
+        if before is not None:
+            before = (before[0], before[1])
+            archives = archives.filter(db_date_start__lte=before[0])
+
+        texts = []
+        for archive in archives.order_by("-db_date_end", "-id").iterator():
+            for text in reversed(archive.texts):
+                if before is None or (text.db_date_sent, text.id) < before:
+                    texts.append(text)
+
+            if len(texts) >= count:
+                break
+
+        return texts[:count]
+
+    def get_texts_with(self, numbers, count=None):
         """Return the list of texts of these numbers.
 
         Args:
             numbers (list of str): the phone numbers to query.
+            count (int, optional): the maximum number of texts to return
+                    (the most recent ones).
 
         """
         numbers = [number.replace("-", "") for number in numbers]
@@ -65,8 +227,179 @@ class TextManager(models.Manager):
         for number in numbers:
             query = query.filter(db_thread__db_recipients__db_phone_number=number)
         query = query.filter(num_recipients=len(numbers))
-        return query.order_by("-db_date_sent").prefetch_related(
-                "db_sender", "db_thread", "db_thread__db_recipients", "db_thread__db_read")
+        query = query.order_by("-db_date_sent").prefetch_related(
+                "db_sender", "db_thread", "db_thread__db_recipients")
+        if count is not None:
+            query = query[:count]
+
+        return query
+
+    def index(self, texts):
+        """Index the words of these texts, to search them.
+
+        Args:
+            texts (list of Text): the texts to index.
+
+        """
+        global _TEXT_WORD
+        if not _TEXT_WORD:
+            from web.text.models import TextWord as _TEXT_WORD
+
+        _TEXT_WORD.objects.bulk_create([_TEXT_WORD(db_word=word, db_text=text)
+                for text in texts for word in get_words(text.db_content)])
+
+    def search(self, query, number=None, start=0, count=20):
+        """Search the texts containing all the words of a query.
+
+        Args:
+            query (str): the words to search.
+            number (str, optional): the phone number of the one searching.
+                    If set, only the texts of threads this number
+                    participates to are returned.
+            start (int, optional): the index of the first text.
+            count (int, optional): the number of texts to return.
+
+        Returns:
+            texts (list of Text): the matching texts, most recent first.
+                    Archived texts (`ArchivedText` objects) come after
+                    the others.
+
+        """
+        words = get_words(query)
+        if not words:
+            return []
+
+        texts = self.all()
+        for word in words:
+            texts = texts.filter(words__db_word=word)
+
+        if number is not None:
+            number = number.replace("-", "")
+            texts = texts.filter(db_thread__participant__db_number__db_phone_number=number)
+
+        texts = texts.order_by("-db_date_sent", "-id").select_related(
+                "db_sender", "db_thread")
+        found = list(texts[start:start + count])
+        if len(found) < count:
+            skip = 0 if found else max(0, start - texts.count())
+            found += self._search_archives(words, number, skip, count - len(found))
+
+        return found
+
+    def _search_archives(self, words, number, start, count):
+        """Search the archived texts containing all these words.
+
+        Only the archives with matching texts are decompressed.
+
+        Args:
+            words (set of str): the words to search.
+            number (str): the phone number of the one searching, or None.
+            start (int): the index of the first text.
+            count (int): the number of texts to return.
+
+        Returns:
+            texts (list of ArchivedText): the matching texts, most recent first.
+
+        """
+        global _ARCHIVE, _ARCHIVE_WORD
+        if not _ARCHIVE:
+            from web.text.models import TextArchive as _ARCHIVE
+        if not _ARCHIVE_WORD:
+            from web.text.models import ArchiveWord as _ARCHIVE_WORD
+
+        hits = _ARCHIVE_WORD.objects.filter(db_word__in=words)
+        if number is not None:
+            hits = hits.filter(db_archive__db_thread__participant__db_number__db_phone_number=number)
+
+        hits = list(hits.values_list("db_archive", "db_text_id").annotate(
+                num_words=Count("id")).filter(num_words=len(words)).order_by(
+                "-db_text_id")[start:start + count])
+        if not hits:
+            return []
+
+        archived = {}
+        for archive in _ARCHIVE.objects.filter(id__in=set(hit[0] for hit in hits)):
+            archived.update((text.id, text) for text in archive.texts)
+
+        return [archived[hit[1]] for hit in hits if hit[1] in archived]
+
+    def iter_archive(self, age=None, size=None):
+        """
+        Archive old texts, one archive at a time.
+
+        Texts older than `age` are compressed, `size` texts per
+        archive, and removed from the text table.  Only full archives
+        are created: the remaining texts of a thread stay in the text
+        table until there are enough of them.  The last text of a
+        thread is never archived, so that thread summaries are kept.
+        The words of archived texts are kept to search them.
+
+        Args:
+            age (int, optional): the age (in days of game time) of the
+                    texts to archive.  If not set, use `TEXT_ARCHIVE_AGE`.
+            size (int, optional): the number of texts per archive.
+                    If not set, use `TEXT_ARCHIVE_SIZE`.
+
+        Returns:
+            archived (generator): a generator archiving the texts of
+                    one archive at each step, yielding the number of
+                    archived texts.
+
+        """
+        global _GAMETIME, _THREAD, _TEXT_WORD, _ARCHIVE, _ARCHIVE_WORD
+        if not _GAMETIME:
+            from evennia.utils import gametime as _GAMETIME
+        if not _THREAD:
+            from web.text.models import Thread as _THREAD
+        if not _TEXT_WORD:
+            from web.text.models import TextWord as _TEXT_WORD
+        if not _ARCHIVE:
+            from web.text.models import TextArchive as _ARCHIVE
+        if not _ARCHIVE_WORD:
+            from web.text.models import ArchiveWord as _ARCHIVE_WORD
+
+        age = ARCHIVE_AGE if age is None else age
+        size = ARCHIVE_SIZE if size is None else size
+        gtime = datetime.datetime.fromtimestamp(_GAMETIME.gametime(absolute=True))
+        limit = make_aware(gtime) - datetime.timedelta(days=age)
+        thread_ids = set(self.filter(db_date_sent__lt=limit).values_list(
+                "db_thread", flat=True))
+        for thread in _THREAD.objects.filter(id__in=thread_ids):
+            while True:
+                chunk = list(self.filter(db_thread=thread, db_date_sent__lt=limit).exclude(
+                        id=thread.db_last_text_id).order_by("db_date_sent", "id").select_related(
+                        "db_sender").prefetch_related("db_deleted")[:size])
+                if len(chunk) < size:
+                    break
+
+                ids = [text.id for text in chunk]
+                with transaction.atomic():
+                    archive = _ARCHIVE.objects.create(db_thread=thread,
+                            db_date_start=chunk[0].db_date_sent,
+                            db_date_end=chunk[-1].db_date_sent,
+                            db_count=len(chunk), db_data=_ARCHIVE.pack(chunk))
+                    words = _TEXT_WORD.objects.filter(db_text__in=ids).values_list(
+                            "db_word", "db_text")
+                    _ARCHIVE_WORD.objects.bulk_create([_ARCHIVE_WORD(db_word=word,
+                            db_archive=archive, db_text_id=text_id)
+                            for word, text_id in words])
+                    self.filter(id__in=ids).delete()
+
+                yield len(chunk)
+
+    def archive(self, age=None, size=None):
+        """
+        Archive old texts at once.
+
+        See `iter_archive` for the arguments.  This method archives all
+        texts in one call: the `tickers.texts` module archives them
+        without blocking the server.
+
+        Returns:
+            count (int): the number of archived texts.
+
+        """
+        return sum(self.iter_archive(age=age, size=size))
 
     def get_num_unread(self, number):
         """Get the number of unread threads for number.
@@ -75,14 +408,13 @@ class TextManager(models.Manager):
             number (str): the number in question.
 
         """
-        global _THREAD
-        if not _THREAD:
-            from web.text.models import Thread as _THREAD
+        global _PARTICIPANT
+        if not _PARTICIPANT:
+            from web.text.models import Participant as _PARTICIPANT
 
         number = number.replace("-", "")
-        q = _THREAD.objects.filter(db_recipients__db_phone_number=number)
-        q = q.exclude(db_read__db_phone_number=number)
-        return q.count()
+        return _PARTICIPANT.objects.filter(db_number__db_phone_number=number,
+                db_unread=True).count()
 
     def send(self, sender, recipients, content):
         """Send a text message from `number` to `recipients`.
@@ -96,41 +428,48 @@ class TextManager(models.Manager):
             text (Text): the newly-sent text message.
 
         """
-        global _GAMETIME, _THREAD, _NUMBER
+        global _GAMETIME, _THREAD, _NUMBER, _PARTICIPANT
         if not _GAMETIME:
             from evennia.utils import gametime as _GAMETIME
         if not _THREAD:
             from web.text.models import Thread as _THREAD
         if not _NUMBER:
             from web.text.models import Number as _NUMBER
-
-        # First, get the sender's phone number
-        recipients = [sender] + recipients
-        try:
-            sender = _NUMBER.objects.get(db_phone_number=sender)
-        except _NUMBER.DoesNotExist:
-            sender = _NUMBER(db_phone_number=sender)
-            sender.save()
+        if not _PARTICIPANT:
+            from web.text.models import Participant as _PARTICIPANT
 
         gtime = datetime.datetime.fromtimestamp(_GAMETIME.gametime(absolute=True))
         gtime = make_aware(gtime)
+        with transaction.atomic():
+            # Look for a thread or create one
+            recipients = [sender] + recipients
+            thread = _THREAD.objects.get_thread(recipients)
+            if thread is None:
+                numbers = self._get_numbers(recipients)
+                thread = _THREAD(db_key=get_participant_key(recipients))
+                thread.save()
+
+                # For every participant, add it as recipient
+                numbers = list(numbers.values())
+                thread.db_recipients.add(*numbers)
+                _PARTICIPANT.objects.bulk_create([_PARTICIPANT(db_thread=thread,
+                        db_number=number) for number in numbers])
+
+            # Get the sender's phone number
+            sender = _NUMBER.objects.get(db_phone_number=sender.replace("-", ""))
+
+            text = thread.text_set.create(
+                    db_sender=sender, db_content=content, db_date_sent=gtime)
+            self.index([text])
 
-        # Look for a thread or create one
-        thread = _THREAD.objects.get_thread(recipients)
-        if thread is None:
-            thread = _THREAD()
+            # Update the thread summary and unread flags
+            thread.db_last_text = text
+            thread.db_last_activity = gtime
             thread.save()
+            participants = _PARTICIPANT.objects.filter(db_thread=thread)
+            participants.exclude(db_number=sender).update(
+                    db_unread=True, db_last_activity=gtime)
+            participants.filter(db_number=sender).update(
+                    db_unread=False, db_last_activity=gtime)
 
-            # For every participant, add it as recipient
-            for number in recipients:
-                try:
-                    recipient = _NUMBER.objects.get(db_phone_number=number)
-                except _NUMBER.DoesNotExist:
-                    recipient = _NUMBER(db_phone_number=number)
-                    recipient.save()
-                thread.db_recipients.add(recipient)
-
-        thread.db_read.clear()
-        thread.db_read.add(sender)
-        return thread.text_set.create(
-                db_sender=sender, db_content=content, db_date_sent=gtime)
+        return text
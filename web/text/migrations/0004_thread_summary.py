@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def summarize_threads(apps, schema_editor):
+    """Set the thread summaries and unread flags of existing threads."""
+    Thread = apps.get_model("text", "Thread")
+    Text = apps.get_model("text", "Text")
+    Participant = apps.get_model("text", "Participant")
+    for thread in Thread.objects.all():
+        last = Text.objects.filter(db_thread=thread).order_by(
+                "-db_date_sent", "-id").first()
+        thread.db_last_text = last
+        thread.db_last_activity = last.db_date_sent if last else None
+        thread.save()
+        read = set(thread.db_read.values_list("id", flat=True))
+        Participant.objects.bulk_create([Participant(db_thread=thread,
+                db_number=number, db_unread=number.id not in read,
+                db_last_activity=thread.db_last_activity)
+                for number in thread.db_recipients.all()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('text', '0003_restructure'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Participant',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('db_unread', models.BooleanField(default=False)),
+                ('db_last_activity', models.DateTimeField(blank=True, null=True)),
+                ('db_number', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='text.Number')),
+                ('db_thread', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='text.Thread')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='thread',
+            name='db_last_activity',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='thread',
+            name='db_last_text',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='text.Text'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='participant',
+            unique_together=set([('db_thread', 'db_number')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='participant',
+            index_together=set([('db_number', 'db_unread'), ('db_number', 'db_last_activity')]),
+        ),
+        migrations.RunPython(summarize_threads, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='thread',
+            name='db_read',
+        ),
+    ]
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from hashlib import sha1
+
+from django.db import migrations, models
+
+
+def get_participant_key(numbers):
+    """Return the participant key of a set of phone numbers."""
+    numbers = sorted(set(number.replace("-", "") for number in numbers))
+    return sha1(",".join(numbers).encode("utf-8")).hexdigest()
+
+
+def merge_threads(apps, thread, duplicate):
+    """Merge a duplicate thread into the thread with the same participants."""
+    Text = apps.get_model("text", "Text")
+    Participant = apps.get_model("text", "Participant")
+    Text.objects.filter(db_thread=duplicate).update(db_thread=thread)
+
+    # Move the participants, keeping the unread flags
+    numbers = list(Participant.objects.filter(db_thread=thread).values_list(
+            "db_number_id", flat=True))
+    unread = list(Participant.objects.filter(db_thread=duplicate,
+            db_unread=True).values_list("db_number_id", flat=True))
+    Participant.objects.filter(db_thread=duplicate).exclude(
+            db_number_id__in=numbers).update(db_thread=thread)
+    Participant.objects.filter(db_thread=thread,
+            db_number_id__in=unread).update(db_unread=True)
+
+    # Update the summary of the thread
+    last = Text.objects.filter(db_thread=thread).order_by(
+            "-db_date_sent", "-id").first()
+    thread.db_name = thread.db_name or duplicate.db_name
+    thread.db_last_text = last
+    thread.db_last_activity = last.db_date_sent if last else None
+    thread.save()
+    Participant.objects.filter(db_thread=thread).update(
+            db_last_activity=thread.db_last_activity)
+    duplicate.delete()
+
+
+def set_thread_keys(apps, schema_editor):
+    """Set the participant key of existing threads.
+
+    Threads with the same participants are merged into the oldest one,
+    which is the only one that can be found by key.
+
+    """
+    Thread = apps.get_model("text", "Thread")
+    threads = {}
+    for thread in Thread.objects.all().order_by("id"):
+        numbers = thread.db_recipients.values_list("db_phone_number", flat=True)
+        key = get_participant_key(numbers)
+        if key in threads:
+            merge_threads(apps, threads[key], thread)
+            continue
+
+        threads[key] = thread
+        thread.db_key = key
+        thread.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('text', '0004_thread_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='thread',
+            name='db_key',
+            field=models.CharField(blank=True, max_length=40, null=True, unique=True),
+        ),
+        migrations.RunPython(set_thread_keys, migrations.RunPython.noop),
+    ]
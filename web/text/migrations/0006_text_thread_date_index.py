@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('text', '0005_thread_key'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='text',
+            index_together=set([('db_thread', 'db_date_sent')]),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import re
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+RE_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def get_words(string):
+    """Return the set of words to index in a string."""
+    if isinstance(string, bytes):
+        string = string.decode("utf-8", "replace")
+
+    return set(word[:30] for word in RE_WORD.findall(string.lower()) if len(word) >= 2)
+
+
+def index_texts(apps, schema_editor):
+    """Index the words of existing texts."""
+    Text = apps.get_model("text", "Text")
+    TextWord = apps.get_model("text", "TextWord")
+    words = []
+    for text_id, content in Text.objects.values_list("id", "db_content").iterator():
+        words.extend(TextWord(db_word=word, db_text_id=text_id) for word in get_words(content))
+        if len(words) >= 1000:
+            TextWord.objects.bulk_create(words)
+            words = []
+
+    TextWord.objects.bulk_create(words)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('text', '0006_text_thread_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TextWord',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('db_word', models.CharField(max_length=30)),
+                ('db_text', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='words', to='text.Text')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='textword',
+            unique_together=set([('db_word', 'db_text')]),
+        ),
+        migrations.RunPython(index_texts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('text', '0007_textword'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TextArchive',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('db_date_start', models.DateTimeField()),
+                ('db_date_end', models.DateTimeField()),
+                ('db_count', models.IntegerField(default=0)),
+                ('db_data', models.BinaryField()),
+                ('db_thread', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='text.Thread')),
+            ],
+        ),
+        migrations.AlterIndexTogether(
+            name='textarchive',
+            index_together=set([('db_thread', 'db_date_end')]),
+        ),
+        migrations.CreateModel(
+            name='ArchiveWord',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('db_word', models.CharField(db_index=True, max_length=30)),
+                ('db_text_id', models.IntegerField()),
+                ('db_archive', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='words', to='text.TextArchive')),
+            ],
+        ),
+    ]
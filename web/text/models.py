@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 import datetime
+import json
+import zlib
 
 from django.db import models
-from django.utils.timezone import make_aware
+from django.utils.timezone import make_aware, utc
 from evennia.utils.idmapper.models import SharedMemoryModel
 from evennia.utils.utils import time_format
 
@@ -12,6 +14,9 @@ from web.text.managers import TextManager, ThreadManager
 # Global imports
 _GAMETIME = None
 
+# Constants
+EPOCH = make_aware(datetime.datetime(1970, 1, 1), utc)
+
 class Number(SharedMemoryModel):
 
     """A phone number."""
@@ -21,12 +26,23 @@ class Number(SharedMemoryModel):
 
 class Thread(SharedMemoryModel):
 
-    """A thread to group messages."""
+    """A thread to group messages.
+
+    The thread keeps its last text and the time of its last activity,
+    updated when a text is sent, so that lists of threads don't have
+    to browse the texts.  Its key is computed from the phone numbers
+    of its participants (see `get_participant_key`), to find the
+    thread between a set of numbers with one indexed query.
+
+    """
 
     objects = ThreadManager()
     db_name = models.CharField(max_length=30, default="")
+    db_key = models.CharField(max_length=40, unique=True, null=True, blank=True)
     db_recipients = models.ManyToManyField(Number)
-    db_read = models.ManyToManyField(Number, related_name='+')
+    db_last_text = models.ForeignKey("Text", null=True, blank=True,
+            on_delete=models.SET_NULL, related_name="+")
+    db_last_activity = models.DateTimeField(null=True, blank=True, db_index=True)
 
     def has_read(self, number):
         """Check whether the specified number has read the thread.
@@ -39,7 +55,8 @@ class Thread(SharedMemoryModel):
 
         """
         number = number.replace("-", "")
-        return self.db_read.filter(db_phone_number=number).count() > 0
+        return self.participant_set.filter(db_number__db_phone_number=number,
+                db_unread=False).exists()
 
     def mark_unread(self, number):
         """Mark the thread as unread for this number.
@@ -50,8 +67,9 @@ class Thread(SharedMemoryModel):
             number (str): the phone number.
 
         """
-        number = Number.objects.get(db_phone_number=number.replace("-", ""))
-        self.db_read.remove(number)
+        number = number.replace("-", "")
+        self.participant_set.filter(db_number__db_phone_number=number).update(
+                db_unread=True)
 
     def mark_read(self, number):
         """Mark the thread has read by this number.
@@ -62,8 +80,33 @@ class Thread(SharedMemoryModel):
             number (str): the phone number to add.
 
         """
-        number = Number.objects.get(db_phone_number=number.replace("-", ""))
-        self.db_read.add(number)
+        number = number.replace("-", "")
+        self.participant_set.filter(db_number__db_phone_number=number).update(
+                db_unread=False)
+
+
+class Participant(models.Model):
+
+    """A participant in a thread, with its unread flag.
+
+    The last activity of the thread is copied here, so that the threads
+    of a number can be listed, most recent first, with an indexed query.
+    Participants are updated in bulk (`update` queries), so they don't
+    use the shared memory cache, which wouldn't see these updates.
+
+    """
+
+    db_thread = models.ForeignKey(Thread, on_delete=models.CASCADE)
+    db_number = models.ForeignKey(Number, on_delete=models.CASCADE)
+    db_unread = models.BooleanField(default=False)
+    db_last_activity = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ("db_thread", "db_number")
+        index_together = [
+            ("db_number", "db_unread"),
+            ("db_number", "db_last_activity"),
+        ]
 
 
 class Text(SharedMemoryModel):
@@ -79,6 +122,11 @@ class Text(SharedMemoryModel):
     db_thread = models.ForeignKey(Thread, on_delete=models.CASCADE)
     db_deleted = models.ManyToManyField(Number, related_name='+')
 
+    class Meta:
+        index_together = [
+            ("db_thread", "db_date_sent"),
+        ]
+
     def __str__(self):
         return "{}: {}".format(self.id, self.content)
 
@@ -105,3 +153,140 @@ class Text(SharedMemoryModel):
                 recipients.append(recipient.db_phone_number)
 
         return recipients
+
+
+class TextWord(models.Model):
+
+    """A word in a text, to search texts.
+
+    Every text has one row per distinct word in its content (see
+    `world.utils.get_words`), created when the text is sent.  Searching
+    texts containing a word uses the index on the word rather than
+    browsing the content of all texts.
+
+    """
+
+    db_word = models.CharField(max_length=30)
+    db_text = models.ForeignKey(Text, on_delete=models.CASCADE, related_name="words")
+
+    class Meta:
+        unique_together = ("db_word", "db_text")
+
+
+class TextArchive(models.Model):
+
+    """Old texts of a thread, compressed in a single row.
+
+    Texts older than `TEXT_ARCHIVE_AGE` (see `TextManager.archive`) are
+    moved out of the text table and stored in archives, a group of
+    texts per row.  Archives are only read when older texts are
+    displayed or searched, and the text table stays small.  The
+    archived texts keep their ID and can be read like texts (see
+    `ArchivedText`).
+
+    """
+
+    db_thread = models.ForeignKey(Thread, on_delete=models.CASCADE)
+    db_date_start = models.DateTimeField()
+    db_date_end = models.DateTimeField()
+    db_count = models.IntegerField(default=0)
+    db_data = models.BinaryField()
+
+    class Meta:
+        index_together = [
+            ("db_thread", "db_date_end"),
+        ]
+
+    @staticmethod
+    def pack(texts):
+        """Return the compressed data of these texts.
+
+        Args:
+            texts (list of Text): the texts to pack.
+
+        Returns:
+            data (bytes): the compressed data.
+
+        """
+        rows = []
+        for text in texts:
+            deleted = [number.db_phone_number for number in text.db_deleted.all()]
+            rows.append([text.id, text.db_sender.db_phone_number,
+                    (text.db_date_sent - EPOCH).total_seconds(),
+                    text.db_content, deleted])
+
+        return zlib.compress(json.dumps(rows).encode("utf-8"))
+
+    @property
+    def texts(self):
+        """Return the archived texts, oldest first."""
+        rows = json.loads(zlib.decompress(bytes(self.db_data)).decode("utf-8"))
+        numbers = dict((number.db_phone_number, number) for number in
+                self.db_thread.db_recipients.all())
+        missing = [row[1] for row in rows if row[1] not in numbers]
+        if missing:
+            numbers.update((number.db_phone_number, number) for number in
+                    Number.objects.filter(db_phone_number__in=missing))
+
+        texts = []
+        for text_id, sender, date_sent, content, deleted in rows:
+            date_sent = EPOCH + datetime.timedelta(seconds=date_sent)
+            texts.append(ArchivedText(self, text_id, numbers.get(sender),
+                    date_sent, content, deleted))
+
+        return texts
+
+
+class ArchivedText(object):
+
+    """A text read from an archive.
+
+    It can be read like a text, but not modified.
+
+    """
+
+    sent_ago = Text.sent_ago
+    recipients = Text.recipients
+
+    def __init__(self, archive, id, sender, date_sent, content, deleted):
+        self.archive = archive
+        self.id = self.pk = id
+        self.db_thread = archive.db_thread
+        self.db_sender = sender
+        self.db_date_sent = date_sent
+        self.db_content = content
+        self.deleted = deleted
+
+    def __repr__(self):
+        return "<ArchivedText {}>".format(self.id)
+
+    def __eq__(self, other):
+        return isinstance(other, (Text, ArchivedText)) and self.id == other.id
+
+    def __ne__(self, other):
+        return not self == other
+
+    @property
+    def thread(self):
+        return self.db_thread
+
+    @property
+    def sender(self):
+        return self.db_sender
+
+    @property
+    def date_sent(self):
+        return self.db_date_sent
+
+    @property
+    def content(self):
+        return self.db_content
+
+
+class ArchiveWord(models.Model):
+
+    """A word in an archived text, to search archived texts."""
+
+    db_word = models.CharField(max_length=30, db_index=True)
+    db_archive = models.ForeignKey(TextArchive, on_delete=models.CASCADE, related_name="words")
+    db_text_id = models.IntegerField()
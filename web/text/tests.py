@@ -121,3 +121,81 @@ class TestText(TestCase):
         t1.thread.mark_unread(self.n2)
         self.assertTrue(t1.thread.has_read(self.n1))
         self.assertFalse(t1.thread.has_read(self.n2))
+
+    def test_thread_summary(self):
+        """Test that threads keep their last text and activity."""
+        t1 = Text.objects.send(self.n1, [self.n2], "How do?")
+        t2 = Text.objects.send(self.n3, [self.n1], "Hold!")
+        t3 = Text.objects.send(self.n2, [self.n1], "Good! You?")
+        self.assertEqual(t1.thread.db_last_text, t3)
+        self.assertEqual(list(Text.objects.get_threads_for(self.n1).values()), [t3, t2])
+        self.assertEqual(list(Text.objects.get_threads_for(self.n1, start=1, count=1).values()), [t2])
+
+        # Unread flags
+        participations = list(Text.objects.get_participations(self.n1))
+        self.assertEqual([p.db_unread for p in participations], [True, True])
+        participations = list(Text.objects.get_participations(self.n2))
+        self.assertEqual([p.db_unread for p in participations], [False])
+
+    def test_group_thread(self):
+        """Test that group threads are found whatever the order of numbers."""
+        t1 = Text.objects.send(self.n1, [self.n2, self.n3], "Meeting?")
+        t2 = Text.objects.send(self.n3, [self.n2, self.n1], "Sure")
+        t3 = Text.objects.send(self.n2, [self.n1], "Only you")
+        self.assertEqual(t1.db_thread, t2.db_thread)
+        self.assertNotEqual(t1.db_thread, t3.db_thread)
+        self.assertEqual(Number.objects.count(), 3)
+        self.assertEqual(Thread.objects.get_thread([self.n3, self.n1, self.n2]), t1.db_thread)
+
+    def test_page(self):
+        """Test to browse a thread, page by page."""
+        texts = [Text.objects.send(self.n1, [self.n2], "Text {}".format(i)) for i in range(5)]
+        thread = texts[0].db_thread
+        page, more = Text.objects.get_page(thread, count=2)
+        self.assertEqual(page, texts[3:])
+        self.assertTrue(more)
+        page, more = Text.objects.get_page(thread, (page[0].db_date_sent, page[0].id), count=2)
+        self.assertEqual(page, texts[1:3])
+        self.assertTrue(more)
+        page, more = Text.objects.get_page(thread, (page[0].db_date_sent, page[0].id), count=2)
+        self.assertEqual(page, texts[:1])
+        self.assertFalse(more)
+
+    def test_search(self):
+        """Test to search texts by words."""
+        t1 = Text.objects.send(self.n1, [self.n2], "Meeting at the bar, tomorrow?")
+        t2 = Text.objects.send(self.n2, [self.n1], "Tomorrow is fine.")
+        t3 = Text.objects.send(self.n3, [self.n2], "The bar is closed tomorrow!")
+        self.assertEqual(Text.objects.search("tomorrow"), [t3, t2, t1])
+        self.assertEqual(Text.objects.search("BAR tomorrow"), [t3, t1])
+        self.assertEqual(Text.objects.search("tomorrow", self.n1), [t2, t1])
+        self.assertEqual(Text.objects.search("closed", self.n1), [])
+        self.assertEqual(Text.objects.search("!"), [])
+
+    def test_archive(self):
+        """Test to archive texts and read them."""
+        texts = [Text.objects.send(self.n1, [self.n2], "Text {}".format(i)) for i in range(5)]
+        thread = texts[0].db_thread
+        self.assertEqual(Text.objects.archive(age=-1, size=2), 4)
+        self.assertEqual(Text.objects.count(), 1)
+        self.assertEqual(TextArchive.objects.count(), 2)
+        self.assertEqual(Thread.objects.get(id=thread.id).db_last_text, texts[4])
+
+        # Archived texts are read transparently
+        page, more = Text.objects.get_page(thread, count=2)
+        self.assertEqual([text.id for text in page], [texts[3].id, texts[4].id])
+        self.assertEqual(page[0].content, "Text 3")
+        self.assertTrue(more)
+        page, more = Text.objects.get_page(thread, (page[0].db_date_sent, page[0].id), count=3)
+        self.assertEqual([text.content for text in page], ["Text 0", "Text 1", "Text 2"])
+        self.assertFalse(more)
+
+        # Archived texts can be searched
+        found = Text.objects.search("text", self.n2)
+        self.assertEqual([text.id for text in found], [text.id for text in reversed(texts)])
+
+        # Only full archives are created
+        texts.append(Text.objects.send(self.n2, [self.n1], "Text 5"))
+        self.assertEqual(Text.objects.archive(age=-1, size=2), 0)
+        self.assertEqual(Text.objects.count(), 2)
+        self.assertEqual(TextArchive.objects.count(), 2)
@@ -12,6 +12,7 @@ from typeclasses.characters import Character
 from typeclasses.objects import Object
 from typeclasses.prototypes import PChar, PRoom
 from typeclasses.rooms import Room
+from typeclasses.scripts import get_syntax_error
 from typeclasses.vehicles import Crossroad, Vehicle
 
 # Constants
@@ -181,13 +182,21 @@ def add_callback(obj, name, number, code, parameters="", author=None):
         parameters (str): the parameters for this event.
         author (Object, optional): the callback author (will be superuser if not set).
 
+    Raises:
+        ValueError: the code of the callback contains a syntax error.
+
     """
     author = author or Character.objects.get(id=1)
     lock = "perm({}) or perm(events_without_validation)".format(
         WITHOUT_VALIDATION)
     valid = author.locks.check_lockstring(author, lock)
-    callbacks = obj.callbacks.get(name)
     code = dedent(code).strip("\n")
+    error = get_syntax_error(code)
+    if error:
+        raise ValueError("The {} callback of {} contains a syntax error ({})".format(
+                name, obj, error))
+
+    callbacks = obj.callbacks.get(name)
     if 0 <= number < len(callbacks):
         # Obviously the callback is there, so we edit it
         obj.callbacks.edit(name, number, code, author=author, valid=valid)
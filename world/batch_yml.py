@@ -28,9 +28,12 @@ information is to be created or updated.
 
 """
 
+from textwrap import dedent
+
 from logic.geo import NAME_DIRECTIONS
 from typeclasses.prototypes import PRoom
 from typeclasses.rooms import Room
+from typeclasses.scripts import get_syntax_error
 from world.batch import *
 from world.log import batch as log
 from world.utils import load_YAML
@@ -293,6 +296,11 @@ def parse_callback(document, author, messages):
         return []
     if isinstance(code, unicode):
         code = code.encode("utf-8")
+    error = get_syntax_error(dedent(code).strip("\n"))
+    if error:
+        messages.append((2, line,
+                "The callback code contains a syntax error ({}).".format(error)))
+        return []
     kwargs["code"] = code
 
     # Handle the parameters
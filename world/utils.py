@@ -7,12 +7,19 @@ Functions:
     latinify(unicode[, default][, mapping]): return a unicode string containing only ASCII.
     show_list(strings, width=4, **kwargs): return a formatted list.
     load_YAML(string): read a YAML file, returning a collection with systematic line numbers.
+    get_words(string): return the set of words to index in a string.
 
 """
 
+import re
+
 from yaml import compose_all, nodes
 from collections import OrderedDict
 
+RE_WORD = re.compile(r"\w+", re.UNICODE)
+WORD_MIN_LENGTH = 2
+WORD_MAX_LENGTH = 30
+
 _UNICODE_MAPPING = {
     # Insert characters to escape here
 }
@@ -141,3 +148,25 @@ def read_node(node):
         return col
 
     raise RuntimeError("cannot parse the node at line {}".format(line))
+
+
+def get_words(string):
+    """
+    Return the set of words to index in a string.
+
+    Words are lowercase, words too short are ignored and words too
+    long are truncated.  The same function should be used to index
+    a text and to parse the search query.
+
+    Args:
+        string (str): the string to split into words.
+
+    Returns:
+        words (set of unicode): the words.
+
+    """
+    if isinstance(string, bytes):
+        string = string.decode("utf-8", "replace")
+
+    return set(word[:WORD_MAX_LENGTH] for word in RE_WORD.findall(string.lower())
+            if len(word) >= WORD_MIN_LENGTH)